@@ -0,0 +1,193 @@
+# adaptive_attacks.py
+import heapq
+import numpy as np
+
+from resilience_metrics import (
+    _betweenness_arrays,
+    _brandes_batch_size,
+    _brandes_block,
+    attack_auc,
+    percolation_trajectory,
+)
+
+class _LazyMaxHeap:
+    """
+    Max-heap of node scores with lazy updates: a changed score is pushed as a
+    new entry, and outdated or removed entries are skipped when popped.
+    Ties go to the node that comes first in node order.
+    """
+
+    def __init__(self, scores):
+        self.scores = np.asarray(scores, dtype=np.float64).copy()
+        self.alive = np.ones(len(self.scores), dtype=bool)
+        self.entries = [(-score, i) for i, score in enumerate(self.scores)]
+        heapq.heapify(self.entries)
+
+    def update(self, i, score):
+        if self.alive[i] and score != self.scores[i]:
+            self.scores[i] = score
+            heapq.heappush(self.entries, (-score, i))
+
+    def pop(self):
+        while self.entries:
+            neg_score, i = heapq.heappop(self.entries)
+            if self.alive[i] and -neg_score == self.scores[i]:
+                self.alive[i] = False
+                return i
+        return None
+
+def _ball_boundary(adj, source, radius):
+    """Nodes at distance exactly radius from source (the frontier of the ball)."""
+    seen = {source}
+    frontier = [source]
+    for _ in range(radius):
+        next_frontier = []
+        for v in frontier:
+            for w in adj[v]:
+                if w not in seen:
+                    seen.add(w)
+                    next_frontier.append(w)
+        frontier = next_frontier
+    return frontier
+
+def _collective_influence(adj, i, radius):
+    """CI_ℓ(i) = (k_i - 1) Σ_{j ∈ ∂Ball(i, ℓ)} (k_j - 1)."""
+    if len(adj[i]) <= 1:
+        return 0.0
+    return (len(adj[i]) - 1) * sum(len(adj[j]) - 1 for j in _ball_boundary(adj, i, radius))
+
+def _within(adj, source, radius):
+    """Nodes at distance at most radius from source."""
+    seen = {source}
+    frontier = [source]
+    for _ in range(radius):
+        next_frontier = []
+        for v in frontier:
+            for w in adj[v]:
+                if w not in seen:
+                    seen.add(w)
+                    next_frontier.append(w)
+        frontier = next_frontier
+    return seen
+
+def _degree_attack(adj, num_nodes):
+    heap = _LazyMaxHeap([len(neighbors) for neighbors in adj])
+    order = []
+    while len(order) < num_nodes:
+        v = heap.pop()
+        if v is None:
+            break
+        order.append(v)
+        for w in adj[v]:
+            adj[w].discard(v)
+            heap.update(w, len(adj[w]))
+        adj[v] = set()
+    return order
+
+def _collective_influence_attack(adj, num_nodes, radius):
+    heap = _LazyMaxHeap([_collective_influence(adj, i, radius) for i in range(len(adj))])
+    order = []
+    while len(order) < num_nodes:
+        v = heap.pop()
+        if v is None:
+            break
+        order.append(v)
+        # Only nodes within radius + 1 of v have v, or a neighbour whose
+        # degree drops, inside their ball.
+        affected = _within(adj, v, radius + 1)
+        for w in adj[v]:
+            adj[w].discard(v)
+        adj[v] = set()
+        for w in affected:
+            if w != v:
+                heap.update(w, _collective_influence(adj, w, radius))
+    return order
+
+def _betweenness_attack(G, num_nodes, pivots, seed):
+    """
+    Betweenness is estimated from a fixed-size set of pivot sources, with the
+    per-pivot dependencies kept as an n x k matrix. After a removal only the
+    pivots for which the removed node lay inside a shortest path (non-zero
+    dependency) are recomputed, and a removed pivot is replaced by a new one.
+    The other pivots keep the removed node's small contribution as a target,
+    which is the approximation.
+    """
+    A = _betweenness_arrays(G)[0]
+    n = A.shape[0]
+    rng = np.random.default_rng(seed)
+    alive = np.ones(n, dtype=bool)
+    sources = rng.choice(n, size=min(pivots, n), replace=False)
+    batch_size = _brandes_batch_size(n, A.nnz)
+
+    def dependencies(batch):
+        block = np.zeros((n, len(batch)))
+        for start in range(0, len(batch), batch_size):
+            part = batch[start:start + batch_size]
+            delta = _brandes_block(A, part, alive=alive)[2]
+            delta[part, np.arange(len(part))] = 0.0
+            block[:, start:start + len(part)] = delta
+        return block
+
+    D = dependencies(sources)
+    heap = _LazyMaxHeap(D.sum(axis=1))
+    order = []
+    while len(order) < num_nodes:
+        v = heap.pop()
+        if v is None:
+            break
+        order.append(v)
+        alive[v] = False
+        stale = np.flatnonzero((D[v] > 0) | (sources == v))
+        for p in np.flatnonzero(sources == v):
+            candidates = np.flatnonzero(alive & ~np.isin(np.arange(n), sources))
+            if len(candidates):
+                sources[p] = rng.choice(candidates)
+        D[v] = 0.0
+        if len(stale):
+            D[:, stale] = dependencies(sources[stale])
+            D[~alive] = 0.0
+            # A removed pivot with no node left to replace it drops out.
+            D[:, ~alive[sources]] = 0.0
+        scores = D.sum(axis=1)
+        for w in np.flatnonzero(alive & (scores != heap.scores)):
+            heap.update(w, scores[w])
+    return order
+
+def adaptive_attack_order(G, score='degree', num_nodes=None, ci_radius=2, pivots=64, seed=None):
+    """
+    Returns the nodes removed by an adaptive attack, in removal order. After
+    every removal the score of each affected node is recomputed on the
+    damaged graph, and the node with the highest current score goes next.
+
+    score: 'degree', 'ci' (collective influence with radius ci_radius) or
+    'betweenness' (approximated from `pivots` sampled sources).
+    num_nodes: how many nodes to remove (default: all of them).
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    num_nodes = len(nodes) if num_nodes is None else min(num_nodes, len(nodes))
+    adj = [{index[w] for w in G.adj[node] if w != node} for node in nodes]
+    if score == 'degree':
+        order = _degree_attack(adj, num_nodes)
+    elif score == 'ci':
+        order = _collective_influence_attack(adj, num_nodes, ci_radius)
+    elif score == 'betweenness':
+        order = _betweenness_attack(G, num_nodes, pivots, seed)
+    else:
+        raise ValueError(f"Unknown score: {score}")
+    return [nodes[i] for i in order]
+
+def adaptive_attack_trajectory(G, score='degree', **kwargs):
+    """
+    Giant-component sizes during an adaptive attack, in the same format as
+    resilience_metrics.targeted_attack_trajectory.
+    """
+    return percolation_trajectory(G, adaptive_attack_order(G, score=score, **kwargs))
+
+def simulate_adaptive_attack(G, score='degree', **kwargs):
+    """
+    Simulates an adaptive attack and returns the AUC.
+    """
+    if G.number_of_nodes() == 0:
+        return 0.0
+    return attack_auc(adaptive_attack_trajectory(G, score=score, **kwargs))
@@ -0,0 +1,204 @@
+# benchmark.py
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported.
+    resource = None
+
+# Generator families, each built from the networks.py generator with about
+# four neighbours per node, whatever the size.
+FAMILIES = ('er', 'ba', 'ws', 'grid')
+CASES = ('algebraic_connectivity', 'omega_betweenness', 'omega_electrical', 'targeted_attack',
+         'strategy:pcm', 'strategy:betweenness', 'strategy:hub', 'strategy:random', 'strategy:fiedler')
+DEFAULT_SIZES = (10**2, 10**3, 10**4, 10**5, 10**6)
+# nx.erdos_renyi_graph flips a coin for every pair, so above this size the
+# equivalent linear-time nx.fast_gnp_random_graph is used instead.
+ER_PAIRWISE_MAX_NODES = 20000
+# Edges added by each strategy benchmark.
+STRATEGY_EDGES = 10
+# A case that exceeds this many seconds (setup included) is stopped, and its
+# larger sizes are skipped.
+DEFAULT_TIMEOUT = 600.0
+# Relative change in time beyond which a case counts as a regression or an improvement.
+DEFAULT_THRESHOLD = 0.2
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_graph(family, n, seed=42):
+    import networkx as nx
+    import networks
+    if family == 'er':
+        if n > ER_PAIRWISE_MAX_NODES:
+            return nx.fast_gnp_random_graph(n, 4.0 / n, seed=seed)
+        return networks.create_er_graph(n, p=4.0 / n, seed=seed)
+    if family == 'ba':
+        return networks.create_ba_graph(n, m=2, seed=seed)
+    if family == 'ws':
+        return networks.create_ws_graph(n, k=4, p=0.1, seed=seed)
+    if family == 'grid':
+        side = max(2, int(round(n ** 0.5)))
+        return networks.create_grid_2d_graph(side, side)
+    raise ValueError(f"Unknown graph family: {family}")
+
+def _case_function(case):
+    import resilience_calculator
+    import resilience_metrics
+    if case.startswith('strategy:'):
+        strategy = getattr(resilience_calculator, f"{case.split(':', 1)[1]}_strategy")
+        return lambda G: resilience_calculator.run_single_strategy_simulation(G, STRATEGY_EDGES, strategy)
+    return {
+        'algebraic_connectivity': resilience_calculator.calculate_algebraic_connectivity,
+        'omega_betweenness': resilience_metrics.calculate_omega_betweenness,
+        'omega_electrical': resilience_metrics.calculate_omega_electrical,
+        'targeted_attack': resilience_metrics.simulate_targeted_attack,
+    }[case]
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def _run_case(case, family, n, repeat, connection):
+    """Runs in a fresh process, so that peak RSS belongs to this case only."""
+    try:
+        G = make_graph(family, n)
+        func = _case_function(case)
+        rss_before = _peak_rss_mb()
+        times = []
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func(G)
+                times.append(time.perf_counter() - start)
+        rss_after = _peak_rss_mb()
+        connection.send({
+            'status': 'ok', 'nodes': G.number_of_nodes(), 'edges': G.number_of_edges(),
+            'seconds': min(times), 'peak_rss_mb': rss_after,
+            'rss_delta_mb': rss_after - rss_before if rss_after is not None else None,
+        })
+    except Exception as e:
+        connection.send({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+
+def run_case(case, family, n, repeat=1, timeout=DEFAULT_TIMEOUT):
+    context = mp.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(case, family, n, repeat, sender))
+    process.start()
+    sender.close()
+    result = {'status': 'crashed'}
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            pass
+    else:
+        result = {'status': 'timeout'}
+        process.terminate()
+    process.join()
+    return {'case': case, 'family': family, 'size': n, **result}
+
+def scaling_exponents(results, min_seconds=1e-3):
+    """
+    Slope of log(time) against log(nodes) for every case and family, fitted
+    over the sizes that finished and took at least min_seconds.
+    """
+    exponents = {}
+    for case in sorted({r['case'] for r in results}):
+        for family in sorted({r['family'] for r in results}):
+            points = [(r['nodes'], r['seconds']) for r in results
+                      if r['case'] == case and r['family'] == family and r['status'] == 'ok' and r['seconds'] >= min_seconds]
+            if len(points) >= 2:
+                nodes, seconds = np.log(np.array(points, dtype=np.float64)).T
+                exponents.setdefault(case, {})[family] = float(np.polyfit(nodes, seconds, 1)[0])
+    return exponents
+
+def run_benchmarks(cases=CASES, families=FAMILIES, sizes=DEFAULT_SIZES, repeat=1, timeout=DEFAULT_TIMEOUT):
+    """
+    Runs every case on every family and size, smallest first. Once a size
+    fails or times out, the larger sizes of that case and family are skipped.
+    """
+    results = []
+    for case in cases:
+        for family in families:
+            for n in sorted(sizes):
+                result = run_case(case, family, n, repeat=repeat, timeout=timeout)
+                results.append(result)
+                seconds = f"{result['seconds']:.4f}s" if result['status'] == 'ok' else result['status']
+                print(f"{case:<24} {family:<5} n={n:<8} {seconds}", flush=True)
+                if result['status'] != 'ok':
+                    break
+    return {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'numpy': np.__version__, 'repeat': repeat,
+        },
+        'results': results,
+        'scaling': scaling_exponents(results),
+    }
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Pairs up the cases that finished in both reports and returns rows of
+    (case, family, size, baseline seconds, seconds, ratio, verdict).
+    """
+    old = {(r['case'], r['family'], r['size']): r for r in baseline['results'] if r['status'] == 'ok'}
+    rows = []
+    for r in report['results']:
+        before = old.get((r['case'], r['family'], r['size']))
+        if r['status'] != 'ok' or before is None:
+            continue
+        ratio = r['seconds'] / before['seconds'] if before['seconds'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            verdict = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        rows.append((r['case'], r['family'], r['size'], before['seconds'], r['seconds'], ratio, verdict))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the resilience metrics and the rewiring strategies.")
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=CASES)
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=FAMILIES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=1, help="timed runs per case; the fastest is kept")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="seconds per case, setup included")
+    parser.add_argument('--output', default=os.path.join(PROJECT_DIR, "results", "benchmark.json"))
+    parser.add_argument('--baseline', help="earlier report to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.cases, args.families, args.sizes, repeat=args.repeat, timeout=args.timeout)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to '{args.output}'.")
+    print("\nScaling exponents (time ~ n^k):")
+    for case, by_family in report['scaling'].items():
+        print(f"  {case:<24} " + "  ".join(f"{family}={k:.2f}" for family, k in by_family.items()))
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, threshold=args.threshold)
+    print(f"\nComparison with '{args.baseline}':")
+    for case, family, n, before, after, ratio, verdict in rows:
+        print(f"  {case:<24} {family:<5} n={n:<8} {before:.4f}s -> {after:.4f}s  x{ratio:.2f}  {verdict}")
+    return 1 if any(row[-1] == 'regression' for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
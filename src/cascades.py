@@ -0,0 +1,181 @@
+# cascades.py
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from compact_graph import CompactGraph
+from instrumentation import counter, span
+from resilience_metrics import _betweenness_arrays, _brandes_accumulate, _brandes_batch_size, _brandes_block
+
+# Relative slack before a load counts as exceeding its capacity, so that
+# round-off in recomputed loads does not start a cascade on its own.
+OVERLOAD_RTOL = 1e-9
+
+class CascadeModel:
+    """
+    Motter-Lai cascades on one graph. The load of a node is its betweenness
+    (shortest paths between other nodes through it), computed with the same
+    batched Brandes kernel as calculate_omega_betweenness, and its capacity is
+    (1 + alpha) times its initial load.
+
+    The depth, path count and dependency of every node are kept per source
+    (n x sources arrays), as in adaptive_attacks. After a wave of failures
+    only the sources for which a failed node lay inside a shortest path
+    (non-zero dependency) are recomputed. For the others the failed nodes
+    were leaves of the shortest-path DAG: depths and path counts stay, and
+    only their share as targets is taken off the dependencies, by one
+    backward Brandes pass over the stored columns.
+
+    pivots: estimate loads from about that many sources (a fixed random set,
+    scaled up) instead of all of them.
+    """
+
+    def __init__(self, G, pivots=None, seed=None):
+        self.nodes = list(G.nodes())
+        self.A = _betweenness_arrays(G)[0]
+        n = len(self.nodes)
+        if pivots is None or pivots >= n:
+            self.is_source, self.scale = np.ones(n, dtype=bool), 1.0
+        else:
+            rate = pivots / n
+            self.is_source, self.scale = np.random.default_rng(seed).random(n) < rate, 1.0 / rate
+        self.sources = np.flatnonzero(self.is_source)
+        self.batch_size = _brandes_batch_size(n, self.A.nnz)
+        with span('cascade.initial_load', nodes=n):
+            self.initial_columns = self._columns(self.sources, np.ones(n, dtype=bool))
+        self.initial_load = self._load(self.initial_columns[2])
+
+    def _columns(self, sources, alive):
+        """Depth, path counts and dependencies from each source, n x len(sources)."""
+        n = len(self.nodes)
+        depth = np.full((n, len(sources)), -1, dtype=np.int64)
+        sigma, delta = np.zeros((n, len(sources))), np.zeros((n, len(sources)))
+        counter('cascade.recomputed_sources', sources=len(sources))
+        for start in range(0, len(sources), self.batch_size):
+            batch = sources[start:start + self.batch_size]
+            columns = slice(start, start + len(batch))
+            depth[:, columns], sigma[:, columns], delta[:, columns] = _brandes_block(self.A, batch, alive=alive)
+            delta[batch, np.arange(start, start + len(batch))] = 0.0
+        return depth, sigma, delta
+
+    def _load(self, delta):
+        return delta.sum(axis=1) * self.scale
+
+    def _components(self, alive):
+        A = self.A.multiply(alive[:, None]).multiply(alive[None, :]).tocsr()
+        # csgraph counts explicitly stored zeros as edges.
+        A.eliminate_zeros()
+        return connected_components(A, directed=False)[1]
+
+    def _remove(self, columns, alive_before, newly_failed):
+        """Updates the per-source columns in place once newly_failed have failed."""
+        depth, sigma, delta = columns
+        alive = alive_before.copy()
+        alive[newly_failed] = False
+        live = alive[self.sources]
+        stale = np.flatnonzero((delta[newly_failed] > 0).any(axis=0) & live)
+        leaves = np.flatnonzero(~(delta[newly_failed] > 0).any(axis=0) & live)
+        with span('cascade.update_load', failed=len(newly_failed), stale=len(stale), leaves=len(leaves)):
+            if len(leaves):
+                # Nothing else is reached through a leaf, so depths and path
+                # counts stay; only the paths ending at it leave the dependencies.
+                targets = (~alive & alive_before)[:, None].astype(np.float64)
+                for start in range(0, len(leaves), self.batch_size):
+                    part = leaves[start:start + self.batch_size]
+                    delta[:, part] -= _brandes_accumulate(self.A, depth[:, part], sigma[:, part], targets)
+                delta[self.sources[leaves], leaves] = 0.0
+            depth[newly_failed], sigma[newly_failed], delta[newly_failed] = -1, 0.0, 0.0
+            if len(stale):
+                depth[:, stale], sigma[:, stale], delta[:, stale] = self._columns(self.sources[stale], alive)
+            gone = np.flatnonzero(~live)
+            depth[:, gone], sigma[:, gone], delta[:, gone] = -1, 0.0, 0.0
+        return alive
+
+    def default_trigger(self):
+        """The initially most loaded node (index into node order)."""
+        return int(np.argmax(self.initial_load))
+
+    def cascade(self, alpha, trigger=None):
+        """
+        Removes the trigger node(s) and then, wave by wave, every node whose
+        load exceeds its capacity. Returns a dict with the number of failed
+        nodes, the number of waves, the fraction of nodes left in the largest
+        component (Motter-Lai's G) and the failed nodes in failure order.
+        """
+        return self.sweep([alpha], trigger=trigger)[0]
+
+    def sweep(self, alphas, trigger=None):
+        """
+        Runs cascade for every alpha at once. Alphas that fail the same nodes
+        share their states, and the per-source columns are copied only where
+        their cascades part, so at most len(alphas) copies are alive.
+        """
+        n = len(self.nodes)
+        trigger = [self.default_trigger()] if trigger is None else list(np.atleast_1d(trigger))
+        results = {}
+        # Each entry: columns for alive (before newly_failed fail), the failure
+        # order so far, the alphas following this branch and the waves run.
+        pending = [(tuple(array.copy() for array in self.initial_columns), np.ones(n, dtype=bool),
+                    list(trigger), list(trigger), sorted(set(alphas)), 0)]
+        while pending:
+            columns, alive, newly_failed, order, branch, waves = pending.pop()
+            alive = self._remove(columns, alive, newly_failed)
+            load = self._load(columns[2])
+            parts = {}
+            for alpha in branch:
+                capacity = (1 + alpha) * self.initial_load
+                overloaded = np.flatnonzero(alive & (load > capacity * (1 + OVERLOAD_RTOL) + OVERLOAD_RTOL))
+                parts.setdefault(tuple(overloaded.tolist()), []).append(alpha)
+            if () in parts:
+                labels = self._components(alive)
+                largest = np.bincount(labels[alive]).max() if alive.any() else 0
+                for alpha in parts.pop(()):
+                    results[alpha] = {
+                        'alpha': alpha, 'failed': len(order), 'waves': waves,
+                        'gcc_fraction': float(largest / n) if n else 0.0,
+                        'failed_nodes': [self.nodes[i] for i in order],
+                    }
+            for k, (overloaded, part) in enumerate(parts.items()):
+                # The last branch takes the columns over; the others get copies.
+                state = columns if k == len(parts) - 1 else tuple(array.copy() for array in columns)
+                pending.append((state, alive, list(overloaded), order + list(overloaded), part, waves + 1))
+        return [results[alpha] for alpha in alphas]
+
+def motter_lai_cascade(G, alpha=0.2, trigger=None, pivots=None, seed=None):
+    """
+    Simulates one Motter-Lai cascade started by removing trigger (a node, a
+    list of nodes, or by default the most loaded node). See CascadeModel.cascade.
+    """
+    return cascade_sweep(G, [alpha], trigger=trigger, pivots=pivots, seed=seed)[0]
+
+def cascade_sweep(G, alphas, trigger=None, pivots=None, seed=None):
+    """
+    Runs the cascade for every tolerance parameter in alphas on one shared
+    CascadeModel, so the initial loads and any state that several alpha
+    values pass through are computed once.
+    """
+    if G.number_of_nodes() == 0:
+        return [{'alpha': alpha, 'failed': 0, 'waves': 0, 'gcc_fraction': 0.0, 'failed_nodes': []} for alpha in alphas]
+    model = CascadeModel(G, pivots=pivots, seed=seed)
+    if trigger is not None:
+        index = {node: i for i, node in enumerate(model.nodes)}
+        trigger = [index[node] for node in (trigger if isinstance(trigger, (list, tuple, set)) else [trigger])]
+    return model.sweep(alphas, trigger=trigger)
+
+def cascade_sizes_per_step(G_original, strategy_func, num_edges_to_add, alphas=(0.2,), pivots=None, seed=None):
+    """
+    Runs a rewiring strategy like run_single_strategy_simulation and, before
+    the first and after every added edge, sweeps the cascade over alphas.
+    Returns (connectivity_history, cascades), where cascades[k] is the list of
+    sweep results after k added edges.
+    """
+    from resilience_calculator import run_single_strategy_simulation
+
+    cascades = [cascade_sweep(CompactGraph.from_networkx(G_original), alphas, pivots=pivots, seed=seed)]
+
+    def record(G, step):
+        cascades.append(cascade_sweep(G, alphas, pivots=pivots, seed=seed))
+
+    history = run_single_strategy_simulation(G_original, num_edges_to_add, strategy_func, on_step=record, verbose=False)
+    # A strategy that runs out of edges leaves the graph, and so the cascades, unchanged.
+    cascades.extend([cascades[-1]] * (len(history) - len(cascades)))
+    return history, cascades
@@ -0,0 +1,117 @@
+# cli.py
+"""
+Single entry point for the project:
+
+    python cli.py simulate --network power --edges 20
+    python cli.py metrics --generator create_er_graph --param n=100 --param p=0.04
+    python cli.py metrics --table
+    python cli.py attack --nodes 50 --no-plot
+    python cli.py serve --network power
+
+Only argparse is imported up front. Every subcommand imports what it needs
+when it runs, so matplotlib and pandas are loaded only by the paths that
+draw figures or print tables.
+"""
+import argparse
+import json
+import os
+import sys
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results")
+METRIC_NAMES = ('auc', 'omega_btn', 'omega_elec')
+
+def _param(text):
+    key, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got '{text}'")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+def _simulate(args):
+    import simulation_runner
+    simulation_runner.main(network=args.network, num_edges=args.edges, random_runs=args.random_runs,
+                           workers=args.workers, cache_dir=args.cache_dir,
+                           data_dir=args.data_dir or simulation_runner.DATA_DIR,
+                           plot=not args.no_plot, lookahead=args.lookahead, edges_per_step=args.edges_per_step)
+    return 0
+
+def _metrics(args):
+    if args.table:
+        import main_resilience
+        main_resilience.run_analysis(cache_dir=args.cache_dir, n_jobs=args.workers,
+                                     output=os.path.join(RESULTS_DIR, "resilience_sweep.csv"))
+        return 0
+    from sweep import METRICS, GraphSpec
+    G = GraphSpec(args.generator, **dict(args.param)).build()
+    cache = fingerprint = None
+    if args.cache_dir:
+        from metric_cache import MetricCache, graph_fingerprint
+        cache, fingerprint = MetricCache(args.cache_dir), graph_fingerprint(G)
+    result = {'nodes': G.number_of_nodes(), 'edges': G.number_of_edges()}
+    for metric in args.metrics:
+        func = METRICS[metric]
+        result[metric] = float(cache.compute(G, metric, func, fingerprint=fingerprint) if cache else func(G))
+    print(json.dumps(result))
+    return 0
+
+def _attack(args):
+    import main
+    main.main(num_nodes=args.nodes, visualize=not args.no_plot,
+              output=os.path.join(RESULTS_DIR, "network_comparison.png"))
+    return 0
+
+def _serve(args):
+    import whatif_service
+    argv = ['--network', args.network, '--host', args.host, '--port', str(args.port)]
+    if args.data_dir:
+        argv += ['--data-dir', args.data_dir]
+    return whatif_service.main(argv)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Network resilience simulations and metrics.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    simulate = commands.add_parser('simulate', help="compare the edge-addition strategies on a network")
+    simulate.add_argument('--network', default='power', help="power, yeast, ba, er, lattice or a file name in the data directory")
+    simulate.add_argument('--edges', type=int, default=20, help="edges to add")
+    simulate.add_argument('--random-runs', type=int, default=10, help="runs averaged for the Random strategy")
+    simulate.add_argument('--workers', type=int, default=None, help="worker processes (1: serial)")
+    simulate.add_argument('--cache-dir', default=os.path.join(RESULTS_DIR, "cache"))
+    simulate.add_argument('--data-dir', default=None, help="default: data/ next to src/")
+    simulate.add_argument('--no-plot', action='store_true')
+    simulate.add_argument('--lookahead', type=int, default=None, metavar='K',
+                          help="add the best of each strategy's top K edges by exact λ₂ gain")
+    simulate.add_argument('--edges-per-step', type=int, default=1, metavar='M',
+                          help="edges the Fiedler strategy adds per Fiedler vector update")
+    simulate.set_defaults(run=_simulate)
+
+    metrics = commands.add_parser('metrics', help="resilience metrics of a generated graph (JSON), or the full table")
+    metrics.add_argument('--generator', default='create_karate_club', help="a networks.py constructor")
+    metrics.add_argument('--param', type=_param, action='append', default=[], help="generator argument as key=value")
+    metrics.add_argument('--metrics', nargs='+', choices=METRIC_NAMES, default=list(METRIC_NAMES))
+    metrics.add_argument('--cache-dir', default=None)
+    metrics.add_argument('--table', action='store_true', help="run the benchmark-network sweep and print its table")
+    metrics.add_argument('--workers', type=int, default=None)
+    metrics.set_defaults(run=_metrics)
+
+    attack = commands.add_parser('attack', help="targeted attack, random failure, cascade and repair scenarios")
+    attack.add_argument('--nodes', type=int, default=50)
+    attack.add_argument('--no-plot', action='store_true')
+    attack.set_defaults(run=_attack)
+
+    serve = commands.add_parser('serve', help="what-if query service on localhost")
+    serve.add_argument('--network', default='power')
+    serve.add_argument('--data-dir', default=None, help="default: data/ next to src/")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.set_defaults(run=_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
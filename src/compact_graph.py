@@ -0,0 +1,369 @@
+# compact_graph.py
+import networkx as nx
+import numpy as np
+
+class _CsrRows:
+    """
+    Adjacency lists read straight from CSR arrays (e.g. memory-mapped .npy
+    files), which are never written to. A row is copied into a Python list,
+    the overlay, only when an edge is added to or removed from it.
+    """
+
+    __slots__ = ('indptr', 'indices', 'rows')
+
+    def __init__(self, indptr, indices, rows=None):
+        self.indptr, self.indices = indptr, indices
+        self.rows = {} if rows is None else rows
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, u):
+        row = self.rows.get(u)
+        if row is None:
+            return self.indices[self.indptr[u]:self.indptr[u + 1]].tolist()
+        return row
+
+    def __iter__(self):
+        return (self[u] for u in range(len(self)))
+
+    def mutable(self, u):
+        row = self.rows.get(u)
+        if row is None:
+            row = self.rows[u] = self[u]
+        return row
+
+    def copy(self):
+        return _CsrRows(self.indptr, self.indices, {u: list(row) for u, row in self.rows.items()})
+
+    def _entry_rows(self):
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+
+    def lengths(self):
+        lengths = np.diff(self.indptr).astype(np.int64)
+        for u, row in self.rows.items():
+            lengths[u] = len(row)
+        return lengths
+
+    def self_loops(self):
+        """Whether each node is its own neighbour."""
+        loops = np.zeros(len(self), dtype=bool)
+        loops[self.indices[self._entry_rows() == self.indices]] = True
+        for u, row in self.rows.items():
+            loops[u] = u in row
+        return loops
+
+    def to_arrays(self):
+        """indptr and indices with the overlay applied, as new arrays."""
+        if not self.rows:
+            return np.array(self.indptr, dtype=np.int64), np.array(self.indices, dtype=np.int64)
+        indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(self.lengths())
+        indices = np.empty(indptr[-1], dtype=np.int64)
+        entry_rows = self._entry_rows()
+        changed = np.fromiter(self.rows, dtype=np.int64, count=len(self.rows))
+        keep = ~np.isin(entry_rows, changed)
+        # Unchanged rows keep their offsets within the row.
+        offsets = np.arange(len(entry_rows)) - self.indptr[entry_rows]
+        indices[indptr[entry_rows[keep]] + offsets[keep]] = self.indices[keep]
+        for u, row in self.rows.items():
+            indices[indptr[u]:indptr[u + 1]] = row
+        return indptr, indices
+
+class CompactGraph:
+    """
+    Undirected simple graph on the integer nodes 0..n-1, stored as adjacency
+    arrays plus a hash set of edge keys. Edge membership is O(1), insertion is
+    O(1) and deletion is O(degree). Original node labels are kept in `labels`.
+    Edge weights other than 1 (the networkx 'weight' attribute) are kept by
+    edge key; they enter the Laplacian (to_csr(weight=True)), while degrees,
+    paths and betweenness stay unweighted, as in networkx.
+
+    A graph made by from_csr reads its adjacency from the given arrays and
+    only copies the rows it changes; the edge-key set is built the first
+    time an edge is looked up, added or removed.
+
+    It implements the part of the networkx Graph interface that the
+    simulation, the strategies and the metrics use (nodes, edges, adj,
+    degree, has_edge, add_edge, ...), so they can run on it directly. Convert
+    with from_networkx / to_networkx only at the boundaries.
+    """
+
+    __slots__ = ('_labels', '_adj', '_edge_keys', '_weights', 'version', '__weakref__')
+
+    def __init__(self, num_nodes=0, labels=None):
+        self.labels = list(range(num_nodes)) if labels is None else list(labels)
+        self._adj = [[] for _ in range(num_nodes)]
+        self._edge_keys = set()
+        self._weights = {}
+        # Counts the edges added and removed (see graph_version).
+        self.version = 0
+
+    @property
+    def labels(self):
+        # Labels given as an array (from_csr) become a list on first use.
+        if not isinstance(self._labels, list):
+            self._labels = self._labels.tolist() if isinstance(self._labels, np.ndarray) else list(self._labels)
+        return self._labels
+
+    @labels.setter
+    def labels(self, labels):
+        self._labels = labels
+
+    @classmethod
+    def from_networkx(cls, G):
+        """
+        Relabels G to 0..n-1 in G.nodes() order. Edges are inserted in
+        G.edges() order, which gives the same adjacency order (and so the same
+        tie-breaking) as nx.convert_node_labels_to_integers(G.copy()).
+        """
+        if isinstance(G, CompactGraph):
+            return G.copy()
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        graph = cls(len(labels), labels)
+        for u, v, weight in G.edges(data='weight', default=1):
+            graph.add_edge(index[u], index[v])
+            if weight != 1:
+                graph._weights[graph._key(index[u], index[v])] = float(weight)
+        return graph
+
+    @classmethod
+    def from_csr(cls, indptr, indices, labels=None, data=None):
+        """
+        Wraps a symmetric CSR structure without duplicates (as returned by
+        to_csr); each row is that node's adjacency list as is. The arrays are
+        used in place and never written to, so they can be memory-mapped.
+        data, if given, holds the edge weights (to_csr(weight=True).data).
+        """
+        graph = cls.__new__(cls)
+        graph._adj = _CsrRows(indptr, indices)
+        graph.labels = labels if labels is not None else range(len(indptr) - 1)
+        graph._edge_keys = None
+        graph._weights = {}
+        if data is not None:
+            n = len(indptr) - 1
+            rows = graph._adj._entry_rows()
+            weighted = np.flatnonzero((np.asarray(data) != 1) & (np.asarray(indices) >= rows))
+            keys = rows[weighted] * n + np.asarray(indices)[weighted]
+            graph._weights = dict(zip(keys.tolist(), np.asarray(data)[weighted].astype(np.float64).tolist()))
+        graph.version = 0
+        return graph
+
+    def _keys(self):
+        if self._edge_keys is None:
+            n = len(self._adj)
+            rows = self._adj._entry_rows()
+            indices = np.asarray(self._adj.indices)
+            later = indices >= rows
+            self._edge_keys = set((rows[later] * n + indices[later]).tolist())
+        return self._edge_keys
+
+    def _row(self, u):
+        # The list to change for node u.
+        adj = self._adj
+        return adj.mutable(u) if isinstance(adj, _CsrRows) else adj[u]
+
+    def to_networkx(self, relabel=True):
+        G = nx.Graph()
+        name = self.labels.__getitem__ if relabel else int
+        G.add_nodes_from(map(name, range(self.number_of_nodes())))
+        G.add_edges_from((name(u), name(v)) for u, v in self.edges())
+        for u, v in self.edges():
+            if self._key(u, v) in self._weights:
+                G[name(u)][name(v)]['weight'] = self._weights[self._key(u, v)]
+        return G
+
+    def copy(self):
+        graph = CompactGraph.__new__(CompactGraph)
+        graph.labels = list(self.labels)
+        if isinstance(self._adj, _CsrRows):
+            # The read-only arrays are shared; only the overlay is copied.
+            graph._adj = self._adj.copy()
+        else:
+            graph._adj = [list(neighbors) for neighbors in self._adj]
+        graph._edge_keys = set(self._edge_keys) if self._edge_keys is not None else None
+        graph._weights = dict(self._weights)
+        graph.version = self.version
+        return graph
+
+    def _key(self, u, v):
+        return u * len(self._adj) + v if u <= v else v * len(self._adj) + u
+
+    def __len__(self):
+        return len(self._adj)
+
+    def __iter__(self):
+        return iter(range(len(self._adj)))
+
+    def __contains__(self, node):
+        return isinstance(node, (int, np.integer)) and 0 <= node < len(self._adj)
+
+    def number_of_nodes(self):
+        return len(self._adj)
+
+    def number_of_edges(self):
+        if self._edge_keys is None:
+            # Unchanged CSR: every edge is listed twice, a self-loop once.
+            return int((len(self._adj.indices) + self._adj.self_loops().sum()) // 2)
+        return len(self._edge_keys)
+
+    def nodes(self):
+        return range(len(self._adj))
+
+    @property
+    def adj(self):
+        return self._adj
+
+    def neighbors(self, v):
+        return iter(self._adj[v])
+
+    def edges(self):
+        """Edges in networkx order: each node's later neighbours, in adjacency order."""
+        return [(u, v) for u, neighbors in enumerate(self._adj) for v in neighbors if v >= u]
+
+    def degree(self, v=None):
+        """Degree of v (a self-loop counts twice), or a list of (node, degree) pairs."""
+        if v is None:
+            if isinstance(self._adj, _CsrRows):
+                return list(enumerate(self.degrees().tolist()))
+            return [(u, self.degree(u)) for u in range(len(self._adj))]
+        row = self._adj[v]
+        loop = self._key(v, v) in self._edge_keys if self._edge_keys is not None else v in row
+        return len(row) + loop
+
+    def degrees(self):
+        if isinstance(self._adj, _CsrRows):
+            return self._adj.lengths() + self._adj.self_loops()
+        return np.array([self.degree(u) for u in range(len(self._adj))], dtype=np.int64)
+
+    def has_edge(self, u, v):
+        return self._key(u, v) in self._keys()
+
+    def weight(self, u, v):
+        """Weight of the edge (u, v); 1 unless it was given another one."""
+        return self._weights.get(self._key(u, v), 1.0)
+
+    def add_edge(self, u, v):
+        key = self._key(u, v)
+        keys = self._keys()
+        if key in keys:
+            return
+        keys.add(key)
+        self.version += 1
+        self._row(u).append(v)
+        if u != v:
+            self._row(v).append(u)
+
+    def remove_edge(self, u, v):
+        self._keys().remove(self._key(u, v))
+        self._weights.pop(self._key(u, v), None)
+        self.version += 1
+        self._row(u).remove(v)
+        if u != v:
+            self._row(v).remove(u)
+
+    def subgraph(self, nodes):
+        """Induced subgraph, relabelled to 0..k-1 in the given order."""
+        nodes = list(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        graph = CompactGraph(len(nodes), [self.labels[node] for node in nodes])
+        for u, v in self.edges():
+            if u in index and v in index:
+                graph.add_edge(index[u], index[v])
+                if self._key(u, v) in self._weights:
+                    graph._weights[graph._key(index[u], index[v])] = self._weights[self._key(u, v)]
+        return graph
+
+    def to_csr(self, weight=False):
+        """
+        Binary adjacency matrix; a self-loop is a 1 on the diagonal. With
+        weight=True the entries are the edge weights instead.
+        """
+        import scipy.sparse as sp
+        n = len(self._adj)
+        if isinstance(self._adj, _CsrRows):
+            indptr, indices = self._adj.to_arrays()
+        else:
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(neighbors) for neighbors in self._adj])
+            indices = np.fromiter((v for neighbors in self._adj for v in neighbors), dtype=np.int64, count=indptr[-1])
+        data = np.ones(len(indices))
+        if weight and self._weights:
+            rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+            keys = np.minimum(rows, indices) * n + np.maximum(rows, indices)
+            weighted = np.fromiter(self._weights, dtype=np.int64, count=len(self._weights))
+            order = np.argsort(weighted)
+            weighted = weighted[order]
+            values = np.fromiter(self._weights.values(), dtype=np.float64, count=len(self._weights))[order]
+            position = np.minimum(np.searchsorted(weighted, keys), len(weighted) - 1)
+            hit = weighted[position] == keys
+            data[hit] = values[position[hit]]
+        return sp.csr_array((data, indices, indptr), shape=(n, n))
+
+def adjacency_matrix(G):
+    """Unweighted adjacency matrix of a networkx graph or a CompactGraph, in node order."""
+    # scipy.sparse is imported where it is used, so that importing this module
+    # (e.g. for the metrics CLI) stays cheap.
+    import scipy.sparse as sp
+    if isinstance(G, CompactGraph):
+        return G.to_csr()
+    return sp.csr_array(nx.to_scipy_sparse_array(G, weight=None, dtype=np.float64))
+
+def laplacian_matrix(G):
+    """Laplacian of a networkx graph or a CompactGraph, honouring edge weights."""
+    import scipy.sparse as sp
+    if not isinstance(G, CompactGraph):
+        return nx.laplacian_matrix(G)
+    A = G.to_csr(weight=True)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    return sp.csr_array(sp.diags(np.asarray(A.sum(axis=1)).ravel()) - A)
+
+def component_labels(G):
+    """Returns (number of components, component label of every node in node order)."""
+    if G.number_of_nodes() == 0:
+        return 0, np.zeros(0, dtype=np.int64)
+    # Imported here: scipy.sparse.csgraph also loads scipy.sparse.linalg.
+    from scipy.sparse.csgraph import connected_components
+    return connected_components(adjacency_matrix(G), directed=False)
+
+def graph_version(G):
+    """
+    A value that changes whenever an edge of G is added or removed, so state
+    kept for G can tell it is stale. A CompactGraph counts its edits in O(1);
+    for a networkx graph the node and edge sets are hashed.
+    """
+    if isinstance(G, CompactGraph):
+        return G.version
+    return hash((frozenset(G.nodes()), frozenset(map(frozenset, G.edges()))))
+
+def is_connected(G):
+    if G.number_of_nodes() == 0:
+        raise nx.NetworkXPointlessConcept("Connectivity is undefined for the null graph.")
+    if not isinstance(G, CompactGraph):
+        return nx.is_connected(G)
+    return component_labels(G)[0] == 1
+
+def _copy_order(neighbors, rank, own_rank):
+    # Order of a neighbour list in G.copy(), which networkx rebuilds node by
+    # node: the earlier nodes by rank, then the later ones as given.
+    return sorted((w for w in neighbors if rank[w] < own_rank), key=rank.__getitem__) + \
+        [w for w in neighbors if rank[w] >= own_rank]
+
+def largest_component_nodes(G):
+    """
+    Nodes of the largest connected component (on ties, the one holding the
+    earliest node), in G's node order.
+    """
+    if isinstance(G, CompactGraph):
+        _, labels = component_labels(G)
+        return np.flatnonzero(labels == np.argmax(np.bincount(labels))).tolist()
+    component = max(nx.connected_components(G), key=len)
+    return [node for node in G if node in component]
+
+def largest_component(G):
+    """Subgraph induced by the largest connected component, as a copy of the same type."""
+    if not isinstance(G, CompactGraph):
+        return G.subgraph(max(nx.connected_components(G), key=len)).copy()
+    return G.subgraph(largest_component_nodes(G))
@@ -0,0 +1,227 @@
+# graph_store.py
+import ast
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from compact_graph import CompactGraph
+from metric_cache import _write_json
+
+# Lines parsed per chunk when streaming an edge list.
+CHUNK_LINES = 1_000_000
+# Bumped whenever the layout of a cached bundle changes.
+BUNDLE_VERSION = 1
+BUNDLE_ARRAYS = ('indptr', 'indices', 'labels', 'lcc_indptr', 'lcc_indices', 'lcc_labels')
+
+def _csr_from_edges(n, u, v):
+    """
+    CSR arrays of the graph built by adding the edges (u[i], v[i]) one by one
+    to an nx.Graph: each row lists its neighbours in insertion order, and a
+    repeated edge keeps its first position.
+    """
+    u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+    _, first = np.unique(np.minimum(u, v) * n + np.maximum(u, v), return_index=True)
+    first.sort()
+    u, v = u[first], v[first]
+    rows = np.column_stack([u, v]).ravel()
+    cols = np.column_stack([v, u]).ravel()
+    # A self-loop is listed once, in its own row.
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1::2] = u != v
+    rows, cols = rows[keep], cols[keep]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(rows, minlength=n))
+    return indptr, cols[np.argsort(rows, kind='stable')]
+
+def _edge_order(indptr, indices):
+    """Edges in G.edges() order: each node's later neighbours, in row order."""
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    later = indices >= rows
+    return rows[later], indices[later]
+
+def _canonical_csr(n, u, v):
+    """
+    CSR arrays with the adjacency order of CompactGraph.from_networkx (and of
+    G.copy()) for the graph that nx.Graph builds from the edge sequence.
+    """
+    return _csr_from_edges(n, *_edge_order(*_csr_from_edges(n, u, v)))
+
+def _largest_component_csr(indptr, indices, labels):
+    """CSR arrays and labels of the largest component, as in compact_graph.largest_component."""
+    n = len(indptr) - 1
+    if n == 0:
+        return indptr, indices, labels
+    A = sp.csr_array((np.ones(len(indices)), indices, indptr), shape=(n, n))
+    from scipy.sparse.csgraph import connected_components
+    _, component = connected_components(A, directed=False)
+    keep = component == np.argmax(np.bincount(component))
+    nodes = np.flatnonzero(keep)
+    position = np.full(n, -1, dtype=np.int64)
+    position[nodes] = np.arange(len(nodes))
+    u, v = _edge_order(indptr, indices)
+    inside = keep[u] & keep[v]
+    lcc_indptr, lcc_indices = _csr_from_edges(len(nodes), position[u[inside]], position[v[inside]])
+    return lcc_indptr, lcc_indices, labels[nodes]
+
+def _edge_fields(line):
+    """The two node fields of an edge-list line (none for comments and short lines)."""
+    fields = line.split('#', 1)[0].split()
+    if len(fields) < 2:
+        return []
+    if len(fields) > 2:
+        try:
+            dict(ast.literal_eval(" ".join(fields[2:])))
+        except Exception as err:
+            raise TypeError(f"Failed to convert edge data ({fields[2:]}) to dictionary.") from err
+    return fields[:2]
+
+def read_edgelist_csr(path, nodetype=int, chunk_lines=CHUNK_LINES):
+    """
+    Streams a whitespace-separated edge list (as read by nx.read_edgelist) in
+    chunks of lines and returns (indptr, indices, labels). Nodes are relabelled
+    0..n-1 in order of first appearance, which is the node order networkx
+    gives, and the adjacency order is that of CompactGraph.from_networkx.
+    As in nx.read_edgelist, comments (from '#') and lines with fewer than two
+    fields are skipped, and extra columns must be an edge-data dict, which is
+    ignored; anything else raises TypeError.
+    """
+    chunk_labels, chunk_codes = [], []
+    with open(path) as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_lines))
+            if not lines:
+                break
+            text = ''.join(lines)
+            # Every line is checked: matching totals alone let a wide line
+            # and a blank one cancel out.
+            if '#' not in text and all(len(line.split()) == 2 for line in lines):
+                tokens = text.split()
+            else:
+                # Slow path for comments, short lines and extra columns.
+                tokens = list(itertools.chain.from_iterable(map(_edge_fields, lines)))
+            if not tokens:
+                continue
+            values = np.array(list(map(nodetype, tokens)))
+            # Each chunk keeps its distinct labels in order of first appearance
+            # and the tokens as positions in that list.
+            unique, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            chunk_labels.append(unique[order])
+            chunk_codes.append(rank[inverse.ravel()])
+    if not chunk_labels:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.zeros(1, dtype=np.int64), empty, np.array([], dtype=np.int64 if nodetype is int else str)
+    # Merging the per-chunk lists in chunk order gives the global order of
+    # first appearance.
+    merged = np.concatenate(chunk_labels)
+    unique, first, inverse = np.unique(merged, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    ids = rank[inverse.ravel()]
+    offsets = np.cumsum([0] + [len(labels) for labels in chunk_labels])
+    codes = np.concatenate([ids[offset + local] for offset, local in zip(offsets, chunk_codes)])
+    indptr, indices = _canonical_csr(len(unique), codes[0::2], codes[1::2])
+    return indptr, indices, unique[order]
+
+def read_gml_csr(path):
+    """Parses a GML file with networkx (nodes labelled by id) into (indptr, indices, labels)."""
+    G = CompactGraph.from_networkx(nx.read_gml(path, label='id'))
+    csr = G.to_csr()
+    return csr.indptr.astype(np.int64), csr.indices.astype(np.int64), np.array(G.labels)
+
+def source_hash(path, nodetype=int):
+    """Hash of the file contents and of everything else the parsed arrays depend on."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{BUNDLE_VERSION}:{nodetype.__name__}:".encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _source_stamp(path, nodetype):
+    """Size and modification time of the file, with what else the hash covers."""
+    info = os.stat(path)
+    return {'size': info.st_size, 'mtime_ns': info.st_mtime_ns, 'nodetype': nodetype.__name__,
+            'version': BUNDLE_VERSION}
+
+def _cached_hash(stamp_path, stamp):
+    """The source hash recorded next to the bundles, if the file has not changed since."""
+    try:
+        with open(stamp_path) as f:
+            recorded = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return recorded.get('hash') if recorded.get('stamp') == stamp else None
+
+def _write_bundle(directory, arrays):
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    # Written into a temporary directory and renamed, so a reader never sees
+    # a half-written bundle.
+    staging = tempfile.mkdtemp(dir=parent)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array, allow_pickle=False)
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Another process stored the same bundle first.
+        for name in arrays:
+            os.remove(os.path.join(staging, f"{name}.npy"))
+        os.rmdir(staging)
+
+def _read_bundle(directory):
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+            for name in BUNDLE_ARRAYS}
+
+def load_bundle(path, nodetype=int, cache_dir=None):
+    """
+    Returns the CSR arrays of the graph in path (an edge list, or GML if the
+    name ends in .gml) and of its largest component, as a dict with the keys
+    in BUNDLE_ARRAYS. The arrays are cached as .npy files under cache_dir
+    (default: .graph_cache next to the file), keyed by the hash of the file,
+    and later calls memory-map them instead of parsing the file again. The
+    file is only hashed again when its size or modification time changed.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.graph_cache')
+    name = os.path.basename(path)
+    stamp = _source_stamp(path, nodetype)
+    stamp_path = os.path.join(cache_dir, f"{name}-{nodetype.__name__}.stamp.json")
+    digest = _cached_hash(stamp_path, stamp)
+    if digest is not None and os.path.isdir(os.path.join(cache_dir, f"{name}-{digest}")):
+        return _read_bundle(os.path.join(cache_dir, f"{name}-{digest}"))
+    digest = source_hash(path, nodetype)
+    directory = os.path.join(cache_dir, f"{name}-{digest}")
+    if os.path.isdir(directory):
+        _write_json(stamp_path, {'stamp': stamp, 'hash': digest})
+        return _read_bundle(directory)
+    if path.endswith('.gml'):
+        indptr, indices, labels = read_gml_csr(path)
+    else:
+        indptr, indices, labels = read_edgelist_csr(path, nodetype=nodetype)
+    lcc_indptr, lcc_indices, lcc_labels = _largest_component_csr(indptr, indices, labels)
+    arrays = dict(zip(BUNDLE_ARRAYS, (indptr, indices, labels, lcc_indptr, lcc_indices, lcc_labels)))
+    if labels.dtype == object:
+        # Mixed label types cannot be stored without pickling.
+        return arrays
+    _write_bundle(directory, arrays)
+    _write_json(stamp_path, {'stamp': stamp, 'hash': digest})
+    return _read_bundle(directory)
+
+def load_graph(path, nodetype=int, largest_component=False, cache_dir=None):
+    """
+    Loads the graph in path (or its largest connected component) as a
+    CompactGraph through the binary cache of load_bundle. The graph reads
+    the memory-mapped arrays in place.
+    """
+    bundle = load_bundle(path, nodetype=nodetype, cache_dir=cache_dir)
+    prefix = 'lcc_' if largest_component else ''
+    return CompactGraph.from_csr(bundle[prefix + 'indptr'], bundle[prefix + 'indices'], bundle[prefix + 'labels'])
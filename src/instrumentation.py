@@ -0,0 +1,169 @@
+# instrumentation.py
+import atexit
+import json
+import os
+from multiprocessing import util
+import threading
+import time
+import tracemalloc
+
+# Setting this variable to a file path switches tracing on at import time
+# (.json: Chrome trace, anything else: JSON lines).
+TRACE_ENV = 'RESILIENCE_TRACE'
+# Setting this variable to 1 also records allocations through tracemalloc.
+TRACE_MEMORY_ENV = 'RESILIENCE_TRACE_MEMORY'
+# JSON-lines events are written out in batches of this many.
+FLUSH_EVERY = 1000
+
+class _NullSpan:
+    """What span() returns while tracing is off: does nothing, costs almost nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, tracer, name, fields):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        """Adds fields known only once the work is done (e.g. iteration counts)."""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        if self.tracer.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self.tracer.memory_stack
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            stack.append([current, current])
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        end = time.perf_counter()
+        if self.tracer.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            start_current, span_peak = self.tracer.memory_stack.pop()
+            span_peak = max(span_peak, peak)
+            if self.tracer.memory_stack:
+                parent = self.tracer.memory_stack[-1]
+                parent[1] = max(parent[1], span_peak)
+            self.fields['alloc_bytes'] = current - start_current
+            self.fields['peak_bytes'] = span_peak - start_current
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.tracer.emit({'name': self.name, 'ph': 'X', 'ts': self.tracer.micros(self.start),
+                          'dur': (end - self.start) * 1e6, 'args': self.fields})
+        return False
+
+class Tracer:
+    """
+    Collects timed spans and counters. JSON-lines output is appended to the
+    file in batches; Chrome-trace output (viewable in chrome://tracing or
+    Perfetto) is written when the tracer is closed.
+    """
+
+    def __init__(self, path, format=None, trace_memory=False):
+        self.path = path
+        self.format = format or ('chrome' if path.endswith('.json') else 'jsonl')
+        self.trace_memory = trace_memory
+        self.memory_stack = []
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.format == 'jsonl':
+            open(path, 'w').close()
+
+    def micros(self, t):
+        return (t - self.origin) * 1e6
+
+    def emit(self, event):
+        event['pid'] = self.pid
+        event['tid'] = threading.get_ident()
+        with self.lock:
+            self.events.append(event)
+            if self.format == 'jsonl' and len(self.events) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        with open(self.path, 'a') as f:
+            f.writelines(json.dumps(event, default=str) + '\n' for event in self.events)
+        self.events = []
+
+    def close(self):
+        with self.lock:
+            if self.format == 'jsonl':
+                self._flush()
+            else:
+                with open(self.path, 'w') as f:
+                    json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f, default=str)
+        if self.trace_memory:
+            tracemalloc.stop()
+
+_tracer = None
+
+def enable(path, format=None, trace_memory=False):
+    """Starts tracing to path ('jsonl' or 'chrome' format; by default from the extension)."""
+    global _tracer
+    disable()
+    _tracer = Tracer(path, format=format, trace_memory=trace_memory)
+    return _tracer
+
+def disable():
+    """Stops tracing and writes out the remaining events."""
+    global _tracer
+    if _tracer is not None:
+        tracer, _tracer = _tracer, None
+        if tracer.pid == os.getpid():
+            tracer.close()
+
+def enabled():
+    return _tracer is not None
+
+def _current():
+    global _tracer
+    if _tracer is not None and _tracer.pid != os.getpid():
+        # A forked worker writes its own file next to the parent's.
+        root, ext = os.path.splitext(_tracer.path)
+        _tracer = Tracer(f"{root}.{os.getpid()}{ext}", format=_tracer.format, trace_memory=_tracer.trace_memory)
+        # Pool workers leave through os._exit, which skips atexit but runs
+        # multiprocessing finalizers.
+        util.Finalize(None, disable, exitpriority=10)
+    return _tracer
+
+def span(name, **fields):
+    """
+    Context manager timing a phase:
+
+        with span('lambda2_update', step=i) as s:
+            ...
+            s.set(iterations=k)
+    """
+    tracer = _current()
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, fields)
+
+def counter(name, **values):
+    """Records numeric values (e.g. solver iterations) at this point in time."""
+    tracer = _current()
+    if tracer is not None:
+        tracer.emit({'name': name, 'ph': 'C', 'ts': tracer.micros(time.perf_counter()), 'args': values})
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV], trace_memory=os.environ.get(TRACE_MEMORY_ENV) == '1')
+atexit.register(disable)
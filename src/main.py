@@ -1,7 +1,13 @@
+import os
 import networkx as nx
-import matplotlib.pyplot as plt
 import random
 import copy
+from adaptive_attacks import adaptive_attack_order
+from cascades import cascade_sweep
+from repair_engine import repair_after_failures
+from resilience_metrics import random_failure_ensemble
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # --- بخش 1: توابع اصلی و کمکی ---
 
@@ -35,52 +41,56 @@ def calculate_resilience_metrics(G):
 
 def visualize_network(G, title, pos=None, ax=None):
     """بصری‌سازی گراف شبکه."""
+    # matplotlib فقط هنگام رسم بارگذاری می‌شود
+    import matplotlib.pyplot as plt
+    from plotting import draw_network, graph_layout
     if pos is None:
-        pos = nx.spring_layout(G, seed=42)
+        pos = graph_layout(G)
     if ax is None:
         plt.figure(figsize=(10, 8))
         ax = plt.gca()
     
-    nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=500, edge_color='gray', ax=ax)
-    ax.set_title(title, fontsize=16)
+    draw_network(G, pos, ax, title)
     return pos
 
 # --- بخش 2: پیاده‌سازی سه استراتژی مختلف ---
 
 # استراتژی 1: روش پیشنهادی شما (خرابی هدفمند + ترمیم هوشمند)
-def simulate_proposed_method(G_original):
-    """شبیه‌سازی خرابی گره بحرانی و ترمیم هوشمند."""
-    G = G_original.copy()
-    
-    # پیدا کردن گره بحرانی
-    centrality = nx.betweenness_centrality(G)
-    critical_node = max(centrality, key=centrality.get)
-    print(f"\n--- شروع روش پیشنهادی: گره بحرانی {critical_node} حذف می‌شود ---")
-    
-    neighbors = list(G.neighbors(critical_node))
-    G.remove_node(critical_node)
+def simulate_proposed_method(G_original, num_failures=1, policy='star'):
+    """شبیه‌سازی خرابی هم‌زمان گره‌های بحرانی و ترمیم هوشمند.
+
+    num_failures: تعداد گره‌های با بالاترین مرکزیت بینابینی که هم‌زمان از کار می‌افتند.
+    policy: 'star' یا 'chain'؛ نحوه اتصال قطعات جدا شده (repair_engine.repair_after_failures).
+    """
+    # پیدا کردن گره‌های بحرانی
+    centrality = nx.betweenness_centrality(G_original)
+    critical_nodes = sorted(centrality, key=centrality.get, reverse=True)[:num_failures]
+    print(f"\n--- شروع روش پیشنهادی: گره‌های بحرانی {critical_nodes} حذف می‌شوند ---")
     
-    # استراتژی ترمیم: اتصال مجدد همسایگان گره حذف شده
+    # استراتژی ترمیم: مولفه‌ها یک بار برچسب‌گذاری می‌شوند و قطعات جدا شده
+    # با کمترین تعداد یال دوباره به هم وصل می‌شوند
     print("اجرای استراتژی ترمیم هوشمند...")
-    for i in range(len(neighbors)):
-        for j in range(i + 1, len(neighbors)):
-            u, v = neighbors[i], neighbors[j]
-            if not G.has_edge(u, v):
-                # اگر مسیری بین دو همسایه وجود نداشته باشد، یک یال مستقیم اضافه کن
-                if not nx.has_path(G, u, v):
-                    print(f"ایجاد یال ترمیمی بین {u} و {v}")
-                    G.add_edge(u, v)
+    G, repairs = repair_after_failures(G_original, critical_nodes, policy=policy)
+    for u, v in repairs:
+        print(f"ایجاد یال ترمیمی بین {u} و {v}")
     return G
 
 # استراتژی 2: حمله به سبک مقاله Nature 2000 (حذف مهم‌ترین گره‌ها بدون ترمیم)
-def simulate_nature_attack(G_original, num_nodes_to_remove=1):
-    """شبیه‌سازی حمله هدفمند به گره‌های با بالاترین درجه (بدون ترمیم)."""
+def simulate_nature_attack(G_original, num_nodes_to_remove=1, adaptive_score=None):
+    """شبیه‌سازی حمله هدفمند به گره‌های با بالاترین درجه (بدون ترمیم).
+
+    adaptive_score: None برای حمله ایستا، یا 'degree'، 'ci' یا 'betweenness'
+    برای حمله تطبیقی که امتیازها را پس از هر حذف به‌روز می‌کند.
+    """
     G = G_original.copy()
     print(f"\n--- شروع حمله Nature: حذف {num_nodes_to_remove} گره با بالاترین درجه ---")
     
-    # پیدا کردن گره‌ها با بالاترین درجه
-    node_degrees = sorted(G.degree, key=lambda x: x[1], reverse=True)
-    nodes_to_remove = [node for node, degree in node_degrees[:num_nodes_to_remove]]
+    if adaptive_score is not None:
+        nodes_to_remove = adaptive_attack_order(G, score=adaptive_score, num_nodes=num_nodes_to_remove)
+    else:
+        # پیدا کردن گره‌ها با بالاترین درجه
+        node_degrees = sorted(G.degree, key=lambda x: x[1], reverse=True)
+        nodes_to_remove = [node for node, degree in node_degrees[:num_nodes_to_remove]]
     
     print(f"گره‌های هدف برای حذف: {nodes_to_remove}")
     G.remove_nodes_from(nodes_to_remove)
@@ -97,24 +107,38 @@ def simulate_random_failure(G_original, failure_percentage=0.20):
     G.remove_edges_from(edges_to_remove)
     return G
 
+def simulate_random_failure_ensemble(G_original, failure_percentage=0.20, realizations=1000, seed=42, n_jobs=1):
+    """تکرار خرابی تصادفی یال‌ها در تعداد زیادی نمونه مستقل و گزارش میانگین و بازه اطمینان."""
+    print(f"\n--- مجموعه خرابی تصادفی: {realizations} نمونه، حذف {failure_percentage*100}% یال‌ها ---")
+    result = random_failure_ensemble(G_original, fractions=[failure_percentage], realizations=realizations,
+                                     seed=seed, n_jobs=n_jobs)
+    level = result['confidence'] * 100
+    for label, key in (("اندازه بزرگترین مولفه", 'gcc'), ("تعداد مولفه‌ها", 'components')):
+        low, high = result[f'{key}_ci'][:, 0]
+        print(f"{label}: میانگین {result[f'{key}_mean'][0]:.2f} (بازه اطمینان {level:.0f}٪: {low:.2f} تا {high:.2f})")
+    return result
+
+def simulate_cascade(G, alphas=(0.1, 0.3, 0.5)):
+    """آبشار خرابی Motter-Lai با حذف پربارترین گره، برای چند مقدار پارامتر تحمل α."""
+    print(f"\n--- آبشار خرابی Motter-Lai (α = {', '.join(str(a) for a in alphas)}) ---")
+    results = cascade_sweep(G, alphas)
+    for result in results:
+        print(f"α={result['alpha']}: {result['failed']} گره در {result['waves']} موج از کار افتاد، "
+              f"سهم بزرگترین مولفه: {result['gcc_fraction']:.3f}")
+    return results
+
 # --- بخش 3: اجرای شبیه‌سازی و مقایسه نتایج ---
 
-if __name__ == "__main__":
+def main(num_nodes=50, visualize=True, output=os.path.join(PROJECT_DIR, "results", "network_comparison.png")):
     # 1. ایجاد شبکه پایه
-    original_network = create_complex_network()
-    initial_pos = nx.spring_layout(original_network, seed=42) # موقعیت اولیه برای هماهنگی نمودارها
+    original_network = create_complex_network(num_nodes)
     
-    # 2. کپی کردن شبکه برای هر سناریو
-    network_proposed = original_network.copy()
-    network_nature = original_network.copy()
-    network_random = original_network.copy()
-
-    # 3. اجرای هر سه شبیه‌سازی
-    final_proposed = simulate_proposed_method(network_proposed)
-    final_nature = simulate_nature_attack(network_nature, num_nodes_to_remove=1) # مقایسه حذف 1 گره
-    final_random = simulate_random_failure(network_random, failure_percentage=0.20)
+    # 2. اجرای هر سه شبیه‌سازی (هر تابع خودش یک کپی از شبکه می‌سازد)
+    final_proposed = simulate_proposed_method(original_network)
+    final_nature = simulate_nature_attack(original_network, num_nodes_to_remove=1) # مقایسه حذف 1 گره
+    final_random = simulate_random_failure(original_network, failure_percentage=0.20)
     
-    # 4. ارزیابی نتایج
+    # 3. ارزیابی نتایج
     print("\n\n" + "="*30)
     print(" نتایج ارزیابی تاب‌آوری ".center(30, "="))
     print("="*30)
@@ -135,6 +159,11 @@ if __name__ == "__main__":
     
     print("\n۳. نتیجه خرابی تصادفی (حذف ۲۰٪ یال‌ها):")
     print(metrics_random)
+    # یک نمونه تصادفی از نظر آماری کافی نیست؛ میانگین روی نمونه‌های زیاد گزارش می‌شود
+    simulate_random_failure_ensemble(original_network, failure_percentage=0.20, realizations=1000)
+    # بار گره‌ها (بینابینی) پس از هر حذف دوباره پخش می‌شود و ممکن است خرابی را گسترش دهد
+    simulate_cascade(original_network)
+    simulate_cascade(final_proposed)
     
     print("\n" + "="*30)
     print(" تحلیل مقایسه‌ای ".center(30, "="))
@@ -150,7 +179,12 @@ if __name__ == "__main__":
     if not metrics_random["is_connected"]:
         print(">> تحلیل: حذف تصادفی ۲۰٪ یال‌ها نیز باعث از هم پاشیدگی شبکه شد.")
 
-    # 5. بصری‌سازی نتایج
+    # 4. بصری‌سازی نتایج
+    if not visualize:
+        return
+    import matplotlib.pyplot as plt
+    from plotting import finish_figure, graph_layout
+    initial_pos = graph_layout(original_network) # موقعیت اولیه برای هماهنگی نمودارها
     fig, axes = plt.subplots(2, 2, figsize=(20, 16))
     fig.suptitle("مقایسه استراتژی‌های تاب‌آوری شبکه", fontsize=20)
     
@@ -160,4 +194,8 @@ if __name__ == "__main__":
     visualize_network(final_random, "3. پس از خرابی تصادفی (حذف 20% یال)", pos=initial_pos, ax=axes[1, 1])
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.show()
+    # در حالت بدون نمایشگر (RESILIENCE_HEADLESS=1) شکل فقط ذخیره می‌شود
+    finish_figure(fig, output)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,70 @@
-    # main.py
-    import networks
-    import resilience_metrics
-    import pandas as pd
+# main.py
+import os
+from sweep import GraphSpec, expand_grid, pq, run_sweep
+
+# Column of the results table for each metric.
+METRIC_COLUMNS = {'auc': "AUC", 'omega_btn': "Omega_btn", 'omega_elec': "Omega_elec"}
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "results")
+# Streamed results of the last sweep (Parquet when pyarrow is installed).
+RESULTS_FILE = os.path.join(RESULTS_DIR, "resilience_sweep.parquet" if pq is not None else "resilience_sweep.csv")
 
-    def run_analysis():
-        """
-        Runs the full analysis for all benchmark networks and prints the results table.
-        """
-        network_constructors = {
-            "Karate Club": networks.create_karate_club,
-            "Star Graph (N=20)": networks.create_star_graph,
-            "Complete Graph (N=20)": networks.create_complete_graph,
-            "Grid 2D (5x5)": networks.create_grid_2d_graph,
-            "ER (N=100, p=0.04)": networks.create_er_graph,
-            "BA (N=100, m=2)": networks.create_ba_graph,
-            "WS (N=100, k=4, p=0.1)": networks.create_ws_graph,
-            # "US Power Grid": networks.load_power_grid, # Uncomment if you have the data file
-            # "Yeast": networks.load_yeast_protein, # Uncomment if you have the data file
-        }
+def benchmark_networks():
+    """The single-instance benchmark networks of the results table."""
+    return [
+        GraphSpec('create_karate_club', name="Karate Club"),
+        GraphSpec('create_star_graph', name="Star Graph (N=20)"),
+        GraphSpec('create_complete_graph', name="Complete Graph (N=20)"),
+        GraphSpec('create_grid_2d_graph', name="Grid 2D (5x5)"),
+        GraphSpec('create_er_graph', name="ER (N=100, p=0.04)"),
+        GraphSpec('create_ba_graph', name="BA (N=100, m=2)"),
+        GraphSpec('create_ws_graph', name="WS (N=100, k=4, p=0.1)"),
+        # GraphSpec('load_power_grid', name="US Power Grid"), # Uncomment if you have the data file
+        # GraphSpec('load_yeast_protein', name="Yeast"), # Uncomment if you have the data file
+    ]
 
-        results = []
+def ensemble_networks(sizes=(100, 1000), seeds=range(10)):
+    """Example ensemble study: ER, BA and WS graphs over sizes and seeds."""
+    return (expand_grid('create_er_graph', name="ER (N={n}, p={p}, seed={seed})", n=sizes, p=[0.04], seed=seeds)
+            + expand_grid('create_ba_graph', name="BA (N={n}, m={m}, seed={seed})", n=sizes, m=[2], seed=seeds)
+            + expand_grid('create_ws_graph', name="WS (N={n}, k={k}, p={p}, seed={seed})", n=sizes, k=[4], p=[0.1], seed=seeds))
+
+def run_analysis(cache_dir=os.path.join(RESULTS_DIR, "cache"), specs=None, output=RESULTS_FILE, n_jobs=None, timeout=None, retries=1):
+    """
+    Runs the full analysis for all benchmark networks (or the given GraphSpecs,
+    e.g. from sweep.expand_grid) and prints the results table.
+    The cells are computed in parallel by sweep.run_sweep and streamed to
+    output; cells already in output are not recomputed. Metric values are
+    also cached in cache_dir (None disables the cache), so graphs that have
+    not changed are not recomputed on later runs.
+    """
+    import pandas as pd
+    specs = benchmark_networks() if specs is None else specs
+    rows = run_sweep(specs, metrics=list(METRIC_COLUMNS), output=output, n_jobs=n_jobs,
+                     timeout=timeout, retries=retries, cache_dir=cache_dir)
+    cells = {(row['network'], row['metric']): row for row in rows}
 
-        for name, constructor_func in network_constructors.items():
-            print(f"Analyzing {name}...")
-            G = constructor_func()
-            
-            auc = resilience_metrics.simulate_targeted_attack(G)
-            omega_btn = resilience_metrics.calculate_omega_betweenness(G)
-            omega_elec = resilience_metrics.calculate_omega_electrical(G)
-            
-            results.append({
-                "Network": name,
-                "AUC": f"{auc:.6f}",
-                "Omega_btn": f"{omega_btn:.6f}" if not pd.isna(omega_btn) else "NaN",
-                "Omega_elec": f"{omega_elec:.6f}"
-            })
-        
-        # Create and print a pandas DataFrame for nice formatting
-        df = pd.DataFrame(results)
-        print("\n" + "="*60)
-        print("           Final Resilience Metrics Results")
-        print("="*60)
-        print(df.to_string(index=False))
-        print("="*60)
+    results = []
+    for spec in specs:
+        result = {"Network": spec.name}
+        for metric, column in METRIC_COLUMNS.items():
+            row = cells.get((spec.name, metric))
+            if row is None or row['status'] != 'ok':
+                result[column] = row['status'] if row else "missing"
+            else:
+                result[column] = f"{row['value']:.6f}" if not pd.isna(row['value']) else "NaN"
+        results.append(result)
+    
+    # Create and print a pandas DataFrame for nice formatting
+    df = pd.DataFrame(results)
+    print("\n" + "="*60)
+    print("           Final Resilience Metrics Results")
+    print("="*60)
+    print(df.to_string(index=False))
+    print("="*60)
+    return df
 
-    if __name__ == "__main__":
-        # Ensure you have the necessary libraries installed:
-        # pip install networkx numpy scipy pandas
-        run_analysis()
+if __name__ == "__main__":
+    # Ensure you have the necessary libraries installed:
+    # pip install networkx numpy scipy pandas
+    run_analysis()
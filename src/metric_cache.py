@@ -0,0 +1,116 @@
+# metric_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import networkx as nx
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# Default bound on the total size of a cache directory, in bytes.
+MAX_CACHE_BYTES = 256 * 2**20
+
+def graph_fingerprint(G):
+    """
+    Hash of the graph's weighted adjacency matrix in node order. It does not
+    depend on node labels or on the order of the adjacency lists, so two
+    graphs with the same fingerprint give the same metric values.
+    """
+    if isinstance(G, CompactGraph):
+        A = G.to_csr(weight=True)
+    else:
+        A = nx.to_scipy_sparse_array(G, weight='weight', dtype=np.float64, format='csr')
+    A.sort_indices()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.int64(A.shape[0]).tobytes())
+    for array in (A.indptr.astype(np.int64), A.indices.astype(np.int64), A.data.astype(np.float64)):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def _write_json(path, value):
+    # Written to a temporary file and renamed, so an interrupted run never
+    # leaves a truncated file behind.
+    handle, staging = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(handle, 'w') as f:
+        json.dump(value, f)
+    os.replace(staging, path)
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class MetricCache:
+    """
+    On-disk cache of metric values (numbers, lists or dicts of them), one JSON
+    file per entry. Entries are keyed by the graph fingerprint, the metric
+    name and its parameters. When the directory grows beyond max_bytes, the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint, metric, **params):
+        text = json.dumps([fingerprint, metric, _to_json(params)], sort_keys=True, default=str)
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+        # The modification time doubles as the last-used time for eviction.
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        _write_json(self._path(key), _to_json(value))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def compute(self, G, metric, func, fingerprint=None, **params):
+        """
+        Returns func(G, **params), read from the cache if it was computed before
+        for the same graph, metric and parameters.
+        """
+        key = self.key(fingerprint or graph_fingerprint(G), metric, **params)
+        value = self.get(key)
+        if value is None:
+            value = func(G, **params)
+            self.put(key, value)
+        return value
@@ -1,33 +1,193 @@
-    # src/plotting.py
-    import matplotlib.pyplot as plt
-    import os
-
-    def plot_and_save_results(results, network_name, num_nodes, num_edges, num_edges_added, output_dir="results"):
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"[INFO] پوشه '{output_dir}' برای ذخیره نتایج ایجاد شد.")
-        plt.style.use('seaborn-v0_8-whitegrid')
-        fig, ax = plt.subplots(figsize=(14, 9))
-        markers = ['o', 's', 'D', '^']
-        colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
-        strategy_order = ["PCM (Ours)", "High Betweenness", "Hub (High Degree)", "Random"]
-        for i, name in enumerate(strategy_order):
-            if name in results:
-                history = results[name]
-                plot_range = range(min(len(history), num_edges_added + 1))
-                ax.plot(plot_range, history[:len(plot_range)], marker=markers[i], linestyle='-', label=name, color=colors[i], markersize=8, linewidth=2.5)
-        ax.set_xlabel("تعداد یال‌های اضافه شده (هزینه)", fontsize=16, fontweight='bold')
-        ax.set_ylabel("اتصال جبری (λ₂) - مقاومت شبکه", fontsize=16, fontweight='bold')
-        title = f"مقایسه استراتژی‌های مقاوم‌سازی برای شبکه {network_name.upper()}\n" \
-                f"({num_nodes} گره, {num_edges} یال اولیه)"
-        ax.set_title(title, fontsize=18, fontweight='bold')
-        ax.legend(fontsize=14, title="استراتژی‌ها", title_fontsize='15')
-        ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        plt.xticks(fontsize=12)
-        plt.yticks(fontsize=12)
-        plt.xticks(range(0, num_edges_added + 1, max(1, num_edges_added // 10)))
-        plt.tight_layout()
-        output_filename = os.path.join(output_dir, f"simulation_results_{network_name}.png")
-        plt.savefig(output_filename, dpi=300, bbox_inches='tight')
-        print(f"\n[SUCCESS] نمودار نتایج در فایل '{output_filename}' ذخیره شد.")
+# src/plotting.py
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import networkx as nx
+import numpy as np
+
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+from compact_graph import adjacency_matrix
+from metric_cache import graph_fingerprint
+
+# '1' renders without a window (Agg backend, plt.show() is skipped), '0'
+# always shows the figures; unset, figures are shown only if there is a display.
+HEADLESS_ENV = 'RESILIENCE_HEADLESS'
+# Worker processes that render figures in the background.
+RENDER_WORKERS = 1
+# Node positions are cached here, one file per graph fingerprint.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYOUT_CACHE_DIR = os.path.join(PROJECT_DIR, "results", "cache", "layouts")
+# Above this many nodes spring_layout (O(n²) per iteration) gives way to
+# pivot MDS, which needs one BFS per pivot.
+SPRING_MAX_NODES = 1000
+# Pivots (BFS sources) of the pivot MDS layout.
+LAYOUT_PIVOTS = 50
+# Above this many nodes graphs are drawn as one edge collection and one node
+# scatter, without labels, instead of through nx.draw.
+NX_DRAW_MAX_NODES = 300
+# History curves longer than this are downsampled before plotting.
+MAX_CURVE_POINTS = 1000
+
+def headless():
+    setting = os.environ.get(HEADLESS_ENV)
+    if setting is not None:
+        return setting == '1'
+    return sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+if headless():
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+def finish_figure(fig, path=None, dpi=150, show=True):
+    """
+    Saves the figure if a path is given, then shows it, or just closes it when
+    headless or with show=False (render workers never open a window).
+    """
+    if path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    if headless() or not show:
+        plt.close(fig)
+    else:
         plt.show()
+
+_render_pool = None
+
+def render_in_background(func, *args, **kwargs):
+    """Runs a rendering function in the render worker pool and returns its future."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _render_pool.submit(func, *args, **kwargs)
+
+def wait_for_renders():
+    """Waits for the figures still being rendered in the background."""
+    global _render_pool
+    if _render_pool is not None:
+        pool, _render_pool = _render_pool, None
+        pool.shutdown(wait=True)
+
+def _pivot_mds(A, pivots, rng):
+    """
+    Pivot MDS (Brandes & Pich) of a connected graph: classical MDS on the hop
+    distances from a few spread-out pivots, each the node farthest from the
+    pivots chosen so far. Returns coordinates scaled to [-1, 1].
+    """
+    n = A.shape[0]
+    if n <= 2:
+        return np.array([[0.0, 0.0], [1.0, 0.0]])[:n]
+    k = min(pivots, n)
+    D = np.empty((k, n))
+    nearest = np.full(n, np.inf)
+    pivot = int(rng.integers(n))
+    for i in range(k):
+        D[i] = shortest_path(A, unweighted=True, indices=pivot, directed=False)
+        nearest = np.minimum(nearest, D[i])
+        pivot = int(np.argmax(nearest))
+    D2 = D ** 2
+    C = -0.5 * (D2 - D2.mean(axis=1, keepdims=True) - D2.mean(axis=0, keepdims=True) + D2.mean())
+    U, S, _ = np.linalg.svd(C.T, full_matrices=False)
+    return nx.rescale_layout(U[:, :2] * S[:2])
+
+def _pivot_mds_layout(G, pivots=LAYOUT_PIVOTS, seed=42):
+    """
+    Lays out every component with pivot MDS in a square of side sqrt(size),
+    and packs the squares in rows, largest first.
+    """
+    A = adjacency_matrix(G)
+    rng = np.random.default_rng(seed)
+    count, labels = connected_components(A, directed=False)
+    sizes = np.bincount(labels, minlength=count)
+    members = np.split(np.argsort(labels, kind='stable'), np.cumsum(sizes)[:-1])
+    sides = np.sqrt(sizes)
+    width = np.sqrt((sides ** 2).sum())
+    coordinates = np.zeros((A.shape[0], 2))
+    x = y = row_height = 0.0
+    for c in np.argsort(-sizes, kind='stable'):
+        if x > 0 and x + sides[c] > width:
+            x, y, row_height = 0.0, y - row_height, 0.0
+        nodes = members[c]
+        local = _pivot_mds(A[nodes][:, nodes], pivots, rng)
+        coordinates[nodes] = (local + 1) * sides[c] / 2 * 0.9 + [x, y - sides[c]]
+        x += sides[c]
+        row_height = max(row_height, sides[c])
+    return dict(zip(G.nodes(), nx.rescale_layout(coordinates)))
+
+def graph_layout(G, seed=42, cache_dir=LAYOUT_CACHE_DIR):
+    """
+    Node positions of G, read from the cache when a graph with the same
+    fingerprint was laid out before (cache_dir=None disables the cache).
+    """
+    nodes = list(G.nodes())
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"{graph_fingerprint(G)}-{seed}.npy")
+        if os.path.exists(path):
+            return dict(zip(nodes, np.load(path)))
+    if len(nodes) <= SPRING_MAX_NODES:
+        pos = nx.spring_layout(G, seed=seed)
+    else:
+        pos = _pivot_mds_layout(G, seed=seed)
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(path, np.array([pos[node] for node in nodes]))
+    return pos
+
+def draw_network(G, pos, ax, title=None):
+    """Draws G with nx.draw when it is small, and as collections when it is large."""
+    if G.number_of_nodes() <= NX_DRAW_MAX_NODES:
+        nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=500, edge_color='gray', ax=ax)
+    else:
+        segments = np.array([(pos[u], pos[v]) for u, v in G.edges()]).reshape(-1, 2, 2)
+        ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.3, alpha=0.6, rasterized=True))
+        xy = np.array([pos[node] for node in G.nodes()])
+        ax.scatter(xy[:, 0], xy[:, 1], s=4, c='skyblue', edgecolors='none', rasterized=True, zorder=2)
+        ax.autoscale_view()
+        ax.set_axis_off()
+    if title:
+        ax.set_title(title, fontsize=16)
+
+def _downsample(history, max_points=MAX_CURVE_POINTS):
+    """x positions and values of a curve, thinned to at most max_points (endpoints kept)."""
+    if len(history) <= max_points:
+        return np.arange(len(history)), np.asarray(history)
+    x = np.unique(np.linspace(0, len(history) - 1, max_points).round().astype(int))
+    return x, np.asarray(history)[x]
+
+def plot_and_save_results(results, network_name, num_nodes, num_edges, num_edges_added, output_dir="results", dpi=300, background=False, show=True):
+    # With background=True the figure is rendered in the render pool, without
+    # a window, and a future is returned; see wait_for_renders.
+    if background:
+        return render_in_background(plot_and_save_results, results, network_name, num_nodes, num_edges,
+                                    num_edges_added, output_dir=output_dir, dpi=dpi, show=False)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"[INFO] پوشه '{output_dir}' برای ذخیره نتایج ایجاد شد.")
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(14, 9))
+    markers = ['o', 's', 'D', '^', 'v']
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+    strategy_order = ["PCM (Ours)", "High Betweenness", "Hub (High Degree)", "Random", "Fiedler (λ₂ gain)"]
+    for i, name in enumerate(strategy_order):
+        if name in results:
+            x, values = _downsample(results[name][:num_edges_added + 1])
+            ax.plot(x, values, marker=markers[i], linestyle='-', label=name, color=colors[i], markersize=8, linewidth=2.5,
+                    markevery=max(1, len(x) // 50))
+    ax.set_xlabel("تعداد یال‌های اضافه شده (هزینه)", fontsize=16, fontweight='bold')
+    ax.set_ylabel("اتصال جبری (λ₂) - مقاومت شبکه", fontsize=16, fontweight='bold')
+    title = f"مقایسه استراتژی‌های مقاوم‌سازی برای شبکه {network_name.upper()}\n" \
+            f"({num_nodes} گره, {num_edges} یال اولیه)"
+    ax.set_title(title, fontsize=18, fontweight='bold')
+    ax.legend(fontsize=14, title="استراتژی‌ها", title_fontsize='15')
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+    ax.tick_params(labelsize=12)
+    ax.set_xticks(range(0, num_edges_added + 1, max(1, num_edges_added // 10)))
+    fig.tight_layout()
+    output_filename = os.path.join(output_dir, f"simulation_results_{network_name}.png")
+    fig.savefig(output_filename, dpi=dpi, bbox_inches='tight')
+    print(f"\n[SUCCESS] نمودار نتایج در فایل '{output_filename}' ذخیره شد.")
+    finish_figure(fig, show=show)
+    return output_filename
@@ -0,0 +1,81 @@
+# repair_engine.py
+from compact_graph import component_labels
+
+def _failure_clusters(G, failed_nodes):
+    """
+    Groups the failed nodes into clusters that are connected in G, in order
+    of failed_nodes. The survivors around a cluster were connected through it,
+    so each cluster is repaired as a whole.
+    """
+    failed = set(failed_nodes)
+    seen, clusters = set(), []
+    for start in failed_nodes:
+        if start in seen:
+            continue
+        seen.add(start)
+        cluster = [start]
+        for node in cluster:
+            for neighbor in G.adj[node]:
+                if neighbor in failed and neighbor not in seen:
+                    seen.add(neighbor)
+                    cluster.append(neighbor)
+        clusters.append(cluster)
+    return clusters
+
+def _boundary(G, cluster, failed):
+    """Surviving neighbours of a cluster, in adjacency order, without repeats."""
+    boundary, seen = [], set()
+    for node in cluster:
+        for neighbor in G.adj[node]:
+            if neighbor not in failed and neighbor not in seen:
+                seen.add(neighbor)
+                boundary.append(neighbor)
+    return boundary
+
+def repair_after_failures(G, failed_nodes, policy='star'):
+    """
+    Removes failed_nodes from a copy of G and reconnects the fragments their
+    loss split apart, with the fewest repair edges: one per fragment beyond
+    the first around every failure cluster.
+
+    Components are labelled once after the removal. A union-find over the
+    component labels keeps track of which fragments the repairs have joined.
+    policy: 'star' links each fragment to the first surviving neighbour of the
+    cluster. 'chain' links it to the previously linked fragment, which spreads
+    the new edges over more nodes.
+    Returns (repaired graph, list of repair edges).
+    """
+    if policy not in ('star', 'chain'):
+        raise ValueError(f"Unknown repair policy: {policy}")
+    failed_nodes = list(dict.fromkeys(failed_nodes))
+    failed = set(failed_nodes)
+    H = G.copy()
+    # Boundaries are read from the copy, so the repair edges follow its
+    # adjacency order, as the pairwise neighbour loop did.
+    boundaries = [_boundary(H, cluster, failed) for cluster in _failure_clusters(H, failed_nodes)]
+    H.remove_nodes_from(failed_nodes)
+    position = {node: i for i, node in enumerate(H.nodes())}
+    _, labels = component_labels(H)
+    parent = list(range(int(labels.max()) + 1 if len(labels) else 0))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    repairs = []
+    for boundary in boundaries:
+        if not boundary:
+            continue
+        anchor = boundary[0]
+        for node in boundary[1:]:
+            root_anchor, root_node = find(labels[position[anchor]]), find(labels[position[node]])
+            if root_anchor == root_node:
+                continue
+            H.add_edge(anchor, node)
+            repairs.append((anchor, node))
+            parent[root_node] = root_anchor
+            if policy == 'chain':
+                anchor = node
+    return H, repairs
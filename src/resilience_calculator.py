@@ -1,92 +1,835 @@
-    # src/resilience_calculator.py
-    import networkx as nx
-    import numpy as np
-    import random
-    import time
-
-    def calculate_algebraic_connectivity(G):
-        if not nx.is_connected(G):
-            return 0.0
-        try:
-            laplacian = nx.laplacian_matrix(G).asfptype()
-            eigenvalues = np.linalg.eigvalsh(laplacian.toarray())
-            return max(0, eigenvalues[1])
-        except Exception as e:
-            print(f"  [Warning] خطا در محاسبه λ₂: {e}. مقدار 0.0 برگردانده شد.")
-            return 0.0
-
-    def pcm_strategy(G_in):
-        G = G_in.copy()
-        if G.number_of_nodes() < 2: return None
-        subgraph = G
-        if not nx.is_connected(G):
-            largest_cc_nodes = max(nx.connected_components(G), key=len)
-            subgraph = G.subgraph(largest_cc_nodes).copy()
-        if subgraph.number_of_nodes() < 2: return None
-        all_paths_lengths = dict(nx.all_pairs_shortest_path_length(subgraph))
-        max_len, start_node, end_node = -1, -1, -1
-        for source, paths in all_paths_lengths.items():
-            for target, length in paths.items():
-                if length > max_len and not G.has_edge(source, target):
-                    max_len, start_node, end_node = length, source, target
-        if start_node != -1 and end_node != -1:
-            return (start_node, end_node)
+# src/resilience_calculator.py
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, eigsh, splu
+from scipy.linalg import orth
+from concurrent.futures import ThreadPoolExecutor
+import bisect
+import functools
+import heapq
+import json
+import random
+import time
+import weakref
+from compact_graph import (CompactGraph, _copy_order, adjacency_matrix, graph_version, is_connected,
+                           largest_component_nodes, laplacian_matrix)
+from instrumentation import counter, span
+from metric_cache import _write_json, graph_fingerprint
+from resilience_metrics import _brandes_accumulate, _brandes_batch_size, _brandes_block
+
+# Graphs up to this size use a dense eigendecomposition; larger ones use the
+# sparse shift-invert Lanczos solver.
+DENSE_MAX_NODES = 1000
+# Graphs larger than this estimate betweenness from this many pivot sources.
+BETWEENNESS_PIVOTS = 200
+# Shift for the shift-invert solver. It must stay negative so that L - σI is
+# positive definite, and small so that 0 and λ₂ are the best separated eigenvalues.
+SPARSE_SHIFT = -1e-6
+
+def _laplacian(G):
+    return sp.csc_matrix(laplacian_matrix(G), dtype=np.float64)
+
+def _sparse_fiedler_pair(L, tol=1e-10, v0=None):
+    n = L.shape[0]
+    if v0 is not None:
+        # The solver looks for both the constant vector and the Fiedler vector,
+        # so the warm start carries a component of each.
+        v0 = np.asarray(v0, dtype=np.float64) + 1.0 / np.sqrt(n)
+    eigenvalues, eigenvectors = eigsh(L, k=2, sigma=SPARSE_SHIFT, which='LM', v0=v0, tol=tol)
+    order = np.argsort(eigenvalues)
+    fiedler = eigenvectors[:, order[1]]
+    fiedler = fiedler - fiedler.mean()
+    return max(0.0, eigenvalues[order[1]]), fiedler / np.linalg.norm(fiedler)
+
+def calculate_fiedler_pair(G, method='auto', tol=1e-10, v0=None):
+    """
+    Returns (λ₂, Fiedler vector) of G, with the vector indexed in G.nodes() order.
+    method: 'dense', 'sparse' or 'auto'. tol and the warm start v0 (e.g. the
+    previous Fiedler vector) are only used by the sparse solver.
+    """
+    n = G.number_of_nodes()
+    if n < 2 or not is_connected(G):
+        return 0.0, None
+    if method == 'auto':
+        method = 'dense' if n <= DENSE_MAX_NODES else 'sparse'
+    L = _laplacian(G)
+    if method == 'dense':
+        eigenvalues, eigenvectors = np.linalg.eigh(L.toarray())
+        return max(0.0, eigenvalues[1]), eigenvectors[:, 1]
+    if method == 'sparse':
+        if n <= 2:
+            return calculate_fiedler_pair(G, method='dense')
+        return _sparse_fiedler_pair(L, tol=tol, v0=v0)
+    raise ValueError(f"Unknown method: {method}")
+
+def _safe_fiedler_pair(G, method='auto', tol=1e-10, v0=None):
+    try:
+        return calculate_fiedler_pair(G, method=method, tol=tol, v0=v0)
+    except Exception as e:
+        print(f"  [Warning] خطا در محاسبه λ₂: {e}. مقدار 0.0 برگردانده شد.")
+        return 0.0, None
+
+def calculate_algebraic_connectivity(G, method='auto', tol=1e-10, v0=None):
+    return _safe_fiedler_pair(G, method=method, tol=tol, v0=v0)[0]
+
+def _woodbury_solve(lu, X, updates, solved_updates, capacitance):
+    # (A + B Bᵀ)⁻¹ X = A⁻¹X - Z (I + Bᵀ Z)⁻¹ Bᵀ A⁻¹X, with A = L₀ - σI and Z = A⁻¹B.
+    Y = lu.solve(X)
+    if updates:
+        i, j = np.array(updates).T
+        correction = np.linalg.solve(capacitance, Y[i] - Y[j])
+        Y = Y - solved_updates @ correction
+    return Y
+
+class ConnectivityTracker:
+    """
+    Keeps the low end of the Laplacian spectrum (λ₂ ... λ_{k+1}) and the Fiedler
+    vector of a graph up to date while edges are added one at a time.
+
+    Adding an edge changes L by the rank-1 term b bᵀ with b = e_u - e_v. The LU
+    factorization of L - σI from the last full solve is kept, and the edges
+    added since are folded in with the Woodbury identity. This gives exact
+    shift-invert solves with the current Laplacian, which refine the previous
+    eigenvectors in a few subspace iterations. The result is accepted only if
+    its residual gives an eigenvalue error bound of at most tol and the new λ₂
+    respects the interlacing bound λ₂ ≤ λ₂' ≤ λ₃. Otherwise, or after
+    max_updates edges, a full solve is done.
+    """
+
+    def __init__(self, G, k=3, tol=1e-8, refine_iters=20, max_updates=50, method='auto'):
+        self.nodes = list(G.nodes())
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.k = k
+        self.tol = tol
+        self.refine_iters = refine_iters
+        self.max_updates = max_updates
+        self.method = method
+        self.L = _laplacian(G).tocsr()
+        self.num_edges = G.number_of_edges()
+        self.version = graph_version(G)
+        self.self_loops = {i for i, node in enumerate(self.nodes) if G.has_edge(node, node)}
+        self.full_solves = 0
+        self.incremental_updates = 0
+        self._full_solve()
+
+    def matches(self, G):
+        return self.version == graph_version(G)
+
+    @property
+    def algebraic_connectivity(self):
+        return self.eigenvalues[0] if self.eigenvalues is not None else 0.0
+
+    @property
+    def fiedler_vector(self):
+        return self.basis[:, 0] if self.basis is not None else None
+
+    def _full_solve(self):
+        with span('connectivity.full_solve', nodes=self.L.shape[0]):
+            self.full_solves += 1
+            self.eigenvalues, self.basis, self._lu = None, None, None
+            self._updates, self._solved_updates, self._capacitance = [], None, None
+            n = self.L.shape[0]
+            if n < 2 or connected_components(self.L, directed=False, return_labels=False) > 1:
+                return
+            k = min(self.k, n - 2) if n > 2 else 1
+            method = self.method
+            if method == 'auto':
+                method = 'dense' if n <= DENSE_MAX_NODES else 'sparse'
+            if method == 'dense' or k + 1 >= n - 1:
+                eigenvalues, eigenvectors = np.linalg.eigh(self.L.toarray())
+                self.eigenvalues, self.basis = eigenvalues[1:k + 1], eigenvectors[:, 1:k + 1]
+            else:
+                eigenvalues, eigenvectors = eigsh(self.L, k=k + 1, sigma=SPARSE_SHIFT, which='LM', tol=self.tol)
+                order = np.argsort(eigenvalues)[1:]
+                self.eigenvalues, self.basis = eigenvalues[order], eigenvectors[:, order]
+            self._lu = splu(sp.csc_matrix(self.L - SPARSE_SHIFT * sp.identity(n)))
+
+    def _shift_invert(self, X):
+        return _woodbury_solve(self._lu, X, self._updates, self._solved_updates, self._capacitance)
+
+    def _record_update(self, i, j):
+        b = np.zeros(self.L.shape[0])
+        b[i], b[j] = 1.0, -1.0
+        z = self._lu.solve(b)
+        self._update_vector = b
+        self._updates.append((i, j))
+        Z = z[:, None] if self._solved_updates is None else np.column_stack([self._solved_updates, z])
+        rows, cols = np.array(self._updates).T
+        self._solved_updates = Z
+        self._capacitance = np.eye(len(self._updates)) + (Z[rows] - Z[cols]).T
+
+    def _subspace_iteration(self, apply_L, shift_invert, direction):
+        """
+        Refines the current basis for the Laplacian applied by apply_L. Returns
+        the Ritz values, the refined block and the error bound of the first one.
+        """
+        k = self.basis.shape[1]
+        X = self.basis
+        # LOBPCG-style subspace: current block, its shift-invert image and the
+        # last search direction. The first direction is (L' - σI)⁻¹b, along
+        # which a rank-1 update moves the eigenvectors.
+        P = shift_invert(direction)[:, None]
+        for iteration in range(1, self.refine_iters + 1):
+            S = np.column_stack([X, shift_invert(X), P])
+            S = orth(S - S.mean(axis=0))
+            eigenvalues, W = np.linalg.eigh(S.T @ apply_L(S))
+            X_next = S @ W[:, :k]
+            P, X = X_next - X @ (X.T @ X_next), X_next
+            eigenvalues = eigenvalues[:k]
+            residual = np.linalg.norm(apply_L(X[:, 0]) - eigenvalues[0] * X[:, 0])
+            # Residual bound |θ - λ| ≤ ‖r‖, tightened to ‖r‖²/gap when the Ritz
+            # value is separated from the rest of the block.
+            gap = eigenvalues[1] - eigenvalues[0] - residual if k > 1 else 0.0
+            error_bound = min(residual, residual ** 2 / gap) if gap > 0 else residual
+            if error_bound <= self.tol:
+                break
+        return eigenvalues, X, error_bound, iteration
+
+    def _interlaces(self, value):
+        # Adding an edge gives λ₂ ≤ λ₂' ≤ λ₃.
+        upper = self.eigenvalues[1] if len(self.eigenvalues) > 1 else np.inf
+        return self.eigenvalues[0] - self.tol <= value <= upper + self.tol
+
+    def _refine(self):
+        eigenvalues, X, error_bound, iteration = self._subspace_iteration(
+            lambda Y: self.L @ Y, self._shift_invert, self._update_vector)
+        counter('connectivity.refine', iterations=iteration, error_bound=float(error_bound))
+        if error_bound > self.tol or not self._interlaces(eigenvalues[0]):
+            return False
+        self.eigenvalues, self.basis = eigenvalues, X
+        self.incremental_updates += 1
+        return True
+
+    def _dense_method(self):
+        n = self.L.shape[0]
+        return self.method == 'dense' or (self.method == 'auto' and n <= DENSE_MAX_NODES) or n <= self.k + 2
+
+    def _exact_with_edge(self, i, j, operator=None, shift_invert=None):
+        # Full solve for one hypothetical edge. Only the Laplacian is copied,
+        # and the shared factorization is reused as the shift-invert operator.
+        n = self.L.shape[0]
+        if self._dense_method():
+            L = self.L.toarray()
+            L[[i, j], [i, j]] += 1.0
+            L[[i, j], [j, i]] -= 1.0
+            return float(max(0.0, np.linalg.eigvalsh(L)[1]))
+        if shift_invert is None:
+            update = sp.csr_matrix(([1.0, 1.0, -1.0, -1.0], ([i, j, i, j], [i, j, j, i])), shape=self.L.shape)
+            return _sparse_fiedler_pair(sp.csc_matrix(self.L + update), tol=self.tol)[0]
+        eigenvalues = eigsh(LinearOperator((n, n), matvec=operator, dtype=np.float64), k=2,
+                            sigma=SPARSE_SHIFT, which='LM', tol=self.tol, return_eigenvectors=False,
+                            OPinv=LinearOperator((n, n), matvec=shift_invert, dtype=np.float64),
+                            v0=self.basis[:, 0] + 1.0 / np.sqrt(n))
+        return float(max(0.0, np.sort(eigenvalues)[1]))
+
+    def _connectivity_with_edge(self, i, j, labels=None):
+        if i == j or self.L[i, j] != 0:
+            return self.algebraic_connectivity
+        if self.basis is None:
+            # Disconnected: the edge can only help if it joins the last two components.
+            if labels is None or labels.max() != 1 or labels[i] == labels[j]:
+                return 0.0
+            return self._exact_with_edge(i, j)
+        b = np.zeros(self.L.shape[0])
+        b[i], b[j] = 1.0, -1.0
+        updates = self._updates + [(i, j)]
+        z = self._lu.solve(b)
+        Z = z[:, None] if self._solved_updates is None else np.column_stack([self._solved_updates, z])
+        rows, cols = np.array(updates).T
+        capacitance = np.eye(len(updates)) + (Z[rows] - Z[cols]).T
+
+        def shift_invert(X):
+            return _woodbury_solve(self._lu, X, updates, Z, capacitance)
+
+        def apply_L(X):
+            Y = self.L @ X
+            d = X[i] - X[j]
+            Y[i] += d
+            Y[j] -= d
+            return Y
+
+        eigenvalues, _, error_bound, iteration = self._subspace_iteration(apply_L, shift_invert, b)
+        counter('connectivity.lookahead_refine', iterations=iteration, error_bound=float(error_bound))
+        if error_bound <= self.tol and self._interlaces(eigenvalues[0]):
+            return float(eigenvalues[0])
+        return self._exact_with_edge(i, j, apply_L, shift_invert)
+
+    def connectivity_with_edges(self, edges, workers=None):
+        """
+        λ₂ after adding each of the edges on its own, without changing the
+        tracker. Every candidate is one more Woodbury term on the shared LU of
+        L - σI, refined from the current eigenvectors like add_edge does; the
+        candidates are evaluated in a thread pool of the given size.
+        """
+        pairs = [(self.index[u], self.index[v]) for u, v in edges]
+        labels = None
+        if self.basis is None and self.L.shape[0] > 1:
+            labels = connected_components(self.L, directed=False)[1]
+        with span('connectivity.lookahead', candidates=len(pairs)):
+            if workers == 1 or len(pairs) < 2:
+                return [self._connectivity_with_edge(i, j, labels) for i, j in pairs]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(lambda pair: self._connectivity_with_edge(*pair, labels), pairs))
+
+    def add_edge(self, u, v):
+        """Applies G.add_edge(u, v) to the tracked spectrum and returns the new λ₂."""
+        i, j = self.index[u], self.index[v]
+        if i == j:
+            # A self-loop leaves the Laplacian unchanged.
+            if i not in self.self_loops:
+                self.self_loops.add(i)
+                self.num_edges += 1
+            return self.algebraic_connectivity
+        if self.L[i, j] != 0:
+            return self.algebraic_connectivity
+        self.num_edges += 1
+        update = sp.csr_matrix(([1.0, 1.0, -1.0, -1.0], ([i, j, i, j], [i, j, j, i])), shape=self.L.shape)
+        self.L = self.L + update
+        if self.basis is None or len(self._updates) >= self.max_updates:
+            self._full_solve()
+            return self.algebraic_connectivity
+        self._record_update(i, j)
+        if not self._refine():
+            self._full_solve()
+        return self.algebraic_connectivity
+
+class PeripheralPairIndex:
+    """
+    Finds the pair of nodes pcm_strategy connects (the first node in node order
+    whose eccentricity equals the diameter, and the first node a BFS from it
+    reaches at that distance) without all-pairs shortest paths.
+
+    Eccentricities are bracketed by lower/upper bounds that are tightened with
+    single BFS sweeps (double-sweep / iFUB style), so memory stays O(n + m).
+    Adding an edge can only shrink eccentricities, so the upper bounds stay
+    valid across insertions and only the lower bounds are reset.
+    """
+
+    def __init__(self, G, nodes=None):
+        # nodes restricts the index to the subgraph they induce (one component).
+        self.nodes = list(G.nodes()) if nodes is None else list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        # The all-pairs scan ran on G.copy(), which rebuilds adjacency node by
+        # node: each list holds the earlier nodes in node order, then the
+        # later ones in G's adjacency order. A component (its nodes in G's
+        # node order) is copied once more, which reorders the same way. BFS
+        # visits neighbours in that order, so it reaches the same endpoint first.
+        rank = self.index if nodes is None else {node: i for i, node in enumerate(G.nodes())}
+        self.adj, self.num_earlier = [], []
+        for i, node in enumerate(self.nodes):
+            neighbors = _copy_order(G.adj[node], rank, rank[node])
+            if nodes is not None:
+                neighbors = _copy_order([w for w in neighbors if w in self.index], self.index, i)
+            neighbors = [self.index[w] for w in neighbors]
+            self.adj.append(neighbors)
+            self.num_earlier.append(sum(1 for j in neighbors if j < i))
+        self.num_edges = G.number_of_edges()
+        self.version = graph_version(G)
+        n = len(self.nodes)
+        self.lower = np.zeros(n, dtype=np.int64)
+        self.upper = np.full(n, max(n - 1, 0), dtype=np.int64)
+        self.bfs_count = 0
+
+    def matches(self, G):
+        return self.version == graph_version(G)
+
+    def add_edge(self, u, v):
+        i, j = sorted((self.index[u], self.index[v]))
+        if j in self.adj[i]:
+            return
+        # The later node goes to the end, as in G.adj; the earlier one into
+        # the sorted head of the later node's list, as in G.copy().
+        self.adj[i].append(j)
+        if i != j:
+            self.adj[j].insert(bisect.bisect_left(self.adj[j], i, 0, self.num_earlier[j]), i)
+            self.num_earlier[j] += 1
+        self.num_edges += 1
+        self.lower[:] = 0
+
+    def _bfs(self, source):
+        self.bfs_count += 1
+        adj = self.adj
+        dist = [-1] * len(adj)
+        dist[source] = 0
+        level, depth = [source], 0
+        while True:
+            next_level = []
+            for v in level:
+                for w in adj[v]:
+                    if dist[w] < 0:
+                        dist[w] = depth + 1
+                        next_level.append(w)
+            if not next_level:
+                return np.array(dist, dtype=np.int64), depth, level[0]
+            level, depth = next_level, depth + 1
+
+    def _sweep(self, source):
+        dist, ecc, farthest = self._bfs(source)
+        np.maximum(self.lower, np.maximum(dist, ecc - dist), out=self.lower)
+        np.minimum(self.upper, dist + ecc, out=self.upper)
+        self.lower[source] = self.upper[source] = ecc
+        return ecc, farthest
+
+    def diameter(self):
+        # Bounding-diameters loop: alternate between the node with the largest
+        # upper bound and the one with the smallest lower bound until no node
+        # can still exceed the best known eccentricity.
+        pick_high = True
+        while True:
+            best = self.lower.max()
+            candidates = np.flatnonzero(self.upper > best)
+            if len(candidates) == 0:
+                return int(best)
+            if pick_high:
+                source = candidates[np.argmax(self.upper[candidates])]
+            else:
+                source = candidates[np.argmin(self.lower[candidates])]
+            pick_high = not pick_high
+            self._sweep(source)
+
+    def farthest_pair(self):
+        """Returns the peripheral pair, or None if the diameter is below 2."""
+        if len(self.nodes) < 2:
+            return None
+        diameter = self.diameter()
+        if diameter < 2:
+            return None
+        for i in np.flatnonzero(self.upper >= diameter):
+            if self.upper[i] < diameter:
+                continue
+            ecc, farthest = self._sweep(i)
+            if ecc == diameter:
+                return (self.nodes[i], self.nodes[farthest])
+        return None
+
+    def farthest_pairs(self, k):
+        """
+        The peripheral pair followed by the other non-adjacent pairs of its
+        first node, farthest first, up to k pairs in all.
+        """
+        pair = self.farthest_pair()
+        if pair is None:
+            return []
+        source, target = self.index[pair[0]], self.index[pair[1]]
+        dist = self._bfs(source)[0]
+        order = np.argsort(-dist, kind='stable')
+        pairs = [pair]
+        for w in order[dist[order] >= 2].tolist():
+            if len(pairs) >= k:
+                break
+            if w != target:
+                pairs.append((pair[0], self.nodes[w]))
+        return pairs
+
+class BetweennessTracker:
+    """
+    Keeps node betweenness, estimated from a fixed set of pivot sources, up to
+    date while edges are added.
+
+    For every pivot the BFS depths, path counts and dependencies are stored
+    (n x k). A new edge (u, v) changes the shortest-path DAG of pivot s only
+    if d_s(u) != d_s(v), so only those pivots are repaired. With
+    d_s(u) < d_s(v), nothing up to level d_s(u) + 1 changes except v: the BFS
+    restarts from that level, and the dependencies are accumulated again.
+    Nodes are ranked through a lazy max-heap whose entries are refreshed
+    when a score changes.
+    """
+
+    def __init__(self, G, pivots=None):
+        self.nodes = list(G.nodes())
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.num_edges = G.number_of_edges()
+        self.version = graph_version(G)
+        self.self_loops = {i for i, node in enumerate(self.nodes) if G.has_edge(node, node)}
+        A = adjacency_matrix(G)
+        A.setdiag(0)
+        A.eliminate_zeros()
+        self.A = A
+        # Same pivot sampling as nx.betweenness_centrality(G, k=pivots).
+        sampled = random.sample(self.nodes, pivots) if pivots is not None else self.nodes
+        self.sources = np.array([self.index[node] for node in sampled], dtype=np.int64)
+        n = len(self.nodes)
+        self.scale = np.ones(n)
+        if pivots is not None and pivots > 1:
+            # A pivot never counts paths starting at itself, so its own score
+            # comes from k - 1 pivots instead of k.
+            self.scale[self.sources] = pivots / (pivots - 1)
+        self.depth = np.empty((n, len(self.sources)), dtype=np.int32)
+        self.sigma = np.empty((n, len(self.sources)))
+        self.delta = np.empty((n, len(self.sources)))
+        self.recomputed_pivots = 0
+        self._solve(np.arange(len(self.sources)))
+        self.scores = self.delta.sum(axis=1) * self.scale
+        self._rebuild_heap()
+
+    def matches(self, G):
+        return self.version == graph_version(G)
+
+    def _solve(self, columns):
+        batch_size = _brandes_batch_size(self.A.shape[0], self.A.nnz)
+        for start in range(0, len(columns), batch_size):
+            part = columns[start:start + batch_size]
+            batch = self.sources[part]
+            depth, sigma, delta = _brandes_block(self.A, batch)
+            delta[batch, np.arange(len(batch))] = 0.0
+            self.depth[:, part], self.sigma[:, part], self.delta[:, part] = depth, sigma, delta
+        self.recomputed_pivots += len(columns)
+
+    def _repair(self, columns, i, j):
+        """Updates the given pivots for the new edge (i, j), which is already in A."""
+        batch_size = _brandes_batch_size(self.A.shape[0], self.A.nnz)
+        for start in range(0, len(columns), batch_size):
+            part = columns[start:start + batch_size]
+            index = np.arange(len(part))
+            depth, sigma = self.depth[:, part].astype(np.int64), self.sigma[:, part]
+            reach = np.where(depth >= 0, depth, np.iinfo(np.int64).max)
+            near = np.where(reach[i] < reach[j], i, j)
+            far = np.where(reach[i] < reach[j], j, i)
+            level = depth[near, index] + 1
+            # Levels up to the far endpoint's new one keep their depths and
+            # path counts; the far endpoint gains the near one's paths.
+            keep = (depth >= 0) & (depth <= level)
+            keep[far, index] = False
+            far_sigma = np.where(depth[far, index] == level, sigma[far, index], 0.0) + sigma[near, index]
+            depth, sigma = np.where(keep, depth, -1), np.where(keep, sigma, 0.0)
+            depth[far, index], sigma[far, index] = level, far_sigma
+            frontier = np.where(depth == level, sigma, 0.0)
+            while True:
+                reached = self.A @ frontier
+                new = (reached > 0) & (depth < 0)
+                if not new.any():
+                    break
+                level = level + 1
+                depth = np.where(new, level, depth)
+                sigma = np.where(new, reached, sigma)
+                frontier = np.where(new, sigma, 0.0)
+            delta = _brandes_accumulate(self.A, depth, sigma)
+            delta[self.sources[part], index] = 0.0
+            self.depth[:, part], self.sigma[:, part], self.delta[:, part] = depth, sigma, delta
+        self.recomputed_pivots += len(columns)
+
+    def _rebuild_heap(self):
+        self._heap = [(-score, i) for i, score in enumerate(self.scores)]
+        heapq.heapify(self._heap)
+
+    def add_edge(self, u, v):
+        i, j = self.index[u], self.index[v]
+        if i == j:
+            if i not in self.self_loops:
+                self.self_loops.add(i)
+                self.num_edges += 1
+            return
+        if self.A[i, j] != 0:
+            return
+        self.num_edges += 1
+        n = len(self.nodes)
+        self.A = self.A + sp.csr_array(([1.0, 1.0], ([i, j], [j, i])), shape=(n, n))
+        stale = np.flatnonzero(self.depth[i] != self.depth[j])
+        counter('betweenness.stale_pivots', stale=len(stale), pivots=len(self.sources))
+        if len(stale) == 0:
+            return
+        old_delta = self.delta[:, stale]
+        self._repair(stale, i, j)
+        changed = np.flatnonzero((self.delta[:, stale] != old_delta).any(axis=1))
+        self.scores[changed] = self.delta[changed].sum(axis=1) * self.scale[changed]
+        if len(self._heap) + len(changed) > 4 * n:
+            self._rebuild_heap()
+        else:
+            for w in changed:
+                heapq.heappush(self._heap, (-self.scores[w], w))
+
+    def top(self, count):
+        """The count highest-ranked nodes, best first (ties in node order)."""
+        ranked, kept = [], []
+        while self._heap and len(ranked) < count:
+            entry = heapq.heappop(self._heap)
+            neg_score, i = entry
+            # Outdated entries and duplicates of a live entry are dropped.
+            if -neg_score != self.scores[i] or (kept and kept[-1] == entry):
+                continue
+            kept.append(entry)
+            ranked.append(self.nodes[i])
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return ranked
+
+# Per-graph state (e.g. PeripheralPairIndex, ConnectivityTracker) that strategies keep between the
+# steps of run_single_strategy_simulation. It is updated through
+# _notify_edge_added and rebuilt whenever it no longer matches the graph:
+# each state keeps the graph_version it was last synced to, so an edit made
+# behind its back (e.g. one edge removed and another added) is caught.
+_graph_states = weakref.WeakKeyDictionary()
+
+def _graph_state(G, key, factory):
+    states = _graph_states.setdefault(G, {})
+    state = states.get(key)
+    if state is None or not state.matches(G):
+        state = states[key] = factory(G)
+    return state
+
+def _notify_edge_added(G, u, v):
+    version = graph_version(G)
+    for key, state in _graph_states.get(G, {}).items():
+        with span(f"state.{key}"):
+            state.add_edge(u, v)
+        state.version = version
+
+def pcm_strategy(G_in, top_k=None):
+    # With top_k, this and the other strategies return a list of up to top_k
+    # candidate edges, best first by their own criterion (lookahead mode of
+    # run_single_strategy_simulation).
+    G = G_in
+    if G.number_of_nodes() < 2: return None
+    if is_connected(G):
+        index = _graph_state(G, 'peripheral_pairs', PeripheralPairIndex)
+    else:
+        # Indexed in place, so the pair comes back in G's own node ids.
+        component = largest_component_nodes(G)
+        if len(component) < 2: return None
+        index = PeripheralPairIndex(G, nodes=component)
+    with span('pcm.farthest_pair', bfs_before=index.bfs_count) as s:
+        if top_k is None:
+            pair = index.farthest_pair()
+            pairs = [pair] if pair is not None else []
         else:
-            return random_strategy(G)
-
-    def random_strategy(G_in):
-        G = G_in.copy()
-        nodes = list(G.nodes())
-        if len(nodes) < 2: return None
-        max_attempts = min(100 * G.number_of_nodes(), G.number_of_nodes()**2) 
-        for _ in range(max_attempts):
-            u, v = random.sample(nodes, 2)
+            pairs = index.farthest_pairs(top_k)
+        s.set(bfs_after=index.bfs_count)
+    if not pairs:
+        # Diameter ≤ 1: every pair at distance 1 is already adjacent, so the pair
+        # with the largest non-adjacent distance is a node paired with itself.
+        pairs = [(node, node) for node in index.nodes if not G.has_edge(node, node)][:top_k or 1]
+    if not pairs:
+        return random_strategy(G, top_k=top_k)
+    return pairs[0] if top_k is None else pairs
+
+def random_strategy(G_in, top_k=None):
+    G = G_in
+    nodes = list(G.nodes())
+    if len(nodes) < 2: return None
+    max_attempts = min(100 * G.number_of_nodes(), G.number_of_nodes()**2) 
+    pairs = []
+    for _ in range(max_attempts):
+        u, v = random.sample(nodes, 2)
+        if u != v and not G.has_edge(u, v):
+            if top_k is None:
+                return (u, v)
+            if (u, v) not in pairs and (v, u) not in pairs:
+                pairs.append((u, v))
+                if len(pairs) == top_k:
+                    break
+    return pairs or None
+
+def hub_strategy(G_in, top_k=None):
+    G = G_in
+    if G.number_of_nodes() < 2: return None
+    sorted_nodes = sorted(G.degree(), key=lambda x: x[1], reverse=True)
+    if len(sorted_nodes) < 2: return None
+    pairs = []
+    for i in range(len(sorted_nodes)):
+        for j in range(i + 1, len(sorted_nodes)):
+            u, v = sorted_nodes[i][0], sorted_nodes[j][0]
             if u != v and not G.has_edge(u, v):
+                if top_k is None:
+                    return (u, v)
+                pairs.append((u, v))
+                if len(pairs) == top_k:
+                    return pairs
+    return pairs or random_strategy(G, top_k=top_k)
+
+def betweenness_strategy(G_in, top_k=None):
+    G = G_in
+    if G.number_of_nodes() < 2: return None
+    pivots = BETWEENNESS_PIVOTS if G.number_of_nodes() > BETWEENNESS_PIVOTS else None
+    tracker = _graph_state(G, 'betweenness', lambda H: BetweennessTracker(H, pivots=pivots))
+    # First non-adjacent pair (i, j), i < j, in ranking order. The ranking is
+    # taken from the heap in prefixes that double until such a pair is found.
+    count = 2
+    with span('betweenness.rank'):
+        ranked = tracker.top(count)
+    i, j = 0, 1
+    pairs = []
+    while i < len(ranked):
+        if j >= len(ranked):
+            if len(ranked) == count:
+                count *= 2
+                with span('betweenness.rank', prefix=count):
+                    ranked = tracker.top(count)
+                continue
+            i, j = i + 1, i + 2
+            continue
+        u, v = ranked[i], ranked[j]
+        if u != v and not G.has_edge(u, v):
+            if top_k is None:
                 return (u, v)
+            pairs.append((u, v))
+            if len(pairs) == top_k:
+                return pairs
+        j += 1
+    return pairs or random_strategy(G, top_k=top_k)
+
+def fiedler_strategy(G_in, edges_per_step=1, top_k=None):
+    """
+    Adds the non-edges with the largest first-order λ₂ gain (v_i - v_j)², where
+    v is the current Fiedler vector. Returns one edge, or a list of up to
+    edges_per_step edges when edges_per_step > 1 (top_k candidates with top_k).
+    """
+    G = G_in
+    if G.number_of_nodes() < 2: return None
+    tracker = _graph_state(G, 'connectivity', ConnectivityTracker)
+    fiedler = tracker.fiedler_vector
+    if fiedler is None:
+        return random_strategy(G, top_k=top_k)
+    if top_k is not None:
+        edges_per_step = top_k
+    nodes = tracker.nodes
+    order = np.argsort(fiedler, kind='stable')
+    # In a top-k non-edge (i, j) with v_i <= v_j, every node below i in the
+    # order pairs with j into a better candidate unless it is a neighbour of j,
+    # so i is among the k + max-degree lowest nodes (and j among the highest).
+    max_degree = max(degree for _, degree in G.degree())
+    pool = min(len(order), edges_per_step + max_degree)
+    counter('fiedler.pool', pool=pool, candidates=pool * pool)
+    low, high = np.meshgrid(order[:pool], order[::-1][:pool], indexing='ij')
+    low, high = low.ravel(), high.ravel()
+    scores = (fiedler[low] - fiedler[high]) ** 2
+    existing = np.fromiter(
+        (a == b or G.has_edge(nodes[a], nodes[b]) for a, b in zip(low.tolist(), high.tolist())),
+        dtype=bool, count=len(low)
+    )
+    scores[existing] = -np.inf
+    # The two halves of the pool overlap when it covers more than half the
+    # nodes, so a pair can appear twice.
+    num_candidates = min(len(scores), 2 * edges_per_step)
+    candidates = np.argpartition(-scores, num_candidates - 1)[:num_candidates]
+    candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+    edges, seen = [], set()
+    for c in candidates:
+        if scores[c] == -np.inf or len(edges) == edges_per_step:
+            break
+        pair = (min(low[c], high[c]), max(low[c], high[c]))
+        if pair not in seen:
+            seen.add(pair)
+            edges.append((nodes[low[c]], nodes[high[c]]))
+    if not edges:
+        return random_strategy(G, top_k=top_k)
+    return edges if edges_per_step > 1 or top_k is not None else edges[0]
+
+def _strategy_name(strategy_func):
+    """
+    Name of a strategy in logs, checkpoints and cache keys. A functools.partial
+    adds its keyword arguments, e.g. fiedler_strategy-edges_per_step4.
+    """
+    if isinstance(strategy_func, functools.partial):
+        return _strategy_name(strategy_func.func) + ''.join(f"-{key}{value}" for key, value in sorted(strategy_func.keywords.items()))
+    return strategy_func.__name__
+
+def _load_checkpoint(path, fingerprint, strategy_name):
+    """The saved state in path, if it belongs to this graph and strategy."""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
         return None
+    if state.get('fingerprint') != fingerprint or state.get('strategy') != strategy_name:
+        return None
+    return state
 
-    def hub_strategy(G_in):
-        G = G_in.copy()
-        if G.number_of_nodes() < 2: return None
-        sorted_nodes = sorted(G.degree(), key=lambda x: x[1], reverse=True)
-        if len(sorted_nodes) < 2: return None
-        for i in range(len(sorted_nodes)):
-            for j in range(i + 1, len(sorted_nodes)):
-                u, v = sorted_nodes[i][0], sorted_nodes[j][0]
-                if u != v and not G.has_edge(u, v):
-                    return (u, v)
-        return random_strategy(G)
-
-    def betweenness_strategy(G_in):
-        G = G_in.copy()
-        if G.number_of_nodes() < 2: return None
-        k = min(200, G.number_of_nodes()) if G.number_of_nodes() > 200 else None
-        betweenness = nx.betweenness_centrality(G, k=k, normalized=True)
-        sorted_nodes = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)
-        if len(sorted_nodes) < 2: return None
-        for i in range(len(sorted_nodes)):
-            for j in range(i + 1, len(sorted_nodes)):
-                u, v = sorted_nodes[i][0], sorted_nodes[j][0]
-                if u != v and not G.has_edge(u, v):
-                    return (u, v)
-        return random_strategy(G)
-
-    def run_single_strategy_simulation(G_original, num_edges_to_add, strategy_func):
-        G = nx.convert_node_labels_to_integers(G_original.copy(), first_label=0)
-        connectivity_history = [calculate_algebraic_connectivity(G)]
-        print(f"--- شروع شبیه‌سازی برای: {strategy_func.__name__} ---")
-        print(f"اتصال جبری اولیه (λ₂): {connectivity_history[0]:.5f}")
-        for i in range(num_edges_to_add):
-            start_time = time.time()
-            edge_to_add = strategy_func(G)
-            if edge_to_add is None:
-                print(f"مرحله {i+1}: استراتژی نتوانست یالی پیدا کند. شبیه‌سازی متوقف شد.")
-                connectivity_history.extend([connectivity_history[-1]] * (num_edges_to_add - i))
-                break
-            u, v = edge_to_add
+def _best_candidate(G, candidates, method, tol, workers, verbose):
+    """The candidate edge with the largest exact λ₂ after insertion (the first one on ties)."""
+    candidates = [candidates] if isinstance(candidates, tuple) else list(candidates)
+    tracker = _graph_state(G, 'connectivity', lambda H: ConnectivityTracker(H, tol=tol, method=method))
+    gains = tracker.connectivity_with_edges(candidates, workers=workers)
+    best = int(np.argmax(gains))
+    counter('lookahead.choice', candidates=len(candidates), rank=best,
+            first=float(gains[0]), best=float(gains[best]))
+    if verbose: print(f"  پیش‌نگری: {len(candidates)} یال نامزد، λ₂ با گزینه اول استراتژی {gains[0]:.5f}، "
+                      f"بهترین (گزینه {best + 1}) {gains[best]:.5f}")
+    return candidates[best]
+
+def run_single_strategy_simulation(G_original, num_edges_to_add, strategy_func, method='auto', tol=1e-10, incremental=True, checkpoint=None, verbose=True, on_step=None, lookahead=None, lookahead_workers=None):
+    # The simulation runs on a compact copy relabelled to 0..n-1, like
+    # nx.convert_node_labels_to_integers.
+    G = CompactGraph.from_networkx(G_original)
+    # With a checkpoint file, the history and the added edges are saved after
+    # every step, and a later call with the same graph and strategy replays the
+    # saved edges and continues from there.
+    # on_step(G, step) is called after every newly added edge, e.g. to measure
+    # something else on the rewired graph (cascades.cascade_sizes_per_step).
+    # With lookahead=K the strategy proposes its top K edges, the exact λ₂
+    # after each is evaluated (ConnectivityTracker.connectivity_with_edges,
+    # lookahead_workers threads) and the best one is added, so the history is
+    # the greedy-optimal choice among the strategy's candidates.
+    run_name = _strategy_name(strategy_func) + (f"-lookahead{lookahead}" if lookahead else "")
+    fingerprint = graph_fingerprint(G) if checkpoint is not None else None
+    state = _load_checkpoint(checkpoint, fingerprint, run_name) if checkpoint is not None else None
+    added_edges = []
+    if state is not None:
+        for u, v in state['edges']:
             G.add_edge(u, v)
-            new_connectivity = calculate_algebraic_connectivity(G)
+            added_edges.append((u, v))
+        print(f"[INFO] ادامه از نقطه بازیابی '{checkpoint}': {len(added_edges)} یال قبلاً اضافه شده است.")
+    tracker = None
+    if incremental:
+        try:
+            # Kept as per-graph state, so strategies (e.g. fiedler_strategy)
+            # can read the tracked Fiedler vector.
+            tracker = _graph_state(G, 'connectivity', lambda H: ConnectivityTracker(H, tol=tol, method=method))
+            connectivity, fiedler = tracker.algebraic_connectivity, None
+        except Exception as e:
+            print(f"  [Warning] ردیاب افزایشی λ₂ ساخته نشد: {e}. محاسبه کامل استفاده می‌شود.")
+    if tracker is None:
+        connectivity, fiedler = _safe_fiedler_pair(G, method=method, tol=tol)
+    connectivity_history = state['history'] if state is not None else [connectivity]
+
+    def save_checkpoint():
+        if checkpoint is not None:
+            _write_json(checkpoint, {
+                'fingerprint': fingerprint, 'strategy': run_name,
+                'edges': [[int(u), int(v)] for u, v in added_edges], 'history': connectivity_history
+            })
+
+    print(f"--- شروع شبیه‌سازی برای: {run_name} ---")
+    print(f"اتصال جبری اولیه (λ₂): {connectivity_history[0]:.5f}")
+    step = len(connectivity_history) - 1
+    while step < num_edges_to_add:
+        start_time = time.time()
+        with span('select_edges', strategy=_strategy_name(strategy_func), step=step):
+            proposal = strategy_func(G, top_k=lookahead) if lookahead else strategy_func(G)
+        if lookahead and proposal:
+            proposal = _best_candidate(G, proposal, method, tol, lookahead_workers, verbose)
+        if not proposal:
+            print(f"مرحله {step+1}: استراتژی نتوانست یالی پیدا کند. شبیه‌سازی متوقف شد.")
+            connectivity_history.extend([connectivity_history[-1]] * (num_edges_to_add - step))
+            save_checkpoint()
+            break
+        # A strategy returns one edge, or a list of edges to add in this step.
+        edges = [proposal] if isinstance(proposal, tuple) else list(proposal)[:num_edges_to_add - step]
+        for u, v in edges:
+            with span('insert_edge'):
+                G.add_edge(u, v)
+            # The tracked λ₂ is updated with the rest of the per-graph state
+            # (span 'state.connectivity').
+            if tracker is not None:
+                try:
+                    _notify_edge_added(G, u, v)
+                    new_connectivity = tracker.algebraic_connectivity
+                except Exception as e:
+                    print(f"  [Warning] خطا در محاسبه λ₂: {e}. مقدار 0.0 برگردانده شد.")
+                    new_connectivity = 0.0
+            else:
+                _notify_edge_added(G, u, v)
+                # Adding an edge only nudges the spectrum, so the previous Fiedler
+                # vector is a good starting point for the sparse solver.
+                with span('lambda2_solve'):
+                    new_connectivity, fiedler = _safe_fiedler_pair(G, method=method, tol=tol, v0=fiedler)
             connectivity_history.append(new_connectivity)
+            added_edges.append((u, v))
+            step += 1
+            save_checkpoint()
+            if on_step is not None:
+                on_step(G, step)
             end_time = time.time()
-            print(f"مرحله {i+1}/{num_edges_to_add}: یال {edge_to_add} اضافه شد. λ₂ جدید: {new_connectivity:.5f}. (زمان: {end_time - start_time:.2f} ثانیه)")
-        return connectivity_history
+            if verbose: print(f"مرحله {step}/{num_edges_to_add}: یال {(u, v)} اضافه شد. λ₂ جدید: {new_connectivity:.5f}. (زمان: {end_time - start_time:.2f} ثانیه)")
+            start_time = end_time
+    return connectivity_history[:num_edges_to_add + 1]
@@ -1,108 +1,468 @@
-    # resilience_metrics.py
-    import networkx as nx
-    import numpy as np
+# resilience_metrics.py
+import os
+import numpy as np
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from compact_graph import adjacency_matrix, is_connected, largest_component, laplacian_matrix
+
+# Graphs with n * m above this budget are handled by pivot sampling in 'auto' mode.
+EXACT_BETWEENNESS_BUDGET = 1e9
+# Number of independent pivot groups used for the jackknife confidence interval.
+BETWEENNESS_GROUPS = 10
+
+def entropy(pk, base=None):
+    # Same as scipy.stats.entropy for one distribution, which is not imported
+    # because scipy.stats alone takes most of this module's import time.
+    pk = np.asarray(pk, dtype=np.float64)
+    pk = pk / pk.sum()
+    nonzero = pk[pk > 0]
+    h = -np.sum(nonzero * np.log(nonzero))
+    return h / np.log(base) if base is not None else h
+
+def _edge_endpoints(G):
+    """Returns the endpoints of G.edges() as indices into G.nodes() order."""
+    index = {node: i for i, node in enumerate(G.nodes())}
+    rows = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    cols = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    return rows, cols
+
+def _betweenness_arrays(G):
+    """Returns the binary adjacency matrix (no self-loops) and the edge endpoint indices."""
+    A = adjacency_matrix(G)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    return (A,) + _edge_endpoints(G)
+
+def _brandes_block(A, sources, alive=None):
+    """
+    Runs the Brandes BFS and dependency accumulation for a block of sources at
+    once, level by level as sparse matrix products. Returns (depth, sigma,
+    delta), each n x len(sources); depth is -1 for unreachable nodes. If an
+    alive mask is given, the other nodes are treated as removed.
+    """
+    n = A.shape[0]
+    columns = np.arange(len(sources))
+    depth = np.full((n, len(sources)), -1, dtype=np.int64)
+    sigma = np.zeros((n, len(sources)))
+    depth[sources, columns] = 0
+    sigma[sources, columns] = 1.0
+    frontier = sigma.copy()
+    level = 0
+    while True:
+        reached = A @ frontier
+        if alive is not None:
+            reached[~alive] = 0.0
+        new = (reached > 0) & (depth < 0)
+        if not new.any():
+            break
+        level += 1
+        depth[new] = level
+        sigma[new] = reached[new]
+        frontier = np.where(new, sigma, 0.0)
+    return depth, sigma, _brandes_accumulate(A, depth, sigma)
+
+def _brandes_accumulate(A, depth, sigma, weight=1.0):
+    """
+    The dependency accumulation of Brandes, level by level from the deepest,
+    for given depths and path counts. weight is what each reached node counts
+    for as a target: 1, or a column of per-node weights.
+    """
+    safe_sigma = np.where(sigma > 0, sigma, 1.0)
+    delta = np.zeros_like(sigma)
+    for current in range(int(depth.max(initial=0)), 0, -1):
+        pushed = A @ np.where(depth == current, (weight + delta) / safe_sigma, 0.0)
+        delta += np.where(depth == current - 1, sigma * pushed, 0.0)
+    return delta
+
+def _brandes_batch_size(n, m):
+    return int(max(1, min(256, 2e7 // max(n, m, 1))))
+
+def _edge_flow_sums(A, rows, cols, sources):
+    """Sums the Brandes dependencies of every edge over the given sources."""
+    flows = np.zeros(len(rows))
+    batch_size = _brandes_batch_size(A.shape[0], len(rows))
+    for start in range(0, len(sources), batch_size):
+        batch = np.asarray(sources[start:start + batch_size])
+        depth, sigma, delta = _brandes_block(A, batch)
+        safe_sigma = np.where(sigma > 0, sigma, 1.0)
+        d_u, d_v = depth[rows], depth[cols]
+        share = (1.0 + delta) / safe_sigma
+        forward = np.where((d_u >= 0) & (d_v == d_u + 1), sigma[rows] * share[cols], 0.0)
+        backward = np.where((d_v >= 0) & (d_u == d_v + 1), sigma[cols] * share[rows], 0.0)
+        flows += (forward + backward).sum(axis=1)
+    return flows
+
+_worker_arrays = None
+
+def _init_betweenness_worker(A, rows, cols):
+    global _worker_arrays
+    _worker_arrays = (A, rows, cols)
+
+def _worker_edge_flow_sums(sources):
+    return _edge_flow_sums(*_worker_arrays, sources)
+
+def _omega_from_flows(flow_values):
+    # If all flows are zero (e.g., a disconnected graph with no paths)
+    if np.sum(flow_values) == 0:
+        # In this case, distribute flow uniformly as a fallback
+        flow_values = np.ones(len(flow_values))
+    # Convert to probability distribution
+    probabilities = flow_values / np.sum(flow_values)
+    # Calculate normalized entropy (Omega)
+    h_max = np.log(len(flow_values)) if len(flow_values) > 1 else 1.0
+    return entropy(probabilities, base=np.e) / h_max
+
+def calculate_omega_betweenness(G, method='auto', epsilon=1e-2, delta=0.05, n_jobs=1, seed=None, return_info=False):
+    """
+    Calculates Network Resistance based on edge betweenness centrality.
+
+    method: 'exact' sums the dependencies of every source vertex, split across
+    n_jobs worker processes. 'sampled' draws pivot sources without replacement
+    until the bias-corrected estimate of Omega is within epsilon of the exact
+    value at confidence 1 - delta, by a jackknife estimate over pivot groups
+    (or until every vertex has been used). 'auto' picks 'exact' when n * m is
+    within EXACT_BETWEENNESS_BUDGET.
+    With return_info=True, returns (omega, info), where info holds the number
+    of pivots, the standard error and the achieved confidence for epsilon.
+    """
+    n, m = G.number_of_nodes(), G.number_of_edges()
+    if n == 0 or m == 0:
+        return (0.0, {'method': 'exact', 'pivots': 0, 'stderr': 0.0, 'confidence': 1.0}) if return_info else 0.0
+    if method == 'auto':
+        method = 'exact' if n * m <= EXACT_BETWEENNESS_BUDGET else 'sampled'
+    if method not in ('exact', 'sampled'):
+        raise ValueError(f"Unknown method: {method}")
+
+    A, rows, cols = _betweenness_arrays(G)
+    workers = n_jobs or os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_betweenness_worker, initargs=(A, rows, cols))
+
+    def flow_sums(source_groups):
+        if pool is None:
+            return [_edge_flow_sums(A, rows, cols, sources) for sources in source_groups]
+        return list(pool.map(_worker_edge_flow_sums, source_groups))
+
+    try:
+        if method == 'exact':
+            chunks = np.array_split(np.arange(n), workers)
+            omega = _omega_from_flows(np.sum(flow_sums(chunks), axis=0))
+            info = {'method': 'exact', 'pivots': n, 'stderr': 0.0, 'confidence': 1.0}
+        else:
+            order = np.random.default_rng(seed).permutation(n)
+            groups = np.zeros((BETWEENNESS_GROUPS, m))
+            z = NormalDist().inv_cdf(1 - delta / 2)
+            used, round_size = 0, BETWEENNESS_GROUPS * max(8, workers)
+            while True:
+                pivots = order[used:used + round_size]
+                used += len(pivots)
+                # Pivot p always goes to group p % BETWEENNESS_GROUPS, so the
+                # groups stay independent equal-size samples.
+                groups += flow_sums([pivots[g::BETWEENNESS_GROUPS] for g in range(BETWEENNESS_GROUPS)])
+                total = groups.sum(axis=0)
+                omega = _omega_from_flows(total)
+                if used >= n:
+                    stderr, confidence = 0.0, 1.0
+                    break
+                # Leave-one-group-out jackknife, with the finite-population factor
+                # for sampling pivots without replacement. The entropy of sampled
+                # flows is biased downwards, so the estimate is bias-corrected, and
+                # the correction counts against epsilon as well.
+                shrink = 1 - used / n
+                leave_one_out = np.array([_omega_from_flows(total - group) for group in groups])
+                correction = shrink * (BETWEENNESS_GROUPS - 1) * (omega - leave_one_out.mean())
+                stderr = np.sqrt(shrink * (BETWEENNESS_GROUPS - 1) / BETWEENNESS_GROUPS
+                                 * np.sum((leave_one_out - leave_one_out.mean()) ** 2))
+                omega = omega + correction
+                margin = epsilon - abs(correction)
+                if margin > 0 and z * stderr <= margin:
+                    confidence = 2 * NormalDist().cdf(margin / stderr) - 1 if stderr > 0 else 1.0
+                    break
+                round_size *= 2
+            info = {'method': 'sampled', 'pivots': int(used), 'stderr': float(stderr), 'confidence': float(confidence)}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return (omega, info) if return_info else omega
+
+
+# Above this many nodes 'auto' switches from exact solves to the random-projection sketch.
+EXACT_RESISTANCE_MAX_NODES = 20000
+# The sketch projects onto ⌈SKETCH_CONSTANT ln n / epsilon²⌉ dimensions, the
+# Johnson-Lindenstrauss bound of Spielman and Srivastava for all edges at once.
+SKETCH_CONSTANT = 24
+
+def _grounded_laplacian_factor(G):
+    """
+    Factorizes the Laplacian with the last node grounded (its row and column
+    removed). For a connected graph this is nonsingular, and solving with it
+    gives node potentials relative to the grounded node.
+    """
     import scipy.sparse as sp
-    from scipy.stats import entropy
+    from scipy.sparse.linalg import splu
+    L = sp.csc_matrix(laplacian_matrix(G), dtype=np.float64)
+    return splu(sp.csc_matrix(L[:-1, :-1]))
 
-    def calculate_omega_betweenness(G):
-        """Calculates Network Resistance based on edge betweenness centrality."""
-        if G.number_of_nodes() == 0 or G.number_of_edges() == 0:
-            return 0.0
-        
-        try:
-            # Normalize='overall' to get probabilities summing to 1
-            edge_bc = nx.edge_betweenness_centrality(G, normalized=False)
-            flow_values = np.array(list(edge_bc.values()))
-            
-            # If all flows are zero (e.g., a disconnected graph with no paths)
-            if np.sum(flow_values) == 0:
-                 # In this case, distribute flow uniformly as a fallback
-                 flow_values = np.ones(G.number_of_edges())
-            
-            # Convert to probability distribution
-            probabilities = flow_values / np.sum(flow_values)
-            
-            # Calculate normalized entropy (Omega)
-            h_max = np.log(G.number_of_edges()) if G.number_of_edges() > 1 else 1.0
-            h_actual = entropy(probabilities, base=np.e)
-            
-            return h_actual / h_max
-        except Exception:
-            # Handles cases where calculation might fail (e.g., very large or disconnected graphs)
-            return np.nan
-
-
-    def calculate_omega_electrical(G):
-        """Calculates Network Resistance based on electrical current flow."""
+def _exact_effective_resistances(lu, n, rows, cols):
+    """
+    R(u, v) = Γ_uu + Γ_vv - 2Γ_uv, with Γ the inverse of the grounded Laplacian
+    (zero on the grounded node). Columns of Γ are solved in batches, and each
+    edge picks up its entries from the batch holding one of its endpoints.
+    """
+    ground = n - 1
+    # Every edge is read from the column of an endpoint that is not grounded.
+    at_ground = rows == ground
+    rows, cols = np.where(at_ground, cols, rows), np.where(at_ground, rows, cols)
+    diagonal = np.zeros(n)
+    cross = np.zeros(len(rows))
+    batch_size = int(max(1, min(ground, 1e7 // n)))
+    for start in range(0, ground, batch_size):
+        batch = np.arange(start, min(start + batch_size, ground))
+        rhs = np.zeros((ground, len(batch)))
+        rhs[batch, np.arange(len(batch))] = 1.0
+        columns = np.vstack([lu.solve(rhs), np.zeros((1, len(batch)))])
+        diagonal[batch] = columns[batch, np.arange(len(batch))]
+        in_batch = (rows >= batch[0]) & (rows <= batch[-1])
+        cross[in_batch] = columns[cols[in_batch], rows[in_batch] - start]
+    return diagonal[rows] + diagonal[cols] - 2 * cross
+
+def _sketched_effective_resistances(lu, n, rows, cols, epsilon, seed=None):
+    """
+    Spielman-Srivastava sketch: R(u, v) = ||Q B L⁺ (e_u - e_v)||² up to a factor
+    (1 ± epsilon), with B the edge-node incidence matrix and Q a random ±1/√k
+    projection with k = ⌈24 ln n / epsilon²⌉ rows. Needs k solves instead of n.
+    """
+    k = int(np.ceil(SKETCH_CONSTANT * np.log(n) / epsilon ** 2))
+    rng = np.random.default_rng(seed)
+    m = len(rows)
+    resistances = np.zeros(m)
+    batch_size = int(max(1, min(k, 1e7 // max(n, m))))
+    for start in range(0, k, batch_size):
+        width = min(batch_size, k - start)
+        projection = rng.choice([-1.0, 1.0], size=(m, width)) / np.sqrt(k)
+        # Rows of (Q B)ᵀ: each edge adds its projection to one endpoint and
+        # subtracts it from the other, so every column sums to zero.
+        currents = np.zeros((n, width))
+        np.add.at(currents, rows, projection)
+        np.add.at(currents, cols, -projection)
+        potentials = np.vstack([lu.solve(currents[:-1]), np.zeros((1, width))])
+        resistances += np.sum((potentials[rows] - potentials[cols]) ** 2, axis=1)
+    return resistances
+
+def calculate_omega_electrical(G, method='auto', epsilon=0.2, seed=None):
+    """
+    Calculates Network Resistance based on electrical current flow.
+
+    method: 'exact' solves the grounded sparse Laplacian for every node in
+    batches. 'sketch' estimates all edge effective resistances from
+    O(log n / epsilon²) solves with a random projection, each within a factor
+    1 ± epsilon with high probability. 'auto' uses 'exact' up to
+    EXACT_RESISTANCE_MAX_NODES nodes, or whenever the sketch would need more
+    solves than the exact method.
+    """
+    if G.number_of_nodes() < 2 or G.number_of_edges() == 0:
+        return 0.0
+
+    # Ensure graph is connected
+    if not is_connected(G):
+        # Work with the largest connected component
+        G = largest_component(G)
         if G.number_of_nodes() < 2 or G.number_of_edges() == 0:
             return 0.0
 
-        # Ensure graph is connected
-        if not nx.is_connected(G):
-            # Work with the largest connected component
-            giant_nodes = max(nx.connected_components(G), key=len)
-            G = G.subgraph(giant_nodes).copy()
-            if G.number_of_nodes() < 2 or G.number_of_edges() == 0:
-                return 0.0
-
-        L = nx.laplacian_matrix(G).astype(np.float64)
-        # Use pseudo-inverse for robustness, handles singular matrices
-        L_pinv = np.linalg.pinv(L.toarray())
-        
-        effective_resistances = []
-        for i, j in G.edges():
-            # Need to map node labels to integer indices if they are not already
-            node_list = list(G.nodes())
-            u, v = node_list.index(i), node_list.index(j)
-            # Kirchhoff's formula for effective resistance
-            R_eff = L_pinv[u, u] + L_pinv[v, v] - 2 * L_pinv[u, v]
-            effective_resistances.append(R_eff)
-            
-        currents = 1.0 / np.array(effective_resistances)
-        
-        # Power dissipated in each edge is P = I^2 * R = (1/R_eff)^2 * R_eff = 1/R_eff
-        # Total power is sum of currents
-        total_power = np.sum(currents)
-        
-        # Probability distribution of flow (power)
-        probabilities = currents / total_power
-        
-        h_max = np.log(G.number_of_edges()) if G.number_of_edges() > 1 else 1.0
-        h_actual = entropy(probabilities, base=np.e)
-        
-        return h_actual / h_max
-
-    def simulate_targeted_attack(G):
-        """
-        Simulates a targeted attack on high-degree nodes and returns the AUC.
-        """
-        if G.number_of_nodes() == 0:
-            return 0.0
+    n = G.number_of_nodes()
+    if method == 'auto':
+        sketch_solves = SKETCH_CONSTANT * np.log(n) / epsilon ** 2
+        method = 'exact' if n <= EXACT_RESISTANCE_MAX_NODES or sketch_solves >= n - 1 else 'sketch'
+    rows, cols = _edge_endpoints(G)
+    lu = _grounded_laplacian_factor(G)
+    if method == 'exact':
+        effective_resistances = _exact_effective_resistances(lu, n, rows, cols)
+    elif method == 'sketch':
+        effective_resistances = _sketched_effective_resistances(lu, n, rows, cols, epsilon, seed=seed)
+    else:
+        raise ValueError(f"Unknown method: {method}")
 
-        temp_G = G.copy()
-        initial_gcc_size = len(max(nx.connected_components(temp_G), key=len, default=[]))
-        if initial_gcc_size == 0:
-            return 0.0
+    currents = 1.0 / effective_resistances
+
+    # Power dissipated in each edge is P = I^2 * R = (1/R_eff)^2 * R_eff = 1/R_eff
+    # Total power is sum of currents
+    total_power = np.sum(currents)
+
+    # Probability distribution of flow (power)
+    probabilities = currents / total_power
+
+    h_max = np.log(G.number_of_edges()) if G.number_of_edges() > 1 else 1.0
+    h_actual = entropy(probabilities, base=np.e)
+
+    return h_actual / h_max
+
+# np.trapz was renamed to np.trapezoid in NumPy 2.0 and later removed.
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+def percolation_trajectory(G, removal_order):
+    """
+    Returns the giant-component size after removing removal_order[:k], for
+    k = 0 .. len(removal_order), as a NumPy array. Nodes are added back in
+    reverse removal order with a union-find (Newman-Ziff), so the whole
+    curve costs O(m α(n)) instead of a component search per removal.
+    Nodes missing from removal_order are never removed.
+    """
+    removal_order = list(removal_order)
+    removed = set(removal_order)
+    # Nodes that are never removed go in first, then the removed ones in reverse.
+    insertion_order = [node for node in G.nodes() if node not in removed] + removal_order[::-1]
+    position = {node: i for i, node in enumerate(insertion_order)}
+    parent = list(range(len(insertion_order)))
+    size = [1] * len(insertion_order)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    num_kept = len(insertion_order) - len(removal_order)
+    gcc_sizes = np.zeros(len(removal_order) + 1, dtype=np.int64)
+    largest = 0
+    for i, node in enumerate(insertion_order):
+        largest = max(largest, 1)
+        for neighbor in G.adj[node]:
+            j = position[neighbor]
+            if j >= i:
+                continue
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                if size[root_i] < size[root_j]:
+                    root_i, root_j = root_j, root_i
+                parent[root_j] = root_i
+                size[root_i] += size[root_j]
+                largest = max(largest, size[root_i])
+        if i + 1 >= num_kept:
+            gcc_sizes[len(insertion_order) - i - 1] = largest
+    return gcc_sizes
+
+def attack_auc(gcc_sizes):
+    """Area under the normalized giant-component curve of an attack."""
+    if len(gcc_sizes) == 0 or gcc_sizes[0] == 0:
+        return 0.0
+    # Normalize sizes by initial size
+    normalized_sizes = np.asarray(gcc_sizes) / gcc_sizes[0]
+    # Calculate AUC (Area Under the Curve) using trapezoidal rule
+    return _trapezoid(normalized_sizes, dx=1/len(normalized_sizes))
+
+def targeted_attack_trajectory(G):
+    """
+    Giant-component sizes while high-degree nodes are removed one by one
+    (initial degree, descending), starting with the intact graph.
+    """
+    # Sort nodes by degree (descending)
+    nodes_sorted_by_degree = sorted(G.nodes(), key=lambda n: G.degree(n), reverse=True)
+    return percolation_trajectory(G, nodes_sorted_by_degree)
+
+def simulate_targeted_attack(G):
+    """
+    Simulates a targeted attack on high-degree nodes and returns the AUC.
+    """
+    if G.number_of_nodes() == 0:
+        return 0.0
+    return attack_auc(targeted_attack_trajectory(G))
+
+# Realizations processed together by one vectorized union-find in random_failure_ensemble.
+FAILURE_BATCH_SIZE = 1024
+
+def _failure_ensemble_batch(n, rows, cols, removed_counts, realizations, seed):
+    """
+    Runs `realizations` independent random edge failures at once. Each one is
+    a random permutation of the edges (the removal order); the edges are added
+    back in reverse order into a union-find over realizations x nodes, with
+    every find and union done for the whole batch in NumPy. Returns the giant
+    component size and component count after removing each of removed_counts
+    edges, as realizations x len(removed_counts) arrays.
+    """
+    m = len(rows)
+    rng = np.random.default_rng(seed)
+    order = rng.permuted(np.tile(np.arange(m), (realizations, 1)), axis=1)
+    offsets = np.arange(realizations, dtype=np.int64) * n
+    parent = np.arange(realizations * n, dtype=np.int64)
+    size = np.ones(realizations * n, dtype=np.int64)
+    largest = np.full(realizations, min(n, 1), dtype=np.int64)
+    components = np.full(realizations, n, dtype=np.int64)
+    gcc = np.zeros((realizations, len(removed_counts)), dtype=np.int64)
+    counts = np.zeros_like(gcc)
+    # Column f is recorded once m - removed_counts[f] edges are back.
+    record_at = {}
+    for f, removed in enumerate(removed_counts):
+        record_at.setdefault(m - removed, []).append(f)
+    for added in range(m + 1):
+        for f in record_at.get(added, ()):
+            gcc[:, f], counts[:, f] = largest, components
+        if added == m:
+            break
+        edge = order[:, m - 1 - added]
+        x = np.concatenate([offsets + rows[edge], offsets + cols[edge]])
+        # Batched find with path halving.
+        while True:
+            p = parent[x]
+            grandparent = parent[p]
+            if (p == grandparent).all():
+                x = p
+                break
+            parent[x] = grandparent
+            x = grandparent
+        root_u, root_v = x[:realizations], x[realizations:]
+        merge = root_u != root_v
+        root_u, root_v = root_u[merge], root_v[merge]
+        smaller = size[root_u] < size[root_v]
+        root_u, root_v = np.where(smaller, root_v, root_u), np.where(smaller, root_u, root_v)
+        parent[root_v] = root_u
+        size[root_u] += size[root_v]
+        components[merge] -= 1
+        largest[merge] = np.maximum(largest[merge], size[root_u])
+    return gcc, counts
+
+def random_failure_ensemble(G, fractions=None, realizations=1000, n_jobs=1, seed=None, confidence=0.95):
+    """
+    Monte Carlo ensemble of random edge failures. For every failure fraction
+    (default 0, 0.05, ..., 1) returns the mean, the standard deviation and a
+    confidence interval for the mean of the giant-component size and of the
+    number of connected components, over `realizations` independent random
+    removal orders.
+
+    Batches of FAILURE_BATCH_SIZE realizations run in n_jobs worker
+    processes. Every batch draws from its own stream spawned from seed, so
+    the result does not depend on n_jobs.
+    """
+    fractions = np.linspace(0.0, 1.0, 21) if fractions is None else np.asarray(fractions, dtype=np.float64)
+    n = G.number_of_nodes()
+    rows, cols = _edge_endpoints(G)
+    removed_counts = np.rint(fractions * len(rows)).astype(np.int64)
+    sizes = [FAILURE_BATCH_SIZE] * (realizations // FAILURE_BATCH_SIZE)
+    if realizations % FAILURE_BATCH_SIZE:
+        sizes.append(realizations % FAILURE_BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(n, rows, cols, removed_counts, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    workers = min(n_jobs or os.cpu_count() or 1, max(len(args), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_failure_ensemble_batch, *zip(*args)))
+    else:
+        batches = [_failure_ensemble_batch(*arg) for arg in args]
+    gcc = np.concatenate([batch[0] for batch in batches]).astype(np.float64)
+    counts = np.concatenate([batch[1] for batch in batches]).astype(np.float64)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def summary(samples):
+        mean = samples.mean(axis=0)
+        std = samples.std(axis=0, ddof=1) if len(samples) > 1 else np.zeros_like(mean)
+        half_width = z * std / np.sqrt(len(samples))
+        return mean, std, np.stack([mean - half_width, mean + half_width])
 
-        # Sort nodes by degree (descending)
-        nodes_sorted_by_degree = sorted(temp_G.nodes(), key=lambda n: temp_G.degree(n), reverse=True)
-        
-        gcc_sizes = [initial_gcc_size]
-        
-        for node_to_remove in nodes_sorted_by_degree:
-            if temp_G.has_node(node_to_remove):
-                temp_G.remove_node(node_to_remove)
-                if temp_G.number_of_nodes() > 0:
-                    # Find the largest connected component
-                    largest_comp = max(nx.connected_components(temp_G), key=len, default=[])
-                    gcc_sizes.append(len(largest_comp))
-                else:
-                    gcc_sizes.append(0)
-        
-        # Normalize sizes by initial size
-        normalized_sizes = np.array(gcc_sizes) / initial_gcc_size
-        
-        # Calculate AUC (Area Under the Curve) using trapezoidal rule
-        auc = np.trapz(normalized_sizes, dx=1/len(normalized_sizes))
-        
-        return auc
+    gcc_mean, gcc_std, gcc_ci = summary(gcc)
+    components_mean, components_std, components_ci = summary(counts)
+    return {
+        'fractions': fractions, 'realizations': realizations, 'confidence': confidence,
+        'gcc_mean': gcc_mean, 'gcc_std': gcc_std, 'gcc_ci': gcc_ci,
+        'components_mean': components_mean, 'components_std': components_std, 'components_ci': components_ci,
+    }
@@ -1,76 +1,246 @@
-    # src/simulation_runner.py
-    import networkx as nx
-    import urllib.request
-    import io
-    import gzip
-    import zipfile
-    import os
-    from resilience_calculator import (
-        run_single_strategy_simulation,
-        pcm_strategy,
-        betweenness_strategy,
-        hub_strategy,
-        random_strategy
-    )
-    from plotting import plot_and_save_results
-
-    def load_network(network_name, data_dir="../data"):
-        print(f"\n[INFO] در حال بارگذاری شبکه: {network_name.upper()}...")
-        if network_name == 'ba': return nx.barabasi_albert_graph(n=1000, m=3, seed=42)
-        elif network_name == 'er': return nx.erdos_renyi_graph(n=1000, p=0.006, seed=42)
-        elif network_name == 'lattice': return nx.grid_2d_graph(32, 32)
-        file_path = os.path.join(data_dir, f"{network_name}.gml")
-        if network_name == 'power' and not os.path.exists(file_path):
-            print(f"[INFO] فایل '{file_path}' یافت نشد. در حال دانلود از اینترنت...")
-            url = "http://www-personal.umich.edu/~mejn/netdata/power.zip"
-            try:
-                with urllib.request.urlopen(url, timeout=30) as sock: s = io.BytesIO(sock.read())
-                with zipfile.ZipFile(s) as zf:
-                    gml_file = zf.open('power.gml', 'r')
-                    lines = (line.decode('utf-8').strip() for line in gml_file)
-                    clean_lines = [line for line in lines if not line.startswith('*')]
-                    G = nx.parse_gml(clean_lines, label='id')
-                    if not os.path.exists(data_dir): os.makedirs(data_dir)
-                    nx.write_gml(G, file_path)
-                    print(f"[INFO] شبکه برق در '{file_path}' ذخیره شد.")
-                    return G
-            except Exception as e:
-                print(f"[ERROR] دانلود یا پردازش شبکه برق ناموفق بود: {e}")
-                return None
+# src/simulation_runner.py
+import networkx as nx
+import urllib.request
+import io
+import gzip
+import functools
+import zipfile
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from resilience_calculator import (
+    run_single_strategy_simulation,
+    pcm_strategy,
+    betweenness_strategy,
+    hub_strategy,
+    random_strategy,
+    fiedler_strategy,
+    _strategy_name
+)
+from compact_graph import CompactGraph, is_connected, largest_component
+from graph_store import load_graph
+from instrumentation import span
+from metric_cache import MetricCache, graph_fingerprint
+
+# Data and results live next to src/, wherever the script is started from.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
+RESULTS_DIR = os.path.join(PROJECT_DIR, "results")
+
+def load_network(network_name, data_dir=DATA_DIR, largest_component=False):
+    print(f"\n[INFO] در حال بارگذاری شبکه: {network_name.upper()}...")
+    if network_name == 'ba': return nx.barabasi_albert_graph(n=1000, m=3, seed=42)
+    elif network_name == 'er': return nx.erdos_renyi_graph(n=1000, p=0.006, seed=42)
+    elif network_name == 'lattice': return nx.grid_2d_graph(32, 32)
+    file_path = os.path.join(data_dir, f"{network_name}.gml")
+    if network_name == 'power' and not os.path.exists(file_path):
+        print(f"[INFO] فایل '{file_path}' یافت نشد. در حال دانلود از اینترنت...")
+        url = "http://www-personal.umich.edu/~mejn/netdata/power.zip"
         try:
-            if file_path.endswith('.gml'): G = nx.read_gml(file_path, label='id')
-            else: G = nx.read_edgelist(file_path.replace('.gml', '.edgelist'), nodetype=int)
-            print(f"شبکه از فایل '{file_path}' با موفقیت بارگذاری شد.")
-            return G
-        except FileNotFoundError:
-            print(f"[ERROR] فایل شبکه '{file_path}' پیدا نشد. لطفاً نام شبکه را بررسی کنید.")
+            with urllib.request.urlopen(url, timeout=30) as sock: s = io.BytesIO(sock.read())
+            with zipfile.ZipFile(s) as zf:
+                gml_file = zf.open('power.gml', 'r')
+                lines = (line.decode('utf-8').strip() for line in gml_file)
+                clean_lines = [line for line in lines if not line.startswith('*')]
+                G = nx.parse_gml(clean_lines, label='id')
+                if not os.path.exists(data_dir): os.makedirs(data_dir)
+                nx.write_gml(G, file_path)
+                print(f"[INFO] شبکه برق در '{file_path}' ذخیره شد.")
+                return G
+        except Exception as e:
+            print(f"[ERROR] دانلود یا پردازش شبکه برق ناموفق بود: {e}")
             return None
+    if not os.path.exists(file_path): file_path = file_path.replace('.gml', '.edgelist')
+    try:
+        # Parsed once, then memory-mapped from the binary cache in data_dir/.graph_cache.
+        with span('load_network', path=file_path):
+            G = load_graph(file_path, nodetype=int, largest_component=largest_component)
+        print(f"شبکه از فایل '{file_path}' با موفقیت بارگذاری شد.")
+        return G
+    except FileNotFoundError:
+        print(f"[ERROR] فایل شبکه '{file_path}' پیدا نشد. لطفاً نام شبکه را بررسی کنید.")
+        return None
+
+def share_graph(G):
+    """
+    Copies G (relabelled to 0..n-1) into shared memory as CSR arrays.
+    Returns (descriptor, blocks): the picklable descriptor is passed to the
+    workers, and the owner must close and unlink the blocks when done.
+    """
+    G = CompactGraph.from_networkx(G)
+    # Rows keep the adjacency order, so the workers rebuild exactly the graph
+    # (and tie-breaking) that the serial simulation runs on.
+    csr = G.to_csr(weight=True)
+    descriptor, blocks = {}, []
+    for key, array in (('indptr', csr.indptr.astype(np.int64)), ('indices', csr.indices.astype(np.int64)),
+                       ('data', csr.data.astype(np.float64))):
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        descriptor[key] = (block.name, array.shape, array.dtype.str)
+        blocks.append(block)
+    return descriptor, blocks
+
+def graph_from_shared(descriptor):
+    """
+    Attaches to the blocks of share_graph and returns (G, blocks). G reads the
+    shared arrays in place, read-only, so no worker holds a copy of its own;
+    the blocks must stay open for as long as G is used.
+    """
+    arrays, blocks = {}, []
+    for key, (name, shape, dtype) in descriptor.items():
+        block = shared_memory.SharedMemory(name=name)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        arrays[key].setflags(write=False)
+        blocks.append(block)
+    return CompactGraph.from_csr(arrays['indptr'], arrays['indices'], data=arrays['data']), blocks
+
+_worker_graph = _worker_blocks = None
+
+def _init_worker(descriptor):
+    global _worker_graph, _worker_blocks
+    _worker_graph, _worker_blocks = graph_from_shared(descriptor)
+
+def _seeded_run(G, strategy_func, num_edges_to_add, seed, checkpoint=None, lookahead=None):
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    return run_single_strategy_simulation(G, num_edges_to_add, strategy_func, checkpoint=checkpoint, lookahead=lookahead)
+
+def _run_strategy_task(name, strategy_func, num_edges_to_add, seed, checkpoint=None, lookahead=None):
+    return name, _seeded_run(_worker_graph, strategy_func, num_edges_to_add, seed, checkpoint, lookahead)
 
-    def main():
-        NETWORK_CHOICE = 'power'
-        NUM_EDGES_TO_ADD = 20
-        G_original = load_network(NETWORK_CHOICE)
-        if G_original is None: return
-        if not nx.is_connected(G_original):
-            print("[INFO] گراف اولیه همبند نیست. بزرگترین مولفه همبند استخراج می‌شود.")
-            largest_cc_nodes = max(nx.connected_components(G_original), key=len)
-            G_original = G_original.subgraph(largest_cc_nodes).copy()
-        print(f"[INFO] مشخصات شبکه نهایی: {G_original.number_of_nodes()} گره و {G_original.number_of_edges()} یال.")
-        strategies = {
-            "PCM (Ours)": pcm_strategy,
-            "High Betweenness": betweenness_strategy,
-            "Hub (High Degree)": hub_strategy,
-            "Random": random_strategy
-        }
-        results = {}
+def _checkpoint_path(checkpoint_dir, strategy_func, run, lookahead=None):
+    if checkpoint_dir is None: return None
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    suffix = f"-lookahead{lookahead}" if lookahead else ""
+    return os.path.join(checkpoint_dir, f"{_strategy_name(strategy_func)}{suffix}-{run}.json")
+
+def _average(runs):
+    return list(np.mean(runs, axis=0)) if len(runs) > 1 else runs[0]
+
+def run_strategies_parallel(G_original, strategies, num_edges_to_add, repetitions=None, max_workers=None, seed=42, checkpoint_dir=None, lookahead=None, on_result=None):
+    """
+    Runs every strategy (and every repetition of the stochastic ones, given
+    as {name: count} in repetitions) in a process pool that shares one CSR
+    copy of G_original. Repeated runs are averaged into a single history,
+    so the result has the same {name: connectivity_history} shape as the
+    serial loop. With checkpoint_dir, every run saves its progress there and
+    resumes from it when restarted. lookahead is passed on to
+    run_single_strategy_simulation. on_result(name, history) is called as soon
+    as every run of a strategy has finished. With max_workers=1 the runs
+    happen one after another in this process, with the same seeds, so the
+    result is the same as with a pool.
+    """
+    repetitions = repetitions or {}
+    tasks = [(name, func, run) for name, func in strategies.items() for run in range(repetitions.get(name, 1))]
+    seeds = np.random.SeedSequence(seed).generate_state(len(tasks))
+    histories = {name: [] for name in strategies}
+
+    def collect(name, history):
+        histories[name].append(history)
+        if on_result is not None and len(histories[name]) == repetitions.get(name, 1):
+            on_result(name, _average(histories[name]))
+
+    if max_workers == 1:
+        for (name, func, run), task_seed in zip(tasks, seeds):
+            collect(name, _seeded_run(G_original, func, num_edges_to_add, int(task_seed),
+                                      _checkpoint_path(checkpoint_dir, func, run, lookahead), lookahead))
+        return {name: _average(runs) for name, runs in histories.items()}
+    descriptor, blocks = share_graph(G_original)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(descriptor,)) as pool:
+            futures = [pool.submit(_run_strategy_task, name, func, num_edges_to_add, int(task_seed),
+                                   _checkpoint_path(checkpoint_dir, func, run, lookahead), lookahead)
+                       for (name, func, run), task_seed in zip(tasks, seeds)]
+            for future in as_completed(futures):
+                collect(*future.result())
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return {name: _average(runs) for name, runs in histories.items()}
+
+def main(network='power', num_edges=20, random_runs=10, workers=None,
+         cache_dir=os.path.join(RESULTS_DIR, "cache"), data_dir=DATA_DIR, plot=True, lookahead=None, edges_per_step=1):
+    NETWORK_CHOICE = network
+    NUM_EDGES_TO_ADD = num_edges
+    NUM_RANDOM_RUNS = random_runs
+    NUM_WORKERS = workers  # None: one worker per CPU; 1: run serially in this process
+    CACHE_DIR = cache_dir  # None disables the history cache and the checkpoints
+    LOOKAHEAD = lookahead  # K: add the best of each strategy's top K edges by exact λ₂
+    EDGES_PER_STEP = edges_per_step  # edges the Fiedler strategy adds per eigenvector update
+    G_original = load_network(NETWORK_CHOICE, data_dir=data_dir, largest_component=True)
+    if G_original is None: return
+    if not is_connected(G_original):
+        print("[INFO] گراف اولیه همبند نیست. بزرگترین مولفه همبند استخراج می‌شود.")
+        G_original = largest_component(G_original)
+    print(f"[INFO] مشخصات شبکه نهایی: {G_original.number_of_nodes()} گره و {G_original.number_of_edges()} یال.")
+    strategies = {
+        "PCM (Ours)": pcm_strategy,
+        "High Betweenness": betweenness_strategy,
+        "Hub (High Degree)": hub_strategy,
+        "Random": random_strategy,
+        "Fiedler (λ₂ gain)": fiedler_strategy if EDGES_PER_STEP == 1 else
+                             functools.partial(fiedler_strategy, edges_per_step=EDGES_PER_STEP)
+    }
+    # Histories of runs that already finished for this exact graph are read
+    # from the cache; interrupted runs resume from their checkpoints.
+    cache = MetricCache(CACHE_DIR) if CACHE_DIR else None
+    results, keys, checkpoint_dir = {}, {}, None
+    if cache:
+        fingerprint = graph_fingerprint(G_original)
+        checkpoint_dir = os.path.join(CACHE_DIR, "checkpoints", fingerprint)
         for name, func in strategies.items():
-            results[name] = run_single_strategy_simulation(G_original, NUM_EDGES_TO_ADD, func)
-        print("\n[INFO] تمام شبیه‌سازی‌ها تکمیل شد. در حال تولید نمودار...")
-        plot_and_save_results(
-            results=results, network_name=NETWORK_CHOICE,
-            num_nodes=G_original.number_of_nodes(), num_edges=G_original.number_of_edges(),
-            num_edges_added=NUM_EDGES_TO_ADD, output_dir="../results"
+            runs = NUM_RANDOM_RUNS if name == "Random" else 1
+            keys[name] = MetricCache.key(fingerprint, 'connectivity_history', strategy=_strategy_name(func),
+                                         num_edges=NUM_EDGES_TO_ADD, runs=runs,
+                                         **({'lookahead': LOOKAHEAD} if LOOKAHEAD else {}))
+            history = cache.get(keys[name])
+            if history is not None: results[name] = history
+    pending = {name: func for name, func in strategies.items() if name not in results}
+    if len(pending) < len(strategies):
+        print(f"[INFO] نتایج ذخیره‌شده برای {len(strategies) - len(pending)} استراتژی از حافظه نهان خوانده شد.")
+    plotting = None
+    if plot:
+        # matplotlib is only imported when a figure is actually drawn.
+        import plotting
+    figure = dict(network_name=NETWORK_CHOICE, num_nodes=G_original.number_of_nodes(),
+                  num_edges=G_original.number_of_edges(), num_edges_added=NUM_EDGES_TO_ADD, output_dir=RESULTS_DIR)
+    render = None
+
+    def draw_progress():
+        # The figure is redrawn in the render pool while the other strategies
+        # still run, with one render in flight at a time.
+        nonlocal render
+        if plotting is not None and results and (render is None or render.done()):
+            render = plotting.plot_and_save_results(dict(results), **figure, background=True)
+
+    def record(name, history):
+        results[name] = history
+        if cache:
+            cache.put(keys[name], history)
+        draw_progress()
+
+    draw_progress()
+    if pending:
+        run_strategies_parallel(
+            G_original, pending, NUM_EDGES_TO_ADD,
+            repetitions={"Random": NUM_RANDOM_RUNS}, max_workers=NUM_WORKERS, checkpoint_dir=checkpoint_dir,
+            lookahead=LOOKAHEAD, on_result=record
         )
+    if not plot:
+        return results
+    print("\n[INFO] تمام شبیه‌سازی‌ها تکمیل شد. در حال تولید نمودار...")
+    if plotting.headless():
+        plotting.plot_and_save_results(results, **figure, background=True)
+        plotting.wait_for_renders()
+    else:
+        # Only this process opens a window, once the background renders (which
+        # write the same file) are done.
+        plotting.wait_for_renders()
+        plotting.plot_and_save_results(results, **figure)
+    return results
 
-    if __name__ == "__main__":
-        main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# sweep.py
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+import networks
+import resilience_metrics
+from metric_cache import MetricCache, graph_fingerprint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is then unavailable; CSV still works.
+    pa = pq = None
+
+# Metrics a sweep can compute, by the name used in the results file and the cache.
+METRICS = {
+    'auc': resilience_metrics.simulate_targeted_attack,
+    'omega_btn': resilience_metrics.calculate_omega_betweenness,
+    'omega_elec': resilience_metrics.calculate_omega_electrical,
+}
+# Columns of the results file, one row per (graph, metric) cell.
+COLUMNS = ('network', 'generator', 'params', 'nodes', 'edges', 'metric', 'value', 'status', 'error', 'attempts', 'seconds')
+# Parquet rows are written in row groups of this many.
+ROW_GROUP_SIZE = 1000
+
+class GraphSpec:
+    """A graph instance of a sweep: a networks.py generator and its keyword arguments."""
+
+    def __init__(self, generator, name=None, **params):
+        self.generator = generator
+        self.params = params
+        if name is None:
+            name = f"{generator}({', '.join(f'{k}={v}' for k, v in params.items())})"
+        self.name = name
+
+    def build(self):
+        return getattr(networks, self.generator)(**self.params)
+
+    def cost(self):
+        """Rough size, so that the largest graphs are started first."""
+        return self.params.get('n', 0) * self.params.get('m', 1)
+
+def expand_grid(generator, name=None, **grid):
+    """
+    One GraphSpec for every combination of the parameter values, e.g.
+    expand_grid('create_er_graph', n=[100, 1000], p=[0.01, 0.04], seed=range(10)).
+    name, if given, is a format string over the parameters.
+    """
+    keys = list(grid)
+    specs = []
+    for values in itertools.product(*(list(grid[key]) for key in keys)):
+        params = dict(zip(keys, values))
+        specs.append(GraphSpec(generator, name=name.format(**params) if name else None, **params))
+    return specs
+
+class _CsvWriter:
+    def __init__(self, path, rows):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+        self.write(rows)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class _ParquetWriter:
+    def __init__(self, path, rows):
+        if pq is None:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow); use a .csv path instead.")
+        self.schema = pa.schema([
+            ('network', pa.string()), ('generator', pa.string()), ('params', pa.string()),
+            ('nodes', pa.int64()), ('edges', pa.int64()), ('metric', pa.string()), ('value', pa.float64()),
+            ('status', pa.string()), ('error', pa.string()), ('attempts', pa.int64()), ('seconds', pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.pending = []
+        self.write(rows)
+
+    def write(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            columns = {column: [row[column] for row in self.pending] for column in COLUMNS}
+            self.writer.write_table(pa.table(columns, schema=self.schema))
+            self.pending = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+def _read_results(path):
+    """Rows of an earlier results file, or [] if there is none."""
+    if not os.path.exists(path):
+        return []
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("Reading Parquet results needs pyarrow (pip install pyarrow).")
+        return pq.read_table(path).to_pylist()
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row['value'] = float(row['value']) if row['value'] else math.nan
+        for column in ('nodes', 'edges', 'attempts'):
+            row[column] = int(row[column]) if row[column] else None
+        row['seconds'] = float(row['seconds']) if row['seconds'] else None
+        row['error'] = row['error'] or None
+    return rows
+
+def _open_writer(path, rows):
+    # Both formats are rewritten from the kept rows and then appended to, so a
+    # sweep resumed from a file ends up with one complete file.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    return _ParquetWriter(path, rows) if path.endswith('.parquet') else _CsvWriter(path, rows)
+
+def _worker(connection, cache_dir):
+    """
+    Builds each graph it is sent once and computes the requested metrics on it,
+    sending back one message per cell as soon as it is done.
+    """
+    cache = MetricCache(cache_dir) if cache_dir else None
+    while True:
+        task = connection.recv()
+        if task is None:
+            return
+        spec, metrics = task
+        try:
+            G = spec.build()
+            fingerprint = graph_fingerprint(G) if cache else None
+        except Exception as e:
+            for metric in metrics:
+                connection.send(('cell', metric, 'error', f"{type(e).__name__}: {e}", 0.0))
+            connection.send(('done',))
+            continue
+        connection.send(('graph', G.number_of_nodes(), G.number_of_edges()))
+        for metric in metrics:
+            start = time.perf_counter()
+            try:
+                func = METRICS[metric]
+                value = cache.compute(G, metric, func, fingerprint=fingerprint) if cache else func(G)
+                connection.send(('cell', metric, 'ok', float(value), time.perf_counter() - start))
+            except Exception as e:
+                connection.send(('cell', metric, 'error', f"{type(e).__name__}: {e}", time.perf_counter() - start))
+        connection.send(('done',))
+
+class _Slot:
+    """One worker process, with the task it is running."""
+
+    def __init__(self, context, cache_dir):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, cache_dir), daemon=True)
+        self.process.start()
+        child.close()
+        self.task = None
+
+    def start(self, spec, metrics, timeout):
+        self.task = (spec, list(metrics))
+        self.graph = (None, None)
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.connection.send((spec, metrics))
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+def run_sweep(specs, metrics=tuple(METRICS), output=None, n_jobs=None, timeout=None, retries=1,
+              cache_dir=None, resume=True, verbose=True):
+    """
+    Computes every metric on every GraphSpec in a pool of n_jobs worker
+    processes (default: all CPUs) and returns the rows, one per cell.
+
+    Each graph is built once per task and all its pending metrics are
+    computed on it. Rows are written to output (.parquet with pyarrow, else
+    .csv) as they arrive. A cell that raises, runs longer than timeout
+    seconds (the graph construction counts towards its first cell) or kills
+    its worker is retried up to retries times, on a fresh worker if needed,
+    and then recorded with status 'error', 'timeout' or 'crashed'. With
+    resume, cells already computed in an existing output file are kept.
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+    done = {}
+    if output and resume:
+        for row in _read_results(output):
+            if row['status'] == 'ok':
+                done[(row['network'], row['metric'])] = row
+    writer = _open_writer(output, list(done.values())) if output else None
+    by_name = {spec.name: spec for spec in specs}
+    if len(by_name) != len(specs):
+        raise ValueError("Graph specs must have distinct names.")
+
+    queue = deque()
+    for spec in sorted(specs, key=lambda s: -s.cost()):
+        pending = [metric for metric in metrics if (spec.name, metric) not in done]
+        if pending:
+            queue.append((spec, pending))
+    attempts = {}
+    total, finished = sum(len(pending) for _, pending in queue), 0
+
+    def record(spec, metric, status, value, seconds, graph):
+        nonlocal finished
+        key = (spec.name, metric)
+        attempts[key] = attempts.get(key, 0) + 1
+        if status != 'ok' and attempts[key] <= retries:
+            return False
+        row = {
+            'network': spec.name, 'generator': spec.generator, 'params': json.dumps(spec.params, default=str),
+            'nodes': graph[0], 'edges': graph[1], 'metric': metric,
+            'value': value if status == 'ok' else math.nan, 'status': status,
+            'error': value if status == 'error' else None,
+            'attempts': attempts[key], 'seconds': seconds,
+        }
+        done[key] = row
+        if writer:
+            writer.write([row])
+        finished += 1
+        if verbose:
+            note = f"{value:.6f}" if status == 'ok' else f"error ({value})" if status == 'error' else status
+            print(f"[{finished}/{total}] {spec.name} {metric}: {note}", flush=True)
+        return True
+
+    context = mp.get_context()
+    slots = [_Slot(context, cache_dir) for _ in range(min(n_jobs or os.cpu_count() or 1, max(len(queue), 1)))]
+    try:
+        while queue or any(slot.task for slot in slots):
+            for slot in slots:
+                if slot.task is None and queue:
+                    slot.start(*queue.popleft(), timeout)
+            busy = [slot for slot in slots if slot.task]
+            deadlines = [slot.deadline for slot in busy if slot.deadline is not None]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = wait([slot.connection for slot in busy], timeout=wait_for)
+            for index, slot in enumerate(slots):
+                if slot.task is None:
+                    continue
+                spec, pending = slot.task
+                failure = None
+                if slot.connection in ready:
+                    try:
+                        message = slot.connection.recv()
+                    except EOFError:
+                        failure = 'crashed'
+                    else:
+                        if message[0] == 'graph':
+                            slot.graph = message[1:]
+                        elif message[0] == 'cell':
+                            _, metric, status, value, seconds = message
+                            pending.remove(metric)
+                            if not record(spec, metric, status, value, seconds, slot.graph):
+                                queue.append((spec, [metric]))
+                            if timeout:
+                                slot.deadline = time.monotonic() + timeout
+                        else:
+                            slot.task = None
+                elif slot.deadline is not None and time.monotonic() >= slot.deadline:
+                    failure = 'timeout'
+                if failure and not pending:
+                    # Every cell was recorded and only the 'done' message was
+                    # lost, so the task is finished; the worker is replaced.
+                    slot.stop()
+                    slots[index] = _Slot(context, cache_dir)
+                elif failure:
+                    # The running cell is the first pending one; the worker is
+                    # replaced and the rest of its metrics go back in the queue.
+                    metric, rest = pending[0], pending[1:]
+                    if not record(spec, metric, failure, None, timeout if failure == 'timeout' else None, slot.graph):
+                        rest = [metric] + rest
+                    if rest:
+                        queue.append((spec, rest))
+                    slot.stop()
+                    slots[index] = _Slot(context, cache_dir)
+    finally:
+        for slot in slots:
+            if slot.task is None and slot.process.is_alive():
+                slot.connection.send(None)
+                slot.process.join()
+            else:
+                slot.stop()
+        if writer:
+            writer.close()
+    return [done[(spec.name, metric)] for spec in specs for metric in metrics if (spec.name, metric) in done]
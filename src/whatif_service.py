@@ -0,0 +1,308 @@
+# whatif_service.py
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, eigsh, splu
+
+from compact_graph import CompactGraph, is_connected, largest_component, laplacian_matrix
+from resilience_calculator import SPARSE_SHIFT, calculate_fiedler_pair
+from resilience_metrics import _edge_endpoints, _exact_effective_resistances, _grounded_laplacian_factor, _omega_from_flows
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Below this many nodes λ₂ of a query is computed densely.
+DENSE_QUERY_MAX_NODES = 50
+
+class _LowRankUpdate:
+    """
+    Solves with A + B S Bᵀ by the Woodbury identity, given a solver for A.
+    Each column of B is e_u - e_v for one updated edge, and S holds +1 for
+    added and -w for removed edges of weight w. With a ground node, A is the grounded
+    Laplacian and the ground row of B is dropped.
+    """
+
+    def __init__(self, solve, n, pairs, signs, ground=None):
+        self.solve_base = solve
+        self.ground = ground
+        self.pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        B = np.zeros((n, len(self.pairs)))
+        columns = np.arange(len(self.pairs))
+        B[self.pairs[:, 0], columns] = 1.0
+        B[self.pairs[:, 1], columns] = -1.0
+        self.B = self._restrict(B)
+        self.X = solve(self.B)
+        self.capacitance = np.diag(1.0 / np.asarray(signs, dtype=np.float64)) + self.B.T @ self.X
+
+    def _restrict(self, Y):
+        return Y if self.ground is None else np.delete(Y, self.ground, axis=0)
+
+    def full_rows(self):
+        """X with a zero row put back at the ground node."""
+        return self.X if self.ground is None else np.insert(self.X, self.ground, 0.0, axis=0)
+
+    def solve(self, Y):
+        Z = self.solve_base(Y)
+        return Z - self.X @ np.linalg.solve(self.capacitance, self.B.T @ Z)
+
+class WhatIfState:
+    """
+    A topology kept in memory with warm solver state, answering what-if
+    queries (added edges, removed edges, removed nodes) with λ₂, the size of
+    the largest component and Ω_elec of the changed graph.
+
+    The base graph is never modified. Every change in a query is a rank-1
+    term of the Laplacian, so a query costs a few solves with the base
+    factorizations through the Woodbury identity:
+    - λ₂: shift-invert eigsh with the LU of L - σI, warm-started from the
+      base Fiedler vector.
+    - Ω_elec: effective resistances are the base ones minus a low-rank
+      correction. The graph is first rearranged so the pieces cut off from
+      the largest component hang from it by single edges, which leaves its
+      resistances unchanged.
+    - Components: added edges cannot split the connected base graph, so only
+      queries that remove something need one sparse component labelling.
+    """
+
+    def __init__(self, G):
+        if not is_connected(G):
+            G = largest_component(G)
+        self.graph = CompactGraph.from_networkx(G)
+        self.index = {label: i for i, label in enumerate(self.graph.labels)}
+        n = self.graph.number_of_nodes()
+        rows, cols = _edge_endpoints(self.graph)
+        loops = rows == cols
+        self.rows, self.cols = rows[~loops], cols[~loops]
+        self.weights = np.array([self.graph.weight(u, v) for u, v in zip(self.rows.tolist(), self.cols.tolist())])
+        self.edge_ids = {(min(u, v), max(u, v)): e for e, (u, v) in enumerate(zip(self.rows.tolist(), self.cols.tolist()))}
+        self.L = sp.csr_matrix(laplacian_matrix(self.graph), dtype=np.float64)
+        self.lambda2, self.fiedler = calculate_fiedler_pair(self.graph)
+        self.shift_lu = splu(sp.csc_matrix(self.L - SPARSE_SHIFT * sp.identity(n)))
+        self.ground = n - 1
+        self.ground_lu = _grounded_laplacian_factor(self.graph) if n > 1 else None
+        self.resistances = _exact_effective_resistances(self.ground_lu, n, self.rows, self.cols) if len(self.rows) else np.zeros(0)
+        self.baseline = {
+            'lambda2': float(self.lambda2), 'gcc_size': n, 'gcc_fraction': 1.0,
+            'omega_elec': float(_omega_from_flows(1.0 / self.resistances)) if len(self.rows) and n > 1 else 0.0,
+        }
+
+    def _node(self, label):
+        try:
+            return self.index[label]
+        except KeyError:
+            raise ValueError(f"Unknown node: {label}") from None
+
+    def _edge(self, u, v):
+        return (min(u, v), max(u, v))
+
+    def _parse(self, query):
+        removed_nodes = sorted({self._node(label) for label in query.get('remove_nodes', [])})
+        removed = set()
+        for label_u, label_v in query.get('remove_edges', []):
+            key = self._edge(self._node(label_u), self._node(label_v))
+            if key not in self.edge_ids:
+                raise ValueError(f"No edge ({label_u}, {label_v}) to remove")
+            removed.add(self.edge_ids[key])
+        gone = set(removed_nodes)
+        for v in removed_nodes:
+            removed.update(self.edge_ids[self._edge(v, w)] for w in self.graph.adj[v] if w != v)
+        added = set()
+        for label_u, label_v in query.get('add_edges', []):
+            u, v = self._node(label_u), self._node(label_v)
+            if u in gone or v in gone:
+                raise ValueError(f"Edge ({label_u}, {label_v}) touches a removed node")
+            key = self._edge(u, v)
+            if u == v or (key in self.edge_ids and self.edge_ids[key] not in removed):
+                # Self-loops and existing edges leave the metrics unchanged.
+                continue
+            if key in self.edge_ids:
+                removed.discard(self.edge_ids[key])
+            else:
+                added.add(key)
+        return removed_nodes, sorted(removed), sorted(added)
+
+    def _components(self, removed, added):
+        n = self.graph.number_of_nodes()
+        keep = np.ones(len(self.rows), dtype=bool)
+        keep[removed] = False
+        added = np.array(added, dtype=np.int64).reshape(-1, 2)
+        rows = np.r_[self.rows[keep], added[:, 0]]
+        cols = np.r_[self.cols[keep], added[:, 1]]
+        A = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        return connected_components(A, directed=False)[1]
+
+    def _lambda2(self, removed_nodes, removed, added, alive_connected):
+        """λ₂ of the changed graph without the removed nodes (0 if it is disconnected)."""
+        if not alive_connected:
+            return 0.0
+        n = self.graph.number_of_nodes()
+        pairs = [(self.rows[e], self.cols[e]) for e in removed] + list(added)
+        signs = [-self.weights[e] for e in removed] + [1.0] * len(added)
+        B = sp.csr_matrix((np.tile([1.0, -1.0], len(pairs)), (np.repeat(np.arange(len(pairs)), 2), np.ravel(pairs))),
+                          shape=(len(pairs), n))
+        L = (self.L + B.T @ sp.diags(signs) @ B).tocsr()
+        # Each removed node is left isolated and adds one more zero eigenvalue.
+        k = len(removed_nodes) + 2
+        if n <= DENSE_QUERY_MAX_NODES or k >= n - 1:
+            alive = np.setdiff1d(np.arange(n), removed_nodes)
+            if len(alive) < 2:
+                return 0.0
+            return float(max(0.0, np.linalg.eigvalsh(L[alive][:, alive].toarray())[1]))
+        update = _LowRankUpdate(self.shift_lu.solve, n, pairs, signs)
+        operator = LinearOperator((n, n), matvec=update.solve, dtype=np.float64)
+        v0 = self.fiedler + 1.0 / np.sqrt(n) if self.fiedler is not None else None
+        eigenvalues = eigsh(L, k=k, sigma=SPARSE_SHIFT, which='LM', OPinv=operator, v0=v0, tol=1e-10,
+                            return_eigenvectors=False)
+        return float(max(0.0, np.sort(eigenvalues)[-1]))
+
+    def _omega_elec(self, removed, added, in_gcc):
+        """Ω_elec of the largest component of the changed graph."""
+        removed_set = set(removed)
+        inside = in_gcc[self.rows] & in_gcc[self.cols]
+        crossing = in_gcc[self.rows] != in_gcc[self.cols]
+        updates = [e for e in removed if inside[e]]
+        # The rest of the graph is kept (removed nodes included) but attached
+        # to the component by one edge per outside piece, so no current from
+        # inside the component flows through it.
+        outside_edges = ~(in_gcc[self.rows] | in_gcc[self.cols])
+        n = self.graph.number_of_nodes()
+        O = sp.csr_matrix((np.ones(int(outside_edges.sum())), (self.rows[outside_edges], self.cols[outside_edges])), shape=(n, n))
+        piece = connected_components(O, directed=False)[1]
+        attached = set()
+        for e in np.flatnonzero(crossing):
+            outer = self.rows[e] if not in_gcc[self.rows[e]] else self.cols[e]
+            if piece[outer] in attached:
+                updates.append(e)
+            else:
+                attached.add(piece[outer])
+        added_inside = [(u, v) for u, v in added if in_gcc[u] and in_gcc[v]]
+        pairs = [(self.rows[e], self.cols[e]) for e in updates] + added_inside
+        signs = [-self.weights[e] for e in updates] + [1.0] * len(added_inside)
+        kept = inside.copy()
+        kept[list(removed_set)] = False
+        if not kept.any() and not added_inside:
+            return 0.0
+        resistances = self.resistances[kept]
+        if pairs:
+            update = _LowRankUpdate(self.ground_lu.solve, n, pairs, signs, ground=self.ground)
+            X = update.full_rows()
+            rows = np.r_[self.rows[kept], [u for u, _ in added_inside]].astype(np.int64)
+            cols = np.r_[self.cols[kept], [v for _, v in added_inside]].astype(np.int64)
+            D = X[rows] - X[cols]
+            correction = np.sum(D * np.linalg.solve(update.capacitance, D.T).T, axis=1)
+            # Base resistances of the added edges are read off Bᵀ Γ B.
+            base = np.diag(update.B.T @ update.X)[len(updates):]
+            resistances = np.r_[resistances, base] - correction
+        return float(_omega_from_flows(1.0 / resistances))
+
+    def evaluate(self, query):
+        """
+        Answers one query, a dict with any of 'add_edges', 'remove_edges'
+        (lists of [u, v]) and 'remove_nodes' (list of nodes), in the original
+        node labels. Returns the metrics of the changed graph; the base graph
+        and its solver state are left as they were.
+        """
+        start = time.perf_counter()
+        removed_nodes, removed, added = self._parse(query)
+        n = self.graph.number_of_nodes()
+        if not removed and not added:
+            result = dict(self.baseline)
+        else:
+            if removed:
+                labels = self._components(removed, added)
+                alive = np.ones(n, dtype=bool)
+                alive[removed_nodes] = False
+                sizes = np.bincount(labels[alive])
+                largest = int(np.argmax(sizes))
+                in_gcc = (labels == largest) & alive
+                alive_connected = np.count_nonzero(sizes) == 1
+            else:
+                # The base graph is connected and added edges cannot split it.
+                in_gcc, alive_connected = np.ones(n, dtype=bool), True
+            gcc_size = int(in_gcc.sum())
+            result = {
+                'lambda2': self._lambda2(removed_nodes, removed, added, alive_connected),
+                'gcc_size': gcc_size, 'gcc_fraction': gcc_size / n,
+                'omega_elec': self._omega_elec(removed, added, in_gcc) if gcc_size > 1 else 0.0,
+            }
+        result['milliseconds'] = (time.perf_counter() - start) * 1e3
+        return result
+
+    def answer(self, request):
+        """Handles one request: {'queries': [...]} or {'baseline': true}."""
+        if request.get('baseline'):
+            return {'baseline': self.baseline}
+        results = []
+        for query in request.get('queries', []):
+            try:
+                results.append(self.evaluate(query))
+            except ValueError as e:
+                results.append({'error': str(e)})
+        return {'results': results}
+
+async def serve(state, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Serves the state over TCP, one JSON request per line and one JSON
+    response per line. Queries run in a worker thread, one request at a time.
+    """
+    lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    async with lock:
+                        response = await asyncio.to_thread(state.answer, request)
+                except (json.JSONDecodeError, AttributeError, TypeError) as e:
+                    response = {'error': f"Bad request: {e}"}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+async def query(requests, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Client helper: sends the requests on one connection and returns the responses."""
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    try:
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return responses
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serves what-if queries on a network loaded in memory.")
+    parser.add_argument('--network', default='power')
+    parser.add_argument('--data-dir', default=None, help="default: data/ next to src/")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    from simulation_runner import DATA_DIR, load_network
+    G = load_network(args.network, data_dir=args.data_dir or DATA_DIR, largest_component=True)
+    if G is None:
+        return 1
+    state = WhatIfState(G)
+    print(f"Loaded {state.graph.number_of_nodes()} nodes: {state.baseline}")
+
+    async def run():
+        server = await serve(state, args.host, args.port)
+        print(f"Listening on {args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
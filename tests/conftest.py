@@ -0,0 +1,48 @@
+# tests/conftest.py
+import os
+import sys
+import networkx as nx
+import pytest
+
+# The modules in src/ import each other as top-level modules.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Graph families a test can ask for with @pytest.mark.graphs(...). Each test gets
+# a fresh graph, so tests may mutate it.
+GRAPH_FAMILIES = {
+    "ba": lambda: nx.barabasi_albert_graph(60, 2, seed=1),
+    "ws": lambda: nx.connected_watts_strogatz_graph(60, 4, 0.2, seed=2),
+    "er": lambda: nx.gnp_random_graph(60, 0.06, seed=3),
+    # Disconnected, with isolated nodes.
+    "er-sparse": lambda: nx.gnp_random_graph(60, 0.03, seed=4),
+    "grid": lambda: nx.grid_2d_graph(6, 7),
+    # Trees: every removal of an inner node splits them.
+    "tree": lambda: nx.barabasi_albert_graph(80, 1, seed=3),
+    "balanced-tree": lambda: nx.balanced_tree(3, 3),
+    # A ring with a few shortcuts: most removals still split it.
+    "ring": lambda: nx.connected_watts_strogatz_graph(60, 2, 0.1, seed=2),
+    "self-loop": lambda: nx.Graph([(0, 1), (1, 1), (1, 2), (3, 4)]),
+    # Every edge carries a 'weight'.
+    "karate": nx.karate_club_graph,
+    # Large enough for the sparse eigensolvers to matter.
+    "grid-large": lambda: nx.grid_2d_graph(12, 15),
+    "ws-large": lambda: nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=5),
+    "ba-large": lambda: nx.barabasi_albert_graph(300, 2, seed=5),
+    # Seeds on which the pcm pair depends on the BFS neighbour order.
+    "ws-seed7": lambda: nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=7),
+    "ws-seed29": lambda: nx.connected_watts_strogatz_graph(60, 4, 0.1, seed=29),
+    "er-seed39": lambda: nx.gnp_random_graph(60, 0.06, seed=39),
+    "er-sparse-seed37": lambda: nx.gnp_random_graph(50, 0.03, seed=37),
+}
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "graphs(*names): run the test once per named graph family")
+
+def pytest_generate_tests(metafunc):
+    marker = metafunc.definition.get_closest_marker("graphs")
+    if marker is not None:
+        metafunc.parametrize("graph", marker.args, indirect=True)
+
+@pytest.fixture
+def graph(request):
+    return GRAPH_FAMILIES[request.param]()
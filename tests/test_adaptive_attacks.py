@@ -0,0 +1,52 @@
+# tests/test_adaptive_attacks.py
+import networkx as nx
+import pytest
+
+from adaptive_attacks import adaptive_attack_order
+
+def naive_adaptive_order(G, score_of):
+    # Rescores every node on the damaged graph after each removal and takes
+    # the best one (the first in node order on ties).
+    G = G.copy()
+    order = []
+    while G.number_of_nodes():
+        scores = score_of(G)
+        best = max(scores.values())
+        node = next(v for v in G if scores[v] >= best - 1e-9)
+        order.append(node)
+        G.remove_node(node)
+    return order
+
+def collective_influence(G, radius=2):
+    scores = {}
+    for v in G:
+        distances = nx.single_source_shortest_path_length(G, v, cutoff=radius)
+        boundary = [w for w, d in distances.items() if d == radius]
+        scores[v] = (G.degree(v) - 1) * sum(G.degree(w) - 1 for w in boundary) if G.degree(v) > 1 else 0.0
+    return scores
+
+@pytest.mark.graphs("ba", "ws", "er")
+def test_adaptive_degree_attack_matches_rescoring(graph):
+    G = graph
+    assert adaptive_attack_order(G, score='degree') == naive_adaptive_order(G, lambda H: dict(H.degree()))
+
+@pytest.mark.graphs("ba", "ws", "er")
+def test_adaptive_ci_attack_matches_rescoring(graph):
+    G = graph
+    assert adaptive_attack_order(G, score='ci') == naive_adaptive_order(G, collective_influence)
+
+@pytest.mark.graphs("ba", "ws", "er")
+def test_adaptive_betweenness_attack_starts_with_the_most_central_node(graph):
+    G = graph
+    order = adaptive_attack_order(G, score='betweenness', pivots=G.number_of_nodes(), seed=0)
+    betweenness = nx.betweenness_centrality(G)
+    assert betweenness[order[0]] == pytest.approx(max(betweenness.values()))
+    assert sorted(order) == sorted(G.nodes())
+
+def test_removed_pivot_stops_counting():
+    # Once the centre of the path is gone every score is 0, so the rest
+    # goes in node order; a pivot still counting paths from the removed
+    # centre would pick 1 next.
+    G = nx.path_graph(5)
+    assert adaptive_attack_order(G, score='betweenness', pivots=5, seed=0) == \
+        naive_adaptive_order(G, lambda H: nx.betweenness_centrality(H, normalized=False))
@@ -0,0 +1,31 @@
+# tests/test_algebraic_connectivity.py
+import networkx as nx
+import numpy as np
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import calculate_algebraic_connectivity, calculate_fiedler_pair
+
+@pytest.mark.graphs("grid-large", "ws-large", "ba-large")
+def test_sparse_lambda2_matches_dense(graph):
+    G = graph
+    dense, dense_vector = calculate_fiedler_pair(G, method='dense')
+    sparse, sparse_vector = calculate_fiedler_pair(G, method='sparse')
+    assert sparse == pytest.approx(dense, abs=1e-8)
+    # The Fiedler vector is defined up to sign.
+    assert abs(np.dot(sparse_vector, dense_vector)) == pytest.approx(1.0, abs=1e-6)
+    assert calculate_algebraic_connectivity(CompactGraph.from_networkx(G), method='sparse') == pytest.approx(dense, abs=1e-8)
+
+def test_warm_start_gives_the_same_lambda2():
+    G = nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=5)
+    _, fiedler = calculate_fiedler_pair(G, method='sparse')
+    G.add_edge(0, 150)
+    cold = calculate_algebraic_connectivity(G, method='sparse')
+    warm = calculate_algebraic_connectivity(G, method='sparse', v0=fiedler)
+    assert warm == pytest.approx(cold, abs=1e-8)
+    assert warm == pytest.approx(calculate_algebraic_connectivity(G, method='dense'), abs=1e-8)
+
+def test_disconnected_graph_has_zero_lambda2():
+    G = nx.disjoint_union(nx.cycle_graph(5), nx.path_graph(4))
+    assert calculate_algebraic_connectivity(G, method='sparse') == 0.0
+    assert calculate_algebraic_connectivity(G, method='dense') == 0.0
@@ -0,0 +1,23 @@
+# tests/test_benchmark.py
+import pytest
+
+import benchmark
+
+def result(case, size, seconds, status='ok'):
+    return {'case': case, 'family': 'er', 'size': size, 'nodes': size, 'seconds': seconds, 'status': status}
+
+def test_scaling_exponent_is_the_log_log_slope():
+    results = [result('a', n, 1e-6 * n ** 2) for n in (100, 1000, 10000)] + [result('a', 100000, 0, 'timeout')]
+    assert benchmark.scaling_exponents(results)['a']['er'] == pytest.approx(2.0)
+
+def test_compare_flags_regressions_and_improvements():
+    baseline = {'results': [result('a', 100, 1.0), result('b', 100, 1.0), result('c', 100, 1.0)]}
+    report = {'results': [result('a', 100, 1.5), result('b', 100, 0.5), result('c', 100, 1.1), result('d', 100, 1.0)]}
+    verdicts = {row[0]: row[-1] for row in benchmark.compare(report, baseline, threshold=0.2)}
+    assert verdicts == {'a': 'regression', 'b': 'improvement', 'c': 'same'}
+
+def test_case_runs_in_its_own_process():
+    measured = benchmark.run_case('algebraic_connectivity', 'ws', 100, timeout=60)
+    assert measured['status'] == 'ok'
+    assert (measured['nodes'], measured['edges']) == (100, 200)
+    assert measured['seconds'] > 0
@@ -0,0 +1,45 @@
+# tests/test_betweenness_tracker.py
+import networkx as nx
+import numpy as np
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import BetweennessTracker, _notify_edge_added, betweenness_strategy
+
+def recomputed_strategy(G):
+    # The original betweenness_strategy: a fresh nx betweenness every step
+    # (rounded, so that float noise does not reorder ties).
+    betweenness = nx.betweenness_centrality(G, normalized=True)
+    ranked = sorted(G.nodes(), key=lambda v: round(betweenness[v], 9), reverse=True)
+    for i, u in enumerate(ranked):
+        for v in ranked[i + 1:]:
+            if not G.has_edge(u, v):
+                return (u, v)
+
+@pytest.mark.graphs("ws", "ba", "er-sparse")
+def test_tracked_scores_match_recomputed_betweenness(graph):
+    G = CompactGraph.from_networkx(graph)
+    tracker = BetweennessTracker(G)
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        u, v = (int(x) for x in rng.choice(G.number_of_nodes(), 2, replace=False))
+        G.add_edge(u, v)
+        tracker.add_edge(u, v)
+    expected = nx.betweenness_centrality(G.to_networkx(relabel=False), normalized=False)
+    assert tracker.scores == pytest.approx([2 * expected[v] for v in G.nodes()], abs=1e-9)
+    assert tracker.recomputed_pivots < 11 * G.number_of_nodes()
+    # The repaired pivots hold what a fresh BFS from them finds.
+    fresh = BetweennessTracker(G)
+    assert np.array_equal(tracker.depth, fresh.depth) and np.allclose(tracker.sigma, fresh.sigma)
+
+@pytest.mark.graphs("ws", "ba", "er-sparse")
+def test_betweenness_strategy_matches_recomputation(graph):
+    G = nx.convert_node_labels_to_integers(graph)
+    compact = CompactGraph.from_networkx(G)
+    for step in range(12):
+        expected = recomputed_strategy(G)
+        edge = betweenness_strategy(compact)
+        assert edge == expected, f"step {step}"
+        G.add_edge(*edge)
+        compact.add_edge(*edge)
+        _notify_edge_added(compact, *edge)
@@ -0,0 +1,75 @@
+# tests/test_cascades.py
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import instrumentation
+from cascades import OVERLOAD_RTOL, CascadeModel, cascade_sizes_per_step, cascade_sweep, motter_lai_cascade
+from resilience_calculator import pcm_strategy
+
+def naive_cascade(G, alpha):
+    # Motter-Lai with a full betweenness recomputation after every wave.
+    # Loads count ordered pairs, as the Brandes kernel does.
+    initial = {v: 2 * b for v, b in nx.betweenness_centrality(G, normalized=False).items()}
+    trigger = max(G.nodes(), key=lambda v: (initial[v], -list(G.nodes()).index(v)))
+    H = G.copy()
+    failed, waves = [trigger], 0
+    while True:
+        H.remove_nodes_from([v for v in failed if v in H])
+        load = nx.betweenness_centrality(H, normalized=False)
+        overloaded = [v for v in H if 2 * load[v] > (1 + alpha) * initial[v] * (1 + OVERLOAD_RTOL) + OVERLOAD_RTOL]
+        if not overloaded:
+            break
+        failed.extend(overloaded)
+        waves += 1
+    largest = max((len(c) for c in nx.connected_components(H)), default=0)
+    return {'failed': len(failed), 'waves': waves, 'gcc_fraction': largest / G.number_of_nodes(), 'failed_nodes': failed}
+
+@pytest.mark.graphs("ba", "ws", "er")
+def test_cascade_sweep_matches_naive_motter_lai(graph):
+    G = graph
+    alphas = [0.0, 0.1, 0.3]
+    for result, alpha in zip(cascade_sweep(G, alphas), alphas):
+        expected = naive_cascade(G, alpha)
+        assert result['alpha'] == alpha
+        assert {key: result[key] for key in expected} == pytest.approx(expected)
+
+def test_explicit_trigger():
+    G = nx.path_graph(7)
+    result = motter_lai_cascade(G, alpha=10.0, trigger=0)
+    assert result['failed_nodes'] == [0] and result['gcc_fraction'] == pytest.approx(6 / 7)
+
+def test_cascades_follow_the_rewired_graph():
+    G = nx.path_graph(12)
+    history, cascades = cascade_sizes_per_step(G, pcm_strategy, 3, alphas=(0.2,))
+    assert len(history) == len(cascades) == 4
+    assert cascades[0] == cascade_sweep(G, (0.2,))
+    rewired = G.copy()
+    rewired.add_edge(0, 11)
+    assert cascades[1][0]['failed'] == cascade_sweep(rewired, (0.2,))[0]['failed']
+
+def test_only_sources_routing_through_failed_nodes_are_recomputed(tmp_path):
+    G = nx.balanced_tree(2, 5)
+    leaves = [v for v in G if G.degree(v) == 1]
+    path = str(tmp_path / "trace.jsonl")
+    instrumentation.enable(path)
+    try:
+        model = CascadeModel(G)
+        columns = tuple(array.copy() for array in model.initial_columns)
+        alive = model._remove(columns, np.ones(len(G), dtype=bool), leaves[:8])
+        alive = model._remove(columns, alive, [1])
+    finally:
+        instrumentation.disable()
+    H = G.copy()
+    H.remove_nodes_from(leaves[:8] + [1])
+    expected = nx.betweenness_centrality(H, normalized=False)
+    load = model._load(columns[2])
+    assert load[list(H)] == pytest.approx([2 * expected[v] for v in H], abs=1e-9)
+    assert not load[~alive].any()
+    with open(path) as f:
+        recomputed = [json.loads(line)['args']['sources'] for line in f if 'cascade.recomputed_sources' in line]
+    # Leaves are never inside a shortest path, so the first wave recomputes
+    # no source; node 1 splits the tree and every other source is recomputed.
+    assert recomputed == [len(G), len(H)]
@@ -0,0 +1,50 @@
+# tests/test_cli.py
+import json
+import os
+import subprocess
+import sys
+
+import networkx as nx
+
+import benchmark
+import main
+import main_resilience
+import resilience_metrics
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def test_default_outputs_do_not_depend_on_the_working_directory():
+    results = os.path.join(os.path.dirname(SRC_DIR), "results")
+    assert main_resilience.RESULTS_FILE.startswith(results)
+    assert main_resilience.run_analysis.__defaults__[0] == os.path.join(results, "cache")
+    assert main.main.__defaults__[-1].startswith(results)
+    assert benchmark.PROJECT_DIR == os.path.dirname(SRC_DIR)
+
+def test_metrics_command_prints_the_metrics_as_json(tmp_path):
+    # Run from another directory: nothing may be resolved against the cwd.
+    output = subprocess.run([sys.executable, os.path.join(SRC_DIR, "cli.py"), 'metrics', '--metrics', 'auc', 'omega_btn'],
+                            cwd=tmp_path, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    G = nx.karate_club_graph()
+    assert (result['nodes'], result['edges']) == (G.number_of_nodes(), G.number_of_edges())
+    assert abs(result['auc'] - resilience_metrics.simulate_targeted_attack(G)) < 1e-9
+    assert abs(result['omega_btn'] - resilience_metrics.calculate_omega_betweenness(G)) < 1e-9
+    assert not os.listdir(tmp_path)
+
+def test_metrics_command_does_not_load_the_sparse_solvers():
+    code = ("import sys, cli; cli.main(['metrics', '--metrics', 'auc']); "
+            "print('scipy.sparse.linalg' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, capture_output=True, text=True, check=True).stdout
+    assert output.splitlines()[-1] == 'False'
+
+def test_attack_command_runs_every_scenario(tmp_path):
+    completed = subprocess.run([sys.executable, os.path.join(SRC_DIR, "cli.py"), 'attack', '--nodes', '30', '--no-plot'],
+                               cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert "Motter-Lai" in completed.stdout
+    assert not os.listdir(tmp_path)
+
+def test_simulate_defaults_are_absolute():
+    import cli
+    args = cli.build_parser().parse_args(['simulate'])
+    assert os.path.isabs(args.cache_dir) and args.lookahead is None and args.edges_per_step == 1
+    assert cli.build_parser().parse_args(['simulate', '--edges-per-step', '4']).edges_per_step == 4
@@ -0,0 +1,56 @@
+# tests/test_compact_graph.py
+import networkx as nx
+import numpy as np
+import pytest
+
+from compact_graph import (CompactGraph, component_labels, is_connected, largest_component, largest_component_nodes,
+                           laplacian_matrix)
+
+@pytest.mark.graphs("grid", "er-sparse", "self-loop")
+def test_compact_graph_matches_relabelled_networkx_copy(graph):
+    G = graph
+    compact = CompactGraph.from_networkx(G)
+    expected = nx.convert_node_labels_to_integers(G.copy())
+    assert compact.labels == list(G.nodes())
+    assert [list(compact.adj[v]) for v in compact] == [list(expected.adj[v]) for v in expected]
+    assert compact.edges() == list(expected.edges())
+    assert compact.degree() == list(expected.degree())
+    assert compact.number_of_edges() == expected.number_of_edges()
+    assert is_connected(compact) == nx.is_connected(expected)
+    assert component_labels(compact)[0] == nx.number_connected_components(expected)
+    assert sorted(largest_component(compact).labels, key=str) == \
+        sorted(max(nx.connected_components(G), key=len), key=str)
+    assert nx.utils.graphs_equal(compact.to_networkx(), G)
+
+def test_laplacian_ignores_self_loops():
+    G = nx.Graph([(0, 1), (1, 1), (1, 2)])
+    expected = nx.laplacian_matrix(G).toarray()
+    assert np.array_equal(laplacian_matrix(CompactGraph.from_networkx(G)).toarray(), expected)
+
+def test_edge_weights_are_kept():
+    G = nx.karate_club_graph()
+    compact = CompactGraph.from_networkx(G)
+    expected = nx.laplacian_matrix(G).toarray()
+    assert np.allclose(laplacian_matrix(compact).toarray(), expected)
+    assert list(compact.to_networkx().edges(data='weight', default=1)) == list(G.edges(data='weight'))
+    A = compact.to_csr(weight=True)
+    wrapped = CompactGraph.from_csr(A.indptr, A.indices, data=A.data)
+    assert np.allclose(laplacian_matrix(wrapped).toarray(), expected)
+    copy = compact.copy()
+    copy.remove_edge(0, 1)
+    copy.add_edge(0, 1)
+    assert copy.weight(0, 1) == 1.0 and compact.weight(0, 1) == G[0][1]['weight']
+    sub = compact.subgraph([0, 1, 2])
+    assert sub.weight(1, 2) == G[1][2]['weight']
+
+def test_largest_component_nodes_come_in_node_order():
+    G = nx.Graph()
+    G.add_nodes_from(['q', 'z', 'e', 'a', 'x', 'b', 'w', 'c', 'y'])
+    G.add_edges_from([('c', 'a'), ('b', 'z'), ('a', 'b'), ('x', 'y'), ('w', 'q')])
+    assert largest_component_nodes(G) == ['z', 'a', 'b', 'c']
+    assert largest_component_nodes(CompactGraph.from_networkx(G)) == [1, 3, 5, 7]
+    assert largest_component(CompactGraph.from_networkx(G)).labels == ['z', 'a', 'b', 'c']
+    # On a tie, the component holding the earliest node.
+    G.remove_edge('a', 'b')
+    assert largest_component_nodes(G) == ['q', 'w']
+    assert largest_component_nodes(CompactGraph.from_networkx(G)) == [0, 6]
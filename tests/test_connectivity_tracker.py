@@ -0,0 +1,67 @@
+# tests/test_connectivity_tracker.py
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import (ConnectivityTracker, _graph_states, _safe_fiedler_pair, fiedler_strategy,
+                                   pcm_strategy, run_single_strategy_simulation)
+
+@pytest.mark.parametrize('method', ['dense', 'sparse'])
+def test_tracked_lambda2_agrees_with_a_full_solve_within_tol(method):
+    tol = 1e-10
+    G = CompactGraph.from_networkx(nx.connected_watts_strogatz_graph(120, 4, 0.1, seed=3))
+    tracker = ConnectivityTracker(G, tol=tol, method=method)
+    for u, v in [(0, 60), (5, 90), (30, 100), (1, 2), (47, 118), (12, 73)]:
+        G.add_edge(u, v)
+        tracker.add_edge(u, v)
+        assert abs(tracker.algebraic_connectivity - _safe_fiedler_pair(G, method='dense')[0]) <= tol
+    assert tracker.incremental_updates > 0
+
+@pytest.mark.parametrize('method', ['dense', 'sparse'])
+def test_simulation_tracker_uses_the_requested_tol(method):
+    G = nx.connected_watts_strogatz_graph(150, 4, 0.1, seed=1)
+    graphs = []
+    history = run_single_strategy_simulation(G, 8, pcm_strategy, method=method, tol=1e-10, verbose=False,
+                                             on_step=lambda H, step: graphs.append(H))
+    assert _graph_states[graphs[-1]]['connectivity'].tol == 1e-10
+    full = run_single_strategy_simulation(G, 8, pcm_strategy, method=method, tol=1e-10, incremental=False, verbose=False)
+    assert max(abs(a - b) for a, b in zip(history, full)) <= 1e-10
+
+def exact_lambda2_with(G, edge):
+    H = G.to_networkx(relabel=False)
+    H.add_edge(*edge)
+    return _safe_fiedler_pair(H, method='dense')[0]
+
+@pytest.mark.parametrize('method', ['dense', 'sparse'])
+def test_candidate_lambda2_matches_a_full_solve(method):
+    G = CompactGraph.from_networkx(nx.connected_watts_strogatz_graph(150, 4, 0.1, seed=8))
+    tracker = ConnectivityTracker(G, method=method)
+    # Earlier insertions are pending Woodbury terms on the shared factorization.
+    for u, v in [(0, 75), (20, 110)]:
+        G.add_edge(u, v)
+        tracker.add_edge(u, v)
+    candidates = [(3, 80), (40, 130), (10, 11), (0, 75), (7, 7), (60, 149)]
+    expected = [exact_lambda2_with(G, edge) for edge in candidates]
+    assert tracker.connectivity_with_edges(candidates, workers=1) == pytest.approx(expected, abs=1e-8)
+    assert tracker.connectivity_with_edges(candidates, workers=3) == pytest.approx(expected, abs=1e-8)
+    assert tracker.algebraic_connectivity == pytest.approx(_safe_fiedler_pair(G, method='dense')[0], abs=1e-8)
+
+def test_candidate_joining_the_last_two_components():
+    G = CompactGraph.from_networkx(nx.disjoint_union(nx.cycle_graph(6), nx.path_graph(5)))
+    tracker = ConnectivityTracker(G)
+    gains = tracker.connectivity_with_edges([(0, 6), (0, 3), (6, 10)])
+    assert gains[0] == pytest.approx(exact_lambda2_with(G, (0, 6)), abs=1e-10)
+    assert gains[1:] == [0.0, 0.0]
+
+@pytest.mark.parametrize('strategy', [pcm_strategy, fiedler_strategy])
+def test_lookahead_adds_the_best_candidate(strategy):
+    G = nx.connected_watts_strogatz_graph(60, 4, 0.1, seed=4)
+    graphs = []
+    history = run_single_strategy_simulation(G, 4, strategy, lookahead=5, verbose=False,
+                                             on_step=lambda H, step: graphs.append(H.copy()))
+    H = CompactGraph.from_networkx(G)
+    for step in range(4):
+        candidates = strategy(H.copy(), top_k=5)
+        best = max(exact_lambda2_with(H, edge) for edge in candidates)
+        assert history[step + 1] == pytest.approx(best, abs=1e-8)
+        H = graphs[step]
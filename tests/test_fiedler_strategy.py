@@ -0,0 +1,25 @@
+# tests/test_fiedler_strategy.py
+import itertools
+
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import _graph_states, fiedler_strategy
+
+@pytest.mark.graphs("ws", "ba", "grid")
+def test_fiedler_strategy_picks_the_top_scoring_non_edges(graph):
+    G = CompactGraph.from_networkx(graph)
+    edges = fiedler_strategy(G, edges_per_step=5)
+    fiedler = _graph_states[G]['connectivity'].fiedler_vector
+    scores = sorted(((fiedler[u] - fiedler[v]) ** 2 for u, v in itertools.combinations(G.nodes(), 2)
+                     if not G.has_edge(u, v)), reverse=True)
+    assert len(set(map(frozenset, edges))) == 5
+    assert not any(G.has_edge(u, v) for u, v in edges)
+    assert [(fiedler[u] - fiedler[v]) ** 2 for u, v in edges] == pytest.approx(scores[:5], rel=1e-12)
+    assert fiedler_strategy(G) == edges[0]
+
+def test_fiedler_strategy_falls_back_on_a_disconnected_graph():
+    G = CompactGraph.from_networkx(nx.disjoint_union(nx.cycle_graph(5), nx.cycle_graph(4)))
+    u, v = fiedler_strategy(G)
+    assert u != v and not G.has_edge(u, v)
@@ -0,0 +1,41 @@
+# tests/test_graph_state.py
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import (BetweennessTracker, ConnectivityTracker, PeripheralPairIndex, _graph_state,
+                                   _notify_edge_added, pcm_strategy)
+
+TRACKERS = [('connectivity', ConnectivityTracker), ('peripheral_pairs', PeripheralPairIndex),
+            ('betweenness', BetweennessTracker)]
+
+def _swap_one_edge(G):
+    # Same node and edge counts, different graph.
+    u, v = next(iter(G.edges()))
+    G.remove_edge(u, v)
+    G.add_edge(*next((a, b) for a in G for b in G if a != b and (a, b) != (u, v) and not G.has_edge(a, b)))
+
+@pytest.mark.parametrize('compact', [True, False], ids=['compact', 'networkx'])
+@pytest.mark.parametrize('key,factory', TRACKERS, ids=[key for key, _ in TRACKERS])
+def test_state_is_rebuilt_after_an_edge_swap(key, factory, compact):
+    G = nx.connected_watts_strogatz_graph(30, 4, 0.1, seed=2)
+    G = CompactGraph.from_networkx(G) if compact else G
+    state = _graph_state(G, key, factory)
+    assert _graph_state(G, key, factory) is state
+    _swap_one_edge(G)
+    assert _graph_state(G, key, factory) is not state
+
+def test_state_is_kept_across_notified_insertions():
+    G = CompactGraph.from_networkx(nx.cycle_graph(20))
+    states = [_graph_state(G, key, factory) for key, factory in TRACKERS]
+    G.add_edge(0, 10)
+    _notify_edge_added(G, 0, 10)
+    assert [_graph_state(G, key, factory) for key, factory in TRACKERS] == states
+
+def test_pcm_sees_an_edge_swap():
+    G = CompactGraph.from_networkx(nx.path_graph(12))
+    assert pcm_strategy(G) == (0, 11)
+    # Closing the path into a cycle and cutting it in the middle keeps the counts.
+    G.remove_edge(5, 6)
+    G.add_edge(0, 11)
+    assert pcm_strategy(G) == (5, 6)
@@ -0,0 +1,94 @@
+# tests/test_graph_store.py
+import os
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import graph_store
+from compact_graph import CompactGraph
+
+def assert_same_graph(a, b):
+    assert a.number_of_edges() == b.number_of_edges()
+    assert [list(row) for row in a.adj] == [list(row) for row in b.adj]
+    assert a.edges() == b.edges()
+    assert a.degree() == b.degree()
+    assert np.array_equal(a.to_csr().indices, b.to_csr().indices)
+
+def test_csr_backed_graph_matches_list_graph_under_edits():
+    G = nx.gnm_random_graph(120, 300, seed=1)
+    G.add_edge(5, 5)
+    expected = CompactGraph.from_networkx(G)
+    csr = expected.to_csr()
+    indptr, indices = csr.indptr.copy(), csr.indices.copy()
+    indptr.setflags(write=False)
+    indices.setflags(write=False)
+    graph = CompactGraph.from_csr(indptr, indices)
+    assert_same_graph(expected, graph)
+    rng = random.Random(0)
+    for _ in range(200):
+        u, v = rng.randrange(120), rng.randrange(120)
+        if expected.has_edge(u, v) and rng.random() < 0.3:
+            expected.remove_edge(u, v)
+            graph.remove_edge(u, v)
+        else:
+            expected.add_edge(u, v)
+            graph.add_edge(u, v)
+        assert graph.has_edge(u, v) == expected.has_edge(u, v)
+    assert_same_graph(expected, graph)
+    assert_same_graph(expected.copy(), graph.copy())
+
+def test_cached_load_equals_parsed_graph_and_skips_hashing(tmp_path, monkeypatch):
+    path = tmp_path / "graph.edgelist"
+    G = nx.gnm_random_graph(80, 200, seed=2)
+    nx.write_edgelist(G, path, data=False)
+    cache_dir = tmp_path / "cache"
+    first = graph_store.load_graph(str(path), cache_dir=str(cache_dir))
+    expected = CompactGraph.from_networkx(nx.read_edgelist(path, nodetype=int))
+    assert_same_graph(expected, first)
+    assert first.labels == expected.labels
+
+    def no_hashing(*args, **kwargs):
+        raise AssertionError("unchanged file was hashed again")
+
+    monkeypatch.setattr(graph_store, "source_hash", no_hashing)
+    cached = graph_store.load_graph(str(path), cache_dir=str(cache_dir))
+    assert isinstance(cached.adj.indices, np.memmap)
+    assert_same_graph(expected, cached)
+    assert cached.labels == expected.labels
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path = tmp_path / "graph.edgelist"
+    path.write_text("1 2\n2 3\n")
+    cache_dir = str(tmp_path / "cache")
+    assert graph_store.load_graph(str(path), cache_dir=cache_dir).number_of_edges() == 2
+    path.write_text("1 2\n2 3\n3 4\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert graph_store.load_graph(str(path), cache_dir=cache_dir).number_of_edges() == 3
+
+@pytest.mark.parametrize("text", [
+    "1 2\n2 3\n",
+    "# header\n1 2 # note\n3\n\n2 4 {'weight': 2}\n4 1\n",
+    "1 2\n2 1\n3 3\n",
+])
+@pytest.mark.parametrize("chunk_lines", [1, 2, 100])
+def test_read_edgelist_matches_networkx(tmp_path, text, chunk_lines):
+    path = tmp_path / "graph.edgelist"
+    path.write_text(text)
+    expected = CompactGraph.from_networkx(nx.read_edgelist(path, nodetype=int))
+    indptr, indices, labels = graph_store.read_edgelist_csr(str(path), chunk_lines=chunk_lines)
+    assert indptr.tolist() == expected.to_csr().indptr.tolist()
+    assert indices.tolist() == expected.to_csr().indices.tolist()
+    assert labels.tolist() == expected.labels
+
+@pytest.mark.parametrize("chunk_lines", [1, 100])
+def test_read_edgelist_rejects_extra_columns(tmp_path, chunk_lines):
+    # Four fields on one line and none on the next add up to two per line.
+    path = tmp_path / "graph.edgelist"
+    path.write_text("1 2 7 8\n\n3 4\n5 6\n")
+    with pytest.raises(TypeError):
+        nx.read_edgelist(path, nodetype=int)
+    with pytest.raises(TypeError):
+        graph_store.read_edgelist_csr(str(path), chunk_lines=chunk_lines)
@@ -0,0 +1,42 @@
+# tests/test_instrumentation.py
+import json
+
+import networkx as nx
+import pytest
+
+import instrumentation
+from resilience_calculator import pcm_strategy, run_single_strategy_simulation
+
+def test_span_is_a_no_op_when_tracing_is_off():
+    instrumentation.disable()
+    with instrumentation.span('phase', step=1) as s:
+        s.set(iterations=3)
+    assert s is instrumentation._NULL_SPAN
+
+def test_jsonl_trace_records_spans_and_counters(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    instrumentation.enable(path)
+    try:
+        with instrumentation.span('phase', step=1) as s:
+            s.set(iterations=3)
+        instrumentation.counter('solver', iterations=7)
+    finally:
+        instrumentation.disable()
+    with open(path) as f:
+        events = [json.loads(line) for line in f]
+    assert [(e['name'], e['ph']) for e in events] == [('phase', 'X'), ('solver', 'C')]
+    assert events[0]['args'] == {'step': 1, 'iterations': 3} and events[0]['dur'] >= 0
+    assert events[1]['args'] == {'iterations': 7}
+
+def test_chrome_trace_of_a_simulation(tmp_path):
+    path = str(tmp_path / "trace.json")
+    G = nx.connected_watts_strogatz_graph(40, 4, 0.1, seed=1)
+    instrumentation.enable(path)
+    try:
+        traced = run_single_strategy_simulation(G, 3, pcm_strategy, verbose=False)
+    finally:
+        instrumentation.disable()
+    with open(path) as f:
+        names = {event['name'] for event in json.load(f)['traceEvents']}
+    assert {'select_edges', 'insert_edge', 'state.connectivity'} <= names
+    assert traced == pytest.approx(run_single_strategy_simulation(G, 3, pcm_strategy, verbose=False), abs=1e-9)
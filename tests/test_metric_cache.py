@@ -0,0 +1,74 @@
+# tests/test_metric_cache.py
+import json
+import os
+
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from metric_cache import MetricCache, graph_fingerprint
+from resilience_calculator import hub_strategy, pcm_strategy, run_single_strategy_simulation
+
+def test_fingerprint_ignores_labels_and_adjacency_order():
+    G = nx.barabasi_albert_graph(40, 2, seed=1)
+    shuffled = nx.Graph()
+    shuffled.add_nodes_from(G)
+    shuffled.add_edges_from(reversed(list(G.edges())))
+    relabelled = nx.relabel_nodes(G, {v: f"n{v}" for v in G})
+    fingerprint = graph_fingerprint(G)
+    assert graph_fingerprint(shuffled) == fingerprint
+    assert graph_fingerprint(relabelled) == fingerprint
+    assert graph_fingerprint(CompactGraph.from_networkx(G)) == fingerprint
+    G.add_edge(0, 39)
+    assert graph_fingerprint(G) != fingerprint
+
+def test_cached_value_is_not_recomputed(tmp_path):
+    cache = MetricCache(str(tmp_path))
+    G = nx.cycle_graph(10)
+    calls = []
+
+    def metric(G, scale=1):
+        calls.append(scale)
+        return G.number_of_edges() * scale
+
+    assert cache.compute(G, 'edges', metric, scale=2) == 20
+    assert cache.compute(nx.cycle_graph(10), 'edges', metric, scale=2) == 20
+    assert cache.compute(G, 'edges', metric, scale=3) == 30
+    assert calls == [2, 3]
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    # Room for two one-number entries.
+    cache = MetricCache(str(tmp_path), max_bytes=2 * len(json.dumps(1.0)))
+    cache.put('a', 1.0)
+    cache.put('b', 2.0)
+    os.utime(tmp_path / "a.json", (1, 1))
+    os.utime(tmp_path / "b.json", (2, 2))
+    assert cache.get('a') == 1.0
+    cache.put('c', 3.0)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1.0, None, 3.0)
+
+class Interrupted(Exception):
+    pass
+
+@pytest.mark.parametrize('strategy', [pcm_strategy, hub_strategy])
+def test_resumed_simulation_equals_uninterrupted(tmp_path, strategy):
+    G = nx.connected_watts_strogatz_graph(50, 4, 0.1, seed=2)
+    checkpoint = str(tmp_path / "run.json")
+
+    def stop(H, step):
+        if step == 4:
+            raise Interrupted
+
+    with pytest.raises(Interrupted):
+        run_single_strategy_simulation(G, 10, strategy, checkpoint=checkpoint, verbose=False, on_step=stop)
+    with open(checkpoint) as f:
+        assert len(json.load(f)['edges']) == 4
+    resumed = run_single_strategy_simulation(G, 10, strategy, checkpoint=checkpoint, verbose=False)
+    assert resumed == pytest.approx(run_single_strategy_simulation(G, 10, strategy, verbose=False), abs=1e-9)
+
+def test_checkpoint_of_another_graph_is_ignored(tmp_path):
+    checkpoint = str(tmp_path / "run.json")
+    run_single_strategy_simulation(nx.cycle_graph(12), 3, pcm_strategy, checkpoint=checkpoint, verbose=False)
+    G = nx.path_graph(12)
+    assert run_single_strategy_simulation(G, 3, pcm_strategy, checkpoint=checkpoint, verbose=False) == \
+        pytest.approx(run_single_strategy_simulation(G, 3, pcm_strategy, verbose=False), abs=1e-9)
@@ -0,0 +1,44 @@
+# tests/test_pcm_strategy.py
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import _notify_edge_added, pcm_strategy
+
+def all_pairs_pcm(G):
+    # The original pcm_strategy: the first farthest pair of an all-pairs BFS
+    # over a copy of the graph. A disconnected graph is scanned on its largest
+    # component, copied with the nodes in G's node order.
+    G = G.copy()
+    subgraph = G
+    if not nx.is_connected(G):
+        component = max(nx.connected_components(G), key=len)
+        nodes = [node for node in G if node in component]
+        subgraph = nx.Graph()
+        subgraph.add_nodes_from(nodes)
+        subgraph.add_edges_from((u, v) for u in nodes for v in G.adj[u] if v in component)
+    max_len, start_node, end_node = -1, -1, -1
+    for source, paths in nx.all_pairs_shortest_path_length(subgraph):
+        for target, length in paths.items():
+            if length > max_len and not G.has_edge(source, target):
+                max_len, start_node, end_node = length, source, target
+    return (start_node, end_node)
+
+@pytest.mark.graphs("grid", "ws-seed29", "ws-seed7", "er-seed39", "tree", "er-sparse", "er-sparse-seed37")
+def test_pcm_matches_all_pairs_scan(graph):
+    G = nx.convert_node_labels_to_integers(graph)
+    compact = CompactGraph.from_networkx(G)
+    for step in range(25):
+        expected = all_pairs_pcm(G)
+        assert pcm_strategy(compact) == expected, f"step {step}"
+        G.add_edge(*expected)
+        compact.add_edge(*expected)
+        _notify_edge_added(compact, *expected)
+
+def test_pcm_on_networkx_graph_with_labels():
+    G = nx.relabel_nodes(nx.gnp_random_graph(40, 0.03, seed=4), lambda x: f"n{(x * 7) % 40}")
+    for step in range(15):
+        expected = all_pairs_pcm(G)
+        assert pcm_strategy(G) == expected, f"step {step}"
+        G.add_edge(*expected)
+        _notify_edge_added(G, *expected)
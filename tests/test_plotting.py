@@ -0,0 +1,30 @@
+# tests/test_plotting.py
+import os
+
+import networkx as nx
+import numpy as np
+import pytest
+
+os.environ.setdefault('RESILIENCE_HEADLESS', '1')
+import plotting
+
+def test_layout_cache_is_inside_the_project():
+    project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert os.path.isabs(plotting.LAYOUT_CACHE_DIR)
+    assert plotting.LAYOUT_CACHE_DIR.startswith(os.path.join(project, "results"))
+
+def test_cached_layout_is_reused(tmp_path):
+    G = nx.karate_club_graph()
+    first = plotting.graph_layout(G, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    second = plotting.graph_layout(G, cache_dir=str(tmp_path))
+    assert all(np.allclose(first[node], second[node]) for node in G)
+
+def test_background_renders_never_open_a_window(tmp_path, monkeypatch):
+    monkeypatch.setenv('RESILIENCE_HEADLESS', '0')
+    monkeypatch.setattr(plotting.plt, 'show', lambda: pytest.fail("plt.show() in a render worker"))
+    # The submitted call, run here instead of in the render pool.
+    monkeypatch.setattr(plotting, 'render_in_background', lambda func, *args, **kwargs: func(*args, **kwargs))
+    path = plotting.plot_and_save_results({"Random": [0.1, 0.2]}, 'toy', 10, 12, 1, output_dir=str(tmp_path),
+                                          dpi=20, background=True)
+    assert os.path.exists(path)
@@ -0,0 +1,48 @@
+# tests/test_repair_engine.py
+import networkx as nx
+import pytest
+
+from repair_engine import repair_after_failures
+
+def pairwise_repair(G, node):
+    # The original single-failure repair: link every pair of former
+    # neighbours that no longer has a path between them.
+    G = G.copy()
+    neighbors = list(G.neighbors(node))
+    G.remove_node(node)
+    repairs = []
+    for i in range(len(neighbors)):
+        for j in range(i + 1, len(neighbors)):
+            u, v = neighbors[i], neighbors[j]
+            if not G.has_edge(u, v) and not nx.has_path(G, u, v):
+                G.add_edge(u, v)
+                repairs.append((u, v))
+    return G, repairs
+
+def most_central(G, count):
+    centrality = nx.betweenness_centrality(G)
+    return sorted(centrality, key=centrality.get, reverse=True)[:count]
+
+@pytest.mark.graphs("tree", "balanced-tree", "ring")
+def test_single_failure_matches_pairwise_repair(graph):
+    G = graph
+    node = most_central(G, 1)[0]
+    H, repairs = repair_after_failures(G, [node])
+    expected, expected_repairs = pairwise_repair(G, node)
+    assert repairs == expected_repairs
+    assert nx.utils.graphs_equal(H, expected)
+
+@pytest.mark.parametrize('policy', ['star', 'chain'])
+@pytest.mark.graphs("tree", "balanced-tree", "ring")
+def test_multi_failure_repair_reconnects_with_fewest_edges(graph, policy):
+    G = graph
+    failed = most_central(G, 4)
+    H, repairs = repair_after_failures(G, failed, policy=policy)
+    damaged = G.copy()
+    damaged.remove_nodes_from(failed)
+    # G is connected, so every fragment touched a failed node: the repair
+    # joins them all, one edge per fragment beyond the first.
+    assert nx.is_connected(H)
+    assert len(repairs) == nx.number_connected_components(damaged) - 1
+    assert set(H.nodes()) == set(damaged.nodes())
+    assert all(not damaged.has_edge(u, v) for u, v in repairs)
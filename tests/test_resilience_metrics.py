@@ -0,0 +1,90 @@
+# tests/test_resilience_metrics.py
+import networkx as nx
+import numpy as np
+import pytest
+
+import resilience_metrics
+
+def test_sketched_resistances_are_within_epsilon():
+    G = nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=1)
+    lu = resilience_metrics._grounded_laplacian_factor(G)
+    rows, cols = resilience_metrics._edge_endpoints(G)
+    exact = resilience_metrics._exact_effective_resistances(lu, G.number_of_nodes(), rows, cols)
+    sketched = resilience_metrics._sketched_effective_resistances(lu, G.number_of_nodes(), rows, cols, 0.3, seed=0)
+    assert np.all(np.abs(sketched / exact - 1) <= 0.3)
+
+def test_sketched_omega_electrical_is_close_to_exact():
+    G = nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=1)
+    exact = resilience_metrics.calculate_omega_electrical(G, method='exact')
+    sketched = resilience_metrics.calculate_omega_electrical(G, method='sketch', epsilon=0.3, seed=0)
+    assert abs(sketched - exact) < 1e-2
+
+def omega_betweenness_baseline(G):
+    # The original implementation: entropy of nx edge betweenness.
+    flows = np.array(list(nx.edge_betweenness_centrality(G, normalized=False).values()))
+    probabilities = flows / flows.sum()
+    return float(-(probabilities * np.log(probabilities)).sum() / np.log(G.number_of_edges()))
+
+def test_exact_omega_betweenness_matches_networkx():
+    for G in (nx.barabasi_albert_graph(120, 2, seed=1), nx.disjoint_union(nx.cycle_graph(9), nx.star_graph(6))):
+        expected = omega_betweenness_baseline(G)
+        assert resilience_metrics.calculate_omega_betweenness(G, method='exact') == pytest.approx(expected, abs=1e-12)
+        assert resilience_metrics.calculate_omega_betweenness(G, method='exact', n_jobs=2) == pytest.approx(expected, abs=1e-12)
+
+def test_sampled_omega_betweenness_is_within_epsilon():
+    G = nx.barabasi_albert_graph(600, 2, seed=4)
+    exact = resilience_metrics.calculate_omega_betweenness(G, method='exact')
+    for seed in range(3):
+        sampled, info = resilience_metrics.calculate_omega_betweenness(G, method='sampled', epsilon=2e-2, seed=seed,
+                                                                       return_info=True)
+        assert info['pivots'] < G.number_of_nodes()
+        assert abs(sampled - exact) <= 2e-2
+    assert resilience_metrics.calculate_omega_betweenness(G, method='sampled', epsilon=2e-2, seed=0, n_jobs=2) == \
+        pytest.approx(resilience_metrics.calculate_omega_betweenness(G, method='sampled', epsilon=2e-2, seed=0), abs=1e-12)
+
+def naive_trajectory(G, removal_order):
+    # Removes the nodes one by one and searches the components every time.
+    G = G.copy()
+    sizes = [len(max(nx.connected_components(G), key=len, default=()))]
+    for node in removal_order:
+        G.remove_node(node)
+        sizes.append(len(max(nx.connected_components(G), key=len, default=())))
+    return sizes
+
+@pytest.mark.graphs("ba", "er-sparse", "grid")
+def test_attack_curve_matches_naive_removal(graph):
+    G = graph
+    order = sorted(G.nodes(), key=G.degree, reverse=True)
+    assert resilience_metrics.targeted_attack_trajectory(G).tolist() == naive_trajectory(G, order)
+    # A partial removal order leaves the other nodes in place.
+    assert resilience_metrics.percolation_trajectory(G, order[:20]).tolist() == naive_trajectory(G, order[:20])
+    sizes = np.array(naive_trajectory(G, order))
+    assert resilience_metrics.simulate_targeted_attack(G) == pytest.approx(
+        resilience_metrics._trapezoid(sizes / sizes[0], dx=1 / len(sizes)), abs=1e-12)
+
+def test_failure_ensemble_batch_matches_naive_removal():
+    G = nx.gnp_random_graph(40, 0.08, seed=5)
+    rows, cols = resilience_metrics._edge_endpoints(G)
+    m, removed_counts = len(rows), np.array([0, 5, 20, len(rows)])
+    gcc, counts = resilience_metrics._failure_ensemble_batch(G.number_of_nodes(), rows, cols, removed_counts, 6, 3)
+    # The batch removes the edges of each row of its permutation, first to last.
+    order = np.random.default_rng(3).permuted(np.tile(np.arange(m), (6, 1)), axis=1)
+    nodes = list(G.nodes())
+    for r in range(6):
+        for f, removed in enumerate(removed_counts):
+            H = nx.Graph()
+            H.add_nodes_from(nodes)
+            H.add_edges_from((nodes[rows[e]], nodes[cols[e]]) for e in order[r, removed:])
+            components = list(nx.connected_components(H))
+            assert (gcc[r, f], counts[r, f]) == (max(map(len, components)), len(components))
+
+def test_failure_ensemble_does_not_depend_on_n_jobs(monkeypatch):
+    # Three batches, so that the workers share them out.
+    monkeypatch.setattr(resilience_metrics, 'FAILURE_BATCH_SIZE', 100)
+    G = nx.barabasi_albert_graph(60, 2, seed=1)
+    serial = resilience_metrics.random_failure_ensemble(G, realizations=300, seed=4)
+    parallel = resilience_metrics.random_failure_ensemble(G, realizations=300, seed=4, n_jobs=2)
+    for key in ('gcc_mean', 'gcc_ci', 'components_mean', 'components_ci'):
+        assert np.allclose(serial[key], parallel[key])
+    assert serial['gcc_mean'][0] == G.number_of_nodes() and serial['components_mean'][-1] == G.number_of_nodes()
+    assert np.all(serial['gcc_ci'][0] <= serial['gcc_mean']) and np.all(serial['gcc_mean'] <= serial['gcc_ci'][1])
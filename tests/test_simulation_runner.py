@@ -0,0 +1,105 @@
+# tests/test_simulation_runner.py
+import functools
+import os
+from concurrent.futures import Future
+
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from resilience_calculator import (calculate_algebraic_connectivity, fiedler_strategy, hub_strategy, pcm_strategy, random_strategy,
+                                   run_single_strategy_simulation)
+from simulation_runner import graph_from_shared, main, run_strategies_parallel, share_graph
+
+def test_shared_graph_round_trip():
+    G = nx.connected_watts_strogatz_graph(40, 4, 0.2, seed=1)
+    descriptor, blocks = share_graph(G)
+    try:
+        shared, attached = graph_from_shared(descriptor)
+        assert shared.edges() == CompactGraph.from_networkx(G).edges()
+        # The worker reads the block in place and cannot write to it.
+        indices = shared._adj.indices
+        assert not indices.flags.writeable and not indices.flags.owndata
+        with pytest.raises(ValueError):
+            indices[0] = 0
+        # Edges added during a run go to the graph's own rows, not the block.
+        shared.add_edge(0, 20)
+        again, attached_again = graph_from_shared(descriptor)
+        assert again.edges() == CompactGraph.from_networkx(G).edges()
+        del shared, again, indices
+        for block in attached + attached_again:
+            block.close()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+def test_parallel_histories_match_serial():
+    G = nx.connected_watts_strogatz_graph(60, 4, 0.1, seed=3)
+    strategies = {'PCM': pcm_strategy, 'Hub': hub_strategy, 'Fiedler': fiedler_strategy}
+    parallel = run_strategies_parallel(G, strategies, 6, max_workers=2)
+    for name, func in strategies.items():
+        serial = run_single_strategy_simulation(G, 6, func, verbose=False)
+        assert parallel[name] == pytest.approx(serial, abs=1e-9), name
+
+def test_repeated_random_runs_are_reproducible():
+    G = nx.connected_watts_strogatz_graph(60, 4, 0.1, seed=3)
+    strategies = {'Random': random_strategy}
+    first = run_strategies_parallel(G, strategies, 5, repetitions={'Random': 3}, max_workers=2, seed=7)
+    second = run_strategies_parallel(G, strategies, 5, repetitions={'Random': 3}, max_workers=3, seed=7)
+    assert first['Random'] == pytest.approx(second['Random'], abs=1e-9)
+
+def test_weighted_graph_keeps_its_algebraic_connectivity():
+    G = nx.karate_club_graph()
+    descriptor, blocks = share_graph(G)
+    try:
+        shared, attached = graph_from_shared(descriptor)
+        shared_connectivity = calculate_algebraic_connectivity(shared)
+        del shared
+        for block in attached:
+            block.close()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    expected = calculate_algebraic_connectivity(G)
+    assert expected == pytest.approx(1.1871, abs=1e-4)
+    assert run_single_strategy_simulation(G, 1, hub_strategy, verbose=False)[0] == pytest.approx(expected, abs=1e-9)
+    assert shared_connectivity == pytest.approx(expected, abs=1e-9)
+
+def test_fiedler_edges_per_step_reaches_the_runner(tmp_path):
+    G = nx.connected_watts_strogatz_graph(50, 4, 0.1, seed=4)
+    nx.write_edgelist(G, str(tmp_path / "toy.edgelist"), data=False)
+    cache_dir = tmp_path / "cache"
+    results = main(network='toy', num_edges=4, random_runs=2, workers=2, cache_dir=str(cache_dir),
+                   data_dir=str(tmp_path), plot=False, edges_per_step=2)
+    multi_edge = functools.partial(fiedler_strategy, edges_per_step=2)
+    expected = run_single_strategy_simulation(G, 4, multi_edge, verbose=False)
+    assert results["Fiedler (λ₂ gain)"] == pytest.approx(expected, abs=1e-9)
+    checkpoints = os.listdir(next((cache_dir / "checkpoints").iterdir()))
+    assert "fiedler_strategy-edges_per_step2-0.json" in checkpoints
+
+def test_figure_is_redrawn_as_strategies_finish(tmp_path, monkeypatch):
+    import plotting
+    nx.write_edgelist(nx.connected_watts_strogatz_graph(30, 4, 0.1, seed=5), str(tmp_path / "toy.edgelist"), data=False)
+    monkeypatch.setattr(plotting, 'headless', lambda: True)
+    events = []
+
+    def fake_plot(results, **kwargs):
+        events.append(('render', len(results), kwargs['background']))
+        future = Future()
+        future.set_result(None)
+        return future
+
+    monkeypatch.setattr(plotting, 'plot_and_save_results', fake_plot)
+    monkeypatch.setattr(plotting, 'wait_for_renders', lambda: events.append(('wait',)))
+    main(network='toy', num_edges=2, workers=1, cache_dir=None, data_dir=str(tmp_path))
+    assert events == [('render', k, True) for k in range(1, 6)] + [('render', 5, True), ('wait',)]
+
+def test_serial_random_runs_are_averaged_like_parallel_ones():
+    G = nx.connected_watts_strogatz_graph(60, 4, 0.1, seed=3)
+    strategies = {'Random': random_strategy, 'Hub': hub_strategy}
+    serial = run_strategies_parallel(G, strategies, 5, repetitions={'Random': 4}, max_workers=1, seed=7)
+    parallel = run_strategies_parallel(G, strategies, 5, repetitions={'Random': 4}, max_workers=2, seed=7)
+    assert serial['Random'] == pytest.approx(parallel['Random'], abs=1e-9)
+    assert serial['Hub'] == pytest.approx(parallel['Hub'], abs=1e-9)
@@ -0,0 +1,69 @@
+# tests/test_sweep.py
+import math
+import os
+
+import pytest
+
+import sweep
+from sweep import METRICS, GraphSpec, _read_results, expand_grid, run_sweep
+
+SPECS = [GraphSpec('create_karate_club', name="karate")] + \
+    expand_grid('create_ba_graph', name="ba-{n}-{seed}", n=[40, 60], m=[2], seed=[1])
+
+def values(rows):
+    return {(row['network'], row['metric']): row['value'] for row in rows}
+
+def test_sweep_values_match_direct_computation(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    rows = run_sweep(SPECS, output=output, n_jobs=2, verbose=False)
+    assert len(rows) == len(SPECS) * len(METRICS)
+    for spec in SPECS:
+        G = spec.build()
+        for metric, func in METRICS.items():
+            assert values(rows)[(spec.name, metric)] == pytest.approx(func(G), abs=1e-12)
+    assert values(_read_results(output)) == pytest.approx(values(rows), abs=1e-12)
+
+def test_resumed_sweep_equals_uninterrupted(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    # An interrupted sweep: only part of the cells made it into the file.
+    first = run_sweep(SPECS[:2], metrics=['auc'], output=output, n_jobs=1, verbose=False)
+    resumed = run_sweep(SPECS, output=output, n_jobs=2, verbose=False)
+    uninterrupted = run_sweep(SPECS, n_jobs=2, verbose=False)
+    assert values(resumed) == pytest.approx(values(uninterrupted), abs=1e-12)
+    # The cells already in the file are kept as they were, not recomputed.
+    kept = {(row['network'], row['metric']): row['seconds'] for row in resumed}
+    assert all(kept[(row['network'], row['metric'])] == pytest.approx(row['seconds']) for row in first)
+    assert len(_read_results(output)) == len(SPECS) * len(METRICS)
+
+def test_failing_cell_is_retried_then_recorded(tmp_path):
+    specs = [GraphSpec('create_er_graph', name="bad", n=10, p=0.5, unknown=1), SPECS[0]]
+    rows = run_sweep(specs, metrics=['auc'], n_jobs=1, retries=2, verbose=False)
+    bad, good = rows
+    assert (bad['status'], bad['attempts']) == ('error', 3) and math.isnan(bad['value'])
+    assert "TypeError" in bad['error']
+    assert good['status'] == 'ok'
+
+def test_slow_cell_times_out_without_stopping_the_sweep():
+    specs = [GraphSpec('create_complete_graph', name="slow", n=5000), SPECS[0]]
+    slow, good = run_sweep(specs, metrics=['auc'], n_jobs=1, timeout=0.5, retries=0, verbose=False)
+    assert slow['status'] == 'timeout'
+    assert good['status'] == 'ok'
+
+def test_worker_dying_after_its_last_cell_finishes_the_task(monkeypatch):
+    worker = sweep._worker
+
+    def dies_before_done(connection, cache_dir):
+        send = connection.send
+
+        def send_or_die(message):
+            if message == ('done',):
+                os._exit(1)
+            send(message)
+
+        connection.send = send_or_die
+        worker(connection, cache_dir)
+
+    monkeypatch.setattr(sweep, '_worker', dies_before_done)
+    rows = run_sweep(SPECS, metrics=['auc'], n_jobs=1, verbose=False)
+    assert [(row['network'], row['status'], row['attempts']) for row in rows] == \
+        [(spec.name, 'ok', 1) for spec in SPECS]
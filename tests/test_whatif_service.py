@@ -0,0 +1,74 @@
+# tests/test_whatif_service.py
+import asyncio
+import random
+
+import networkx as nx
+import pytest
+
+from resilience_calculator import calculate_algebraic_connectivity
+from resilience_metrics import calculate_omega_electrical
+from whatif_service import WhatIfState, query, serve
+
+def recomputed(G, q):
+    # Applies the query to a copy and computes every metric from scratch.
+    H = G.copy()
+    H.remove_edges_from(q.get('remove_edges', []))
+    H.remove_nodes_from(q.get('remove_nodes', []))
+    H.add_edges_from(q.get('add_edges', []))
+    gcc = max(nx.connected_components(H), key=len)
+    return {
+        'lambda2': calculate_algebraic_connectivity(H, method='dense'),
+        'gcc_size': len(gcc),
+        'omega_elec': calculate_omega_electrical(H.subgraph(gcc).copy(), method='exact'),
+    }
+
+def random_queries(G, count, seed):
+    rng = random.Random(seed)
+    nodes, edges = list(G.nodes()), list(G.edges())
+    non_edges = [(u, v) for u, v in nx.non_edges(G)]
+    queries = []
+    for _ in range(count):
+        q = {}
+        if rng.random() < 0.7:
+            q['add_edges'] = rng.sample(non_edges, rng.randint(1, 3))
+        if rng.random() < 0.5:
+            q['remove_edges'] = rng.sample(edges, rng.randint(1, 4))
+        if rng.random() < 0.4:
+            touched = {v for e in q.get('add_edges', []) for v in e}
+            q['remove_nodes'] = rng.sample([v for v in nodes if v not in touched], 2)
+        queries.append(q)
+    return queries
+
+@pytest.mark.graphs("ws", "tree", "karate")
+def test_queries_match_recomputation(graph):
+    G = graph
+    state = WhatIfState(G)
+    for q in random_queries(G, 25, seed=len(G)):
+        result, expected = state.evaluate(q), recomputed(G, q)
+        assert result['gcc_size'] == expected['gcc_size'], q
+        assert result['lambda2'] == pytest.approx(expected['lambda2'], abs=1e-7), q
+        assert result['omega_elec'] == pytest.approx(expected['omega_elec'], abs=1e-9), q
+    assert state.evaluate({})['lambda2'] == pytest.approx(calculate_algebraic_connectivity(G), abs=1e-9)
+
+def test_bad_query_is_reported_and_state_is_unchanged():
+    G = nx.cycle_graph(8)
+    state = WhatIfState(G)
+    baseline = dict(state.baseline)
+    response = state.answer({'queries': [{'remove_edges': [[0, 4]]}, {'remove_nodes': [0]}]})
+    assert 'error' in response['results'][0]
+    assert response['results'][1]['gcc_size'] == 7
+    assert state.baseline == baseline and state.evaluate({})['gcc_size'] == 8
+
+def test_server_answers_one_json_line_per_request():
+    state = WhatIfState(nx.path_graph(6))
+
+    async def run():
+        server = await serve(state, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await query([{'baseline': True}, {'queries': [{'add_edges': [[0, 5]]}]}, [1]], port=port)
+
+    baseline, answer, bad = asyncio.run(run())
+    assert baseline['baseline']['gcc_size'] == 6
+    assert answer['results'][0]['lambda2'] == pytest.approx(calculate_algebraic_connectivity(nx.cycle_graph(6)))
+    assert 'error' in bad